@@ -1,18 +1,24 @@
 # backend/analyzer.py
 import os
 import asyncio
-import aiohttp
 from datetime import datetime, timezone, timedelta
-from cmc_client import CMCClient
+from cmc_client import get_cmc_client
 from feature_store import build_features_from_quote
+from quote_snapshot import QuoteSnapshot
 from model_stub import predict_signal_from_features
-from db import insert_signal_record, init_db
+from db import init_db
 from notifier import format_signal_message, send_telegram_message_async
+from http_session import get_session
 from data_sync import read_config
 from volatility_calculator import get_threshold
-from price_history import get_recent_prices
+from db_async import (
+    create_price_alarm,
+    get_recent_prices,
+    get_recent_prices_with_timestamps,
+    insert_signal_record,
+    run_db,
+)
 from indicators import calculate_indicators
-from price_alarms import create_price_alarm
 import logging
 
 
@@ -20,7 +26,8 @@ import logging
 running_tasks = {}
 task_running = False
 
-# Global coin data cache - server.py'den erişilebilir
+# Global coin data cache - server.py ile paylaşılır
+# {symbol: {"data": QuoteSnapshot, "last_fetch": datetime, "status": "active/passive"}}
 coin_data_cache = {}
 
 
@@ -29,19 +36,23 @@ logger = logging.getLogger(__name__)
 init_db()
 
 def get_coin_from_cache(symbol: str):
-    """Cache'den coin verisini al, yoksa None döndür"""
+    """Cache'den coin snapshot'ını al, yoksa None döndür"""
     if symbol in coin_data_cache:
         cache_entry = coin_data_cache[symbol]
         return cache_entry.get("data")
     return None
 
-async def analyze_single_coin(symbol: str, quote: dict):
+async def analyze_single_coin(symbol: str, quote: QuoteSnapshot):
     """
     Tek bir coin için analiz yap ve gerekirse sinyal üret
     Bu fonksiyon fetch loop'tan her veri çekildikinde çağrılır
+    (quote: parse edilmiş snapshot; ham CMC yanıtı da kabul edilir)
     """
     from feature_flags import feature_flags
     from candle_aggregator import aggregate_prices_to_candles, check_sufficient_data_for_analysis
+    from indicator_stream import indicator_engine
+    from indicator_cache import indicator_cache, newest_timestamp, recent_indicators, series_key
+    from indicator_registry import select_indicators
     
     cfg = read_config()
     
@@ -71,7 +82,7 @@ async def analyze_single_coin(symbol: str, quote: dict):
             # Adaptive timeframe aktifse volatiliteye göre timeframe seç
             if adaptive_enabled:
                 # Son fiyatlardan volatilite hesapla
-                prices = get_recent_prices(symbol, hours=24)
+                prices = await get_recent_prices(symbol, hours=24)
                 if len(prices) >= 20:
                     from indicators import calculate_volatility, select_adaptive_timeframe
                     volatility = calculate_volatility(prices[-20:])
@@ -90,6 +101,9 @@ async def analyze_single_coin(symbol: str, quote: dict):
             candle_interval = None
             logger.info(f"[{symbol}] Global ayarlarla analiz: TF={timeframe}, threshold={manual_threshold}, mode={threshold_mode}")
         
+        # Hesaplanacak göstergeler (coin/global "indicators" listesi + modelin kullandıkları)
+        indicator_names = select_indicators(coin_settings_map.get(symbol) if use_coin_specific else None, cfg)
+        
         # Feature extraction (sadece CMC verisi ile)
         features = build_features_from_quote(quote)
         
@@ -103,43 +117,68 @@ async def analyze_single_coin(symbol: str, quote: dict):
             # Candle bazlı analiz
             logger.info(f"📊 [{symbol}] Candle interval analizi: {candle_interval}")
             
-            # Ham fiyat verilerini çek (timestamp ile birlikte)
-            from price_history import get_recent_prices_with_timestamps
-            price_data = get_recent_prices_with_timestamps(symbol, hours=168)  # 7 günlük veri
+            # Ingest sırasında tutulan candle'lar yeterliyse ham veri taranmaz
+            from candle_store import candle_store
+            if candle_store.supports(candle_interval) and not candle_store.is_loaded(symbol, candle_interval):
+                # Başlangıçta yüklenmemiş coin (örn. sonradan eklenen): candle'lar havuzda yüklenir
+                await run_db(candle_store.hydrate, [symbol])
+            # Streaming durum: sadece son okumadan sonra kapanan candle'lar işlenir
+            streamed = indicator_engine.candle_indicators(symbol, candle_interval, indicator_names) if feature_flags.enable_streaming_indicators() else None
+            # Aynı veriyle (en yeni fiyat değişmediyse) hesaplanmış sonuç yeniden kullanılır
+            newest = newest_timestamp(symbol)
+            cache_key = series_key(candle_interval, indicator_names)
+            cached = indicator_cache.get(symbol, cache_key, newest) if streamed is None else None
+            candles = candle_store.get_ohlcv(symbol, candle_interval, hours=168) if streamed is None and cached is None else None
+            candle_prices = candles["close"] if candles is not None else None
             
-            if price_data and len(price_data) >= 10:
-                # Candle'lara aggregate et
-                candle_prices = aggregate_prices_to_candles(price_data, candle_interval)
+            if streamed is not None:
+                indicators = streamed
+                logger.info(f"📊 [{symbol}] Candle analizi (streaming): RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+            elif cached is not None:
+                indicators = cached
+                logger.info(f"📊 [{symbol}] Candle analizi (cache): RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+            elif candle_prices is not None and check_sufficient_data_for_analysis(len(candle_prices), require_macd=True)[0]:
+                indicators = calculate_indicators(candle_prices, indicator_names, ohlcv=candles)
+                indicator_cache.put(symbol, cache_key, newest, indicators)
+                logger.info(f"📊 [{symbol}] Candle analizi (store): {len(candle_prices)} candle, RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+            else:
+                # Ham fiyat verilerini çek (timestamp ile birlikte)
+                price_data = await get_recent_prices_with_timestamps(symbol, hours=168)  # 7 günlük veri
+                
+                if price_data and len(price_data) >= 10:
+                    # Candle'lara aggregate et
+                    candle_prices = aggregate_prices_to_candles(price_data, candle_interval)
                 
-                # Yeterli candle var mı?
-                sufficient, msg = check_sufficient_data_for_analysis(len(candle_prices), require_macd=True)
+                    # Yeterli candle var mı?
+                    sufficient, msg = check_sufficient_data_for_analysis(len(candle_prices), require_macd=True)
                 
-                if sufficient:
-                    # Candle bazlı göstergeler
-                    indicators = calculate_indicators(candle_prices)
-                    logger.info(f"📊 [{symbol}] Candle analizi: {len(candle_prices)} candle, RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+                    if sufficient:
+                        # Candle bazlı göstergeler
+                        indicators = calculate_indicators(candle_prices, indicator_names)
+                        indicator_cache.put(symbol, cache_key, newest, indicators)
+                        logger.info(f"📊 [{symbol}] Candle analizi: {len(candle_prices)} candle, RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+                    else:
+                        logger.warning(f"⚠️ [{symbol}] Candle için yetersiz veri: {msg}")
+                        # Fallback: Ham veri ile analiz
+                        indicators, _ = await recent_indicators(symbol, count=50, names=indicator_names)
                 else:
-                    logger.warning(f"⚠️ [{symbol}] Candle için yetersiz veri: {msg}")
+                    logger.warning(f"⚠️ [{symbol}] Candle için yetersiz ham veri, fallback yapılıyor")
                     # Fallback: Ham veri ile analiz
-                    prices = get_recent_prices(symbol, count=50)
-                    indicators = {}
-                    if len(prices) >= 26:
-                        indicators = calculate_indicators(prices)
-            else:
-                logger.warning(f"⚠️ [{symbol}] Candle için yetersiz ham veri, fallback yapılıyor")
-                # Fallback: Ham veri ile analiz
-                prices = get_recent_prices(symbol, count=50)
-                indicators = {}
-                if len(prices) >= 26:
-                    indicators = calculate_indicators(prices)
+                    indicators, _ = await recent_indicators(symbol, count=50, names=indicator_names)
         else:
             # 🔄 Eski sistem (default)
             # RSI ve MACD göstergelerini hesapla
-            prices = get_recent_prices(symbol, count=50)
             indicators = {}
-            if len(prices) >= 26:  # MACD için minimum
-                indicators = calculate_indicators(prices)
-                logger.info(f"[{symbol}] Göstergeler: RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+            if feature_flags.enable_streaming_indicators():
+                # Streaming durum: buffer yüklü değilse/veri yetersizse eski hesaplamaya düşülür
+                indicators = indicator_engine.tick_indicators(symbol, indicator_names) or {}
+            if indicators:
+                logger.info(f"[{symbol}] Göstergeler (streaming): RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
+            else:
+                # MACD için minimum 26 fiyat; aynı veriyle hesaplanmışsa cache'ten (/api/indicators ile ortak)
+                indicators, _ = await recent_indicators(symbol, count=50, names=indicator_names)
+                if indicators:
+                    logger.info(f"[{symbol}] Göstergeler: RSI={indicators.get('rsi')}, MACD={indicators.get('macd_signal')}")
         
         # Sinyal tahmini (indicators ile)
         sig, prob, tp, sl, weight_desc = predict_signal_from_features(features, timeframe, indicators)
@@ -261,7 +300,7 @@ async def analyze_single_coin(symbol: str, quote: dict):
             rec["trend_weight"] = trend_weight
             
             # DB'ye kaydet
-            rec_id = insert_signal_record(rec)
+            rec_id = await insert_signal_record(rec)
             rec["id"] = rec_id
             
             # Türkiye saati
@@ -273,7 +312,7 @@ async def analyze_single_coin(symbol: str, quote: dict):
             
             # TP (Take Profit) alarmı
             if tp and tp > 0:
-                tp_alarm_id = create_price_alarm(
+                tp_alarm_id = await create_price_alarm(
                     coin=symbol,
                     target_price=tp,
                     alarm_type="tp",
@@ -286,7 +325,7 @@ async def analyze_single_coin(symbol: str, quote: dict):
             
             # SL (Stop Loss) alarmı
             if sl and sl > 0:
-                sl_alarm_id = create_price_alarm(
+                sl_alarm_id = await create_price_alarm(
                     coin=symbol,
                     target_price=sl,
                     alarm_type="sl",
@@ -359,77 +398,77 @@ async def analyze_cycle():
         logger.warning("Seçili coin yok!")
         return
     
-    async with aiohttp.ClientSession() as session:
-        cmc = CMCClient(API_KEY)
-        sem = asyncio.Semaphore(max_concurrent)
+    session = get_session("cmc")
+    cmc = get_cmc_client(API_KEY)
+    sem = asyncio.Semaphore(max_concurrent)
         
-        async def handle_coin(sym):
-            async with sem:
-                try:
-                    # Mod kontrolü: Coin-bazlı veya global ayarlar
-                    if use_coin_specific and sym in coin_settings_map:
-                        # Coin başına özel ayarlar aktif ve coin ayarı var
-                        coin_config = coin_settings_map[sym]
-                        timeframe = coin_config.get("timeframe")
-                        manual_threshold = coin_config.get("threshold")
-                        threshold_mode = coin_config.get("threshold_mode")
-                        logger.info(f"[COIN-BAZLI] Analyzing {sym}: TF={timeframe}, threshold={manual_threshold}, mode={threshold_mode}")
-                    else:
-                        # Global ayarlar kullan
-                        timeframe = global_timeframe
-                        manual_threshold = global_threshold
-                        threshold_mode = global_threshold_mode
-                        logger.info(f"[GLOBAL] Analyzing {sym}: TF={timeframe}, threshold={manual_threshold}, mode={threshold_mode}")
-                    
-                    # ÖNCELİKLE CACHE'DEN VERİ AL - En son çekilen veriyi kullan
-                    quote = get_coin_from_cache(sym)
-                    
-                    # Cache'de yoksa API'den çek
-                    if quote is None:
-                        logger.debug(f"[{sym}] Cache'de bulunamadı, API'den çekiliyor...")
-                        quote = await cmc.get_quote(session, sym)
-                    else:
-                        logger.debug(f"[{sym}] Cache'den alındı ✅")
-                    
-                    features = build_features_from_quote(quote)
+    async def handle_coin(sym):
+        async with sem:
+            try:
+                # Mod kontrolü: Coin-bazlı veya global ayarlar
+                if use_coin_specific and sym in coin_settings_map:
+                    # Coin başına özel ayarlar aktif ve coin ayarı var
+                    coin_config = coin_settings_map[sym]
+                    timeframe = coin_config.get("timeframe")
+                    manual_threshold = coin_config.get("threshold")
+                    threshold_mode = coin_config.get("threshold_mode")
+                    logger.info(f"[COIN-BAZLI] Analyzing {sym}: TF={timeframe}, threshold={manual_threshold}, mode={threshold_mode}")
+                else:
+                    # Global ayarlar kullan
+                    timeframe = global_timeframe
+                    manual_threshold = global_threshold
+                    threshold_mode = global_threshold_mode
+                    logger.info(f"[GLOBAL] Analyzing {sym}: TF={timeframe}, threshold={manual_threshold}, mode={threshold_mode}")
+                
+                # ÖNCELİKLE CACHE'DEN VERİ AL - En son çekilen veriyi kullan
+                quote = get_coin_from_cache(sym)
+                
+                # Cache'de yoksa API'den çek
+                if quote is None:
+                    logger.debug(f"[{sym}] Cache'de bulunamadı, API'den çekiliyor...")
+                    quote = await cmc.get_quote(session, sym)
+                else:
+                    logger.debug(f"[{sym}] Cache'den alındı ✅")
+                
+                features = build_features_from_quote(quote)
+                
+                # Dinamik veya manuel threshold kullan (coin başına)
+                threshold = get_threshold(features, threshold_mode, manual_threshold, timeframe)
+                
+                sig, prob, tp, sl, weight_desc = predict_signal_from_features(features, timeframe)
+                prob = float(prob)
+                
+                if sig and prob >= threshold:
+                    rec = {
+                        "coin": sym,
+                        "symbol": sym,
+                        "signal_type": sig,
+                        "probability": prob,
+                        "confidence_score": int(prob),
+                        "threshold_used": threshold,
+                        "timeframe": timeframe,
+                        "features": features,
+                        "stop_loss": sl,
+                        "tp": tp,
+                        "success": None,
+                    }
+                    rec_id = await insert_signal_record(rec)
+                    rec["id"] = rec_id
                     
-                    # Dinamik veya manuel threshold kullan (coin başına)
-                    threshold = get_threshold(features, threshold_mode, manual_threshold, timeframe)
+                    # Türkiye saati (UTC+3)
+                    turkey_time = datetime.now(timezone.utc) + timedelta(hours=3)
+                    rec["created_at"] = turkey_time.strftime("%H:%M")
                     
-                    sig, prob, tp, sl, weight_desc = predict_signal_from_features(features, timeframe)
-                    prob = float(prob)
+                    msg = format_signal_message(rec)
+                    await send_telegram_message_async(msg)
+                    logger.info(f"Sinyal gönderildi: {sym} - {sig} - {prob:.2f}% (TF: {timeframe}, TP: ${tp}, SL: ${sl})")
+                else:
+                    logger.debug(f"{sym}: Sinyal yok (prob={prob:.2f}%, threshold={threshold}, timeframe={timeframe})")
                     
-                    if sig and prob >= threshold:
-                        rec = {
-                            "coin": sym,
-                            "symbol": sym,
-                            "signal_type": sig,
-                            "probability": prob,
-                            "confidence_score": int(prob),
-                            "threshold_used": threshold,
-                            "timeframe": timeframe,
-                            "features": features,
-                            "stop_loss": sl,
-                            "tp": tp,
-                            "success": None,
-                        }
-                        rec_id = insert_signal_record(rec)
-                        rec["id"] = rec_id
-                        
-                        # Türkiye saati (UTC+3)
-                        turkey_time = datetime.now(timezone.utc) + timedelta(hours=3)
-                        rec["created_at"] = turkey_time.strftime("%H:%M")
-                        
-                        msg = format_signal_message(rec)
-                        await send_telegram_message_async(msg)
-                        logger.info(f"Sinyal gönderildi: {sym} - {sig} - {prob:.2f}% (TF: {timeframe}, TP: ${tp}, SL: ${sl})")
-                    else:
-                        logger.debug(f"{sym}: Sinyal yok (prob={prob:.2f}%, threshold={threshold}, timeframe={timeframe})")
-                        
-                except Exception as e:
-                    logger.error(f"Coin işleme hatası {sym}: {e}")
+            except Exception as e:
+                logger.error(f"Coin işleme hatası {sym}: {e}")
 
-        await asyncio.gather(*(handle_coin(c.strip().upper()) for c in selected_coins if c.strip()))
+    await asyncio.gather(*(handle_coin(c.strip().upper()) for c in selected_coins if c.strip()))
 
 async def run_loop():
     """Ana döngü - backward compatibility için"""
@@ -540,50 +579,50 @@ async def analyze_coin_group(coin_settings: list, timeframe: str):
     
     max_concurrent = cfg.get("max_concurrent_coins", 20)
     
-    async with aiohttp.ClientSession() as session:
-        cmc = CMCClient(API_KEY)
-        sem = asyncio.Semaphore(max_concurrent)
+    session = get_session("cmc")
+    cmc = get_cmc_client(API_KEY)
+    sem = asyncio.Semaphore(max_concurrent)
         
-        async def handle_coin(cs):
-            async with sem:
-                try:
-                    coin_symbol = cs["coin"]
-                    tf = cs.get("timeframe", timeframe)
-                    manual_threshold = cs.get("threshold", 4)
-                    threshold_mode = cs.get("threshold_mode", "dynamic")
-                    
-                    quote = await cmc.get_quote(session, coin_symbol)
-                    features = build_features_from_quote(quote)
-                    
-                    threshold = get_threshold(features, threshold_mode, manual_threshold, tf)
-                    sig, prob, tp, sl, weight_desc = predict_signal_from_features(features, tf)
-                    prob = float(prob)
-                    
-                    if sig and prob >= threshold:
-                        rec = {
-                            "coin": coin_symbol,
-                            "symbol": coin_symbol,
-                            "signal_type": sig,
-                            "probability": prob,
-                            "confidence_score": int(prob),
-                            "threshold_used": threshold,
-                            "timeframe": tf,
-                            "features": features,
-                            "stop_loss": sl,
-                            "tp": tp,
-                            "created_at": datetime.now(timezone.utc)  # datetime object olmalı
-                        }
-                        
-                        insert_signal_record(rec)
-                        msg = format_signal_message(rec)
-                        await send_telegram_message_async(msg)
-                        logger.info(f"[{tf}] Sinyal: {coin_symbol} {sig} (prob={prob:.2f}%, threshold={threshold:.2f}%)")
+    async def handle_coin(cs):
+        async with sem:
+            try:
+                coin_symbol = cs["coin"]
+                tf = cs.get("timeframe", timeframe)
+                manual_threshold = cs.get("threshold", 4)
+                threshold_mode = cs.get("threshold_mode", "dynamic")
+                
+                quote = await cmc.get_quote(session, coin_symbol)
+                features = build_features_from_quote(quote)
+                
+                threshold = get_threshold(features, threshold_mode, manual_threshold, tf)
+                sig, prob, tp, sl, weight_desc = predict_signal_from_features(features, tf)
+                prob = float(prob)
+                
+                if sig and prob >= threshold:
+                    rec = {
+                        "coin": coin_symbol,
+                        "symbol": coin_symbol,
+                        "signal_type": sig,
+                        "probability": prob,
+                        "confidence_score": int(prob),
+                        "threshold_used": threshold,
+                        "timeframe": tf,
+                        "features": features,
+                        "stop_loss": sl,
+                        "tp": tp,
+                        "created_at": datetime.now(timezone.utc)  # datetime object olmalı
+                    }
                     
-                except Exception as e:
-                    logger.error(f"[{timeframe}] {cs.get('coin', 'UNKNOWN')} analiz hatası: {e}")
+                    await insert_signal_record(rec)
+                    msg = format_signal_message(rec)
+                    await send_telegram_message_async(msg)
+                    logger.info(f"[{tf}] Sinyal: {coin_symbol} {sig} (prob={prob:.2f}%, threshold={threshold:.2f}%)")
+                
+            except Exception as e:
+                logger.error(f"[{timeframe}] {cs.get('coin', 'UNKNOWN')} analiz hatası: {e}")
         
-        tasks = [handle_coin(cs) for cs in coin_settings]
-        await asyncio.gather(*tasks)
+    tasks = [handle_coin(cs) for cs in coin_settings]
+    await asyncio.gather(*tasks)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,128 @@
+# backend/bench_indicators.py
+"""
+Gösterge kernel benchmark'ı
+Eski eleman eleman Python döngüleri ile indicator_kernels'ın vektörize
+serilerini aynı sentetik fiyat serisi üzerinde karşılaştırır: süre ve
+en büyük mutlak fark (sayısal parite).
+
+Kullanım:
+    python bench_indicators.py --points 50 1000 100000 --repeat 5
+"""
+import time
+import argparse
+from typing import Callable, List
+
+import numpy as np
+
+from indicator_kernels import ema_series, macd_series, rsi_series, volatility_series
+
+
+# ---- Referans (eski) döngüler: tam seri döndürecek şekilde ----
+
+def reference_ema(prices: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(len(prices), np.nan)
+    if len(prices) < period:
+        return out
+    multiplier = 2 / (period + 1)
+    ema = np.mean(prices[:period])
+    out[period - 1] = ema
+    for i in range(period, len(prices)):
+        ema = (prices[i] - ema) * multiplier + ema
+        out[i] = ema
+    return out
+
+
+def reference_rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    out = np.full(len(prices), np.nan)
+    if len(prices) < period + 1:
+        return out
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = np.mean(gains[:period])
+    avg_loss = np.mean(losses[:period])
+    out[period] = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        out[i + 1] = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+    return out
+
+
+def reference_macd(prices: np.ndarray) -> np.ndarray:
+    def calculate_ema(data, period):
+        multiplier = 2 / (period + 1)
+        ema = [data[0]]
+        for price in data[1:]:
+            ema.append((price - ema[-1]) * multiplier + ema[-1])
+        return np.array(ema)
+
+    macd_line = calculate_ema(prices, 12) - calculate_ema(prices, 26)
+    signal_line = calculate_ema(macd_line, 9)
+    return macd_line - signal_line
+
+
+def reference_volatility(prices: np.ndarray, window: int = 20) -> np.ndarray:
+    out = np.full(len(prices), np.nan)
+    for i in range(window - 1, len(prices)):
+        chunk = prices[i - window + 1:i + 1]
+        mean = np.mean(chunk)
+        out[i] = (np.std(chunk) / mean) * 100 if mean > 0 else 0
+    return out
+
+
+# ---- Benchmark ----
+
+def synthetic_prices(points: int, seed: int = 42) -> np.ndarray:
+    """Random-walk fiyat serisi (pozitif)"""
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, points)))
+
+
+def _best_time(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _max_diff(a: np.ndarray, b: np.ndarray) -> float:
+    mask = ~(np.isnan(a) & np.isnan(b))
+    if not mask.any():
+        return 0.0
+    return float(np.nanmax(np.abs(a[mask] - b[mask])))
+
+
+CASES = [
+    ("ema200", lambda p: reference_ema(p, 200), lambda p: ema_series(p, 200)),
+    ("ema9", lambda p: reference_ema(p, 9), lambda p: ema_series(p, 9)),
+    ("rsi14", reference_rsi, rsi_series),
+    ("macd_hist", reference_macd, lambda p: macd_series(p)[2]),
+    ("volatility20", reference_volatility, volatility_series),
+]
+
+
+def run(points_list: List[int], repeat: int):
+    print(f"{'seri':<14}{'nokta':>10}{'döngü (ms)':>14}{'vektör (ms)':>14}{'hızlanma':>11}{'max fark':>13}")
+    for points in points_list:
+        prices = synthetic_prices(points)
+        for name, reference, kernel in CASES:
+            diff = _max_diff(reference(prices), kernel(prices))
+            t_ref = _best_time(lambda: reference(prices), repeat)
+            t_vec = _best_time(lambda: kernel(prices), repeat)
+            print(f"{name:<14}{points:>10}{t_ref * 1000:>14.3f}{t_vec * 1000:>14.3f}"
+                  f"{t_ref / t_vec:>10.1f}x{diff:>13.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gösterge kernel benchmark'ı")
+    parser.add_argument("--points", type=int, nargs="+", default=[50, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.points, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
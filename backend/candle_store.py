@@ -0,0 +1,381 @@
+# backend/candle_store.py
+"""
+Ingest sırasında güncellenen OHLCV candle'lar
+Her fiyat noktası, yapılandırılmış her interval (15m, 1h, 4h, 12h, 24h) için
+açık candle'ı günceller; değişen candle'lar price_writer flush'ında toplu
+upsert edilir. Candle analizi her tick'te 7 günlük ham veriyi taramak
+yerine hazır candle close'larını okur.
+"""
+import os
+import math
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from candle_aggregator import parse_interval_to_minutes
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+CANDLE_INTERVALS = [i.strip() for i in os.getenv("CANDLE_INTERVALS", "15m,1h,4h,12h,24h").split(",") if i.strip()]
+# Bellekte ve analizde kullanılan candle geçmişi (saat)
+CANDLE_HISTORY_HOURS = int(os.getenv("CANDLE_HISTORY_HOURS", "168"))
+CANDLE_RETENTION_DAYS = int(os.getenv("CANDLE_RETENTION_DAYS", "90"))
+
+
+def _to_epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _to_datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def ensure_indexes(db=None):
+    """MongoDB candles collection indexleri (coin+interval+start ve retention TTL)"""
+    from pymongo.errors import OperationFailure
+    if db is None:
+        from db_mongodb import get_db
+        db = get_db()
+    db.candles.create_index([("coin", 1), ("interval", 1), ("start", -1)])
+    ttl_seconds = CANDLE_RETENTION_DAYS * 86400
+    try:
+        db.candles.create_index([("start", 1)], expireAfterSeconds=ttl_seconds)
+    except OperationFailure:
+        db.command("collMod", "candles",
+                   index={"keyPattern": {"start": 1}, "expireAfterSeconds": ttl_seconds})
+
+
+class CandleStore:
+    """
+    Coin/interval bazlı açık ve kapanmış candle'lar
+    Event loop (update) ve db_async thread havuzu (hydrate, scanner okumaları)
+    aynı anda eriştiği için durum kilitlidir. Okumalar DB'ye gitmez: yüklenmemiş
+    seriler için None döner; yükleme başlangıçta ve gerektiğinde havuzda yapılır.
+    """
+
+    def __init__(self, intervals: List[str] = None, history_hours: int = CANDLE_HISTORY_HOURS):
+        self.history_hours = history_hours
+        self.intervals: Dict[str, int] = {}
+        for interval in intervals or CANDLE_INTERVALS:
+            minutes = parse_interval_to_minutes(interval)
+            if minutes > 0:
+                self.intervals[interval] = minutes * 60
+        self._open: Dict[Tuple[str, str], dict] = {}
+        # Kapanmış candle'lar: (start, close, high, low, volume_24h)
+        self._closed: Dict[Tuple[str, str], Deque[Tuple[float, float, float, float, float]]] = {}
+        self._dirty: Dict[Tuple[str, str, float], dict] = {}
+        # Depolamadan yüklenmiş seriler
+        self._loaded: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self.stats = {"updates": 0, "hydrated": 0, "written": 0, "reads": 0, "not_loaded": 0}
+
+    def supports(self, interval: Optional[str]) -> bool:
+        return bool(interval) and interval in self.intervals
+
+    def is_loaded(self, coin: str, interval: str) -> bool:
+        return (coin, interval) in self._loaded
+
+    def _series(self, key: Tuple[str, str]) -> Deque[Tuple[float, float, float, float, float]]:
+        """Serinin kapanmış candle'ları, yoksa boş seri (kilit altında)"""
+        closed = self._closed.get(key)
+        if closed is None:
+            closed = deque(maxlen=math.ceil(self.history_hours * 3600 / self.intervals[key[1]]) + 1)
+            self._closed[key] = closed
+        return closed
+
+    def _load(self, coin: str, interval: str) -> Tuple[List[tuple], Optional[dict]]:
+        """Coin/interval'in son candle'ları depolamadan (kapanmışlar, açık candle); durum değişmez"""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.history_hours)
+        docs = get_storage().find_candles(coin, interval, cutoff)
+        if not docs:
+            return [], None
+        closed = [(_to_epoch(doc["start"]), doc["close"], doc["high"], doc["low"], doc.get("volume_24h") or 0)
+                  for doc in docs[:-1]]
+        last = docs[-1]
+        return closed, {
+            "start": _to_epoch(last["start"]),
+            "open": last["open"], "high": last["high"], "low": last["low"], "close": last["close"],
+            "volume_24h": last.get("volume_24h", 0), "ticks": last.get("ticks", 0),
+        }
+
+    def _install(self, coin: str, interval: str, closed: List[tuple], open_candle: Optional[dict],
+                 overlapping: bool = False):
+        """
+        Yüklenen/yeniden oluşturulan candle'ları seriye yerleştir (kilit altında)
+        Bu aralığın dışındaki candle'lar (daha eski veya bu sırada canlı güncellemeyle
+        oluşmuş daha yeni) korunur; aynı başlangıçlı candle ile birleştirilir.
+
+        Args:
+            closed: Kapanmış candle'lar (eskiden yeniye)
+            open_candle: Son candle (closed boşsa None olabilir)
+            overlapping: Yeni candle'lar bellekteki tick'leri de içeriyor (backfill); tick sayıları toplanmaz
+        """
+        key = (coin, interval)
+        series = self._series(key)
+        if open_candle is None:
+            return
+        start = open_candle["start"]
+        first = closed[0][0] if closed else start
+        live_open = self._open.get(key)
+        candles = {c[0]: c for c in series if not first <= c[0] < start}
+        candles.update((c[0], c) for c in closed)
+
+        merged = None
+        live_same = candles.get(start)
+        if live_open is not None and live_open["start"] == start:
+            # Canlı candle daha yeni tick'leri içerir: açılış ve aralık yüklenenle tamamlanır
+            live_open["open"] = open_candle["open"]
+            live_open["high"] = max(live_open["high"], open_candle["high"])
+            live_open["low"] = min(live_open["low"], open_candle["low"])
+            if overlapping:
+                live_open["ticks"] = max(live_open["ticks"], open_candle["ticks"])
+            else:
+                live_open["ticks"] += open_candle["ticks"]
+            current = merged = live_open
+        elif live_same is not None:
+            # Canlı güncellemede bu candle zaten kapanmış
+            candles[start] = (start, live_same[1], max(live_same[2], open_candle["high"]),
+                              min(live_same[3], open_candle["low"]), live_same[4])
+            merged = {**open_candle, "close": live_same[1], "high": candles[start][2],
+                      "low": candles[start][3], "volume_24h": live_same[4]}
+            current = live_open
+        elif live_open is None or live_open["start"] < start:
+            if live_open is not None:
+                candles[live_open["start"]] = (live_open["start"], live_open["close"], live_open["high"],
+                                               live_open["low"], live_open["volume_24h"])
+            current = open_candle
+        else:
+            candles[start] = (start, open_candle["close"], open_candle["high"],
+                              open_candle["low"], open_candle["volume_24h"])
+            current = live_open
+
+        series.clear()
+        series.extend(candles[s] for s in sorted(candles))
+        self._open[key] = current
+        if merged is not None:
+            # DB'deki (yarım) candle birleştirilmiş haliyle tekrar yazılsın
+            self._dirty[(coin, interval, start)] = merged
+
+    def hydrate(self, coins: Iterable[str]):
+        """
+        Coinlerin yüklenmemiş serilerini depolamadan yükle
+        Başlangıçta ve gerektiğinde db_async.run_db ile çağrılır (DB okuması kilit dışında);
+        bu sırada gelen canlı güncellemeler korunur.
+        """
+        count = 0
+        for coin in coins:
+            for interval in self.intervals:
+                key = (coin, interval)
+                if key in self._loaded:
+                    continue
+                try:
+                    closed, open_candle = self._load(coin, interval)
+                except Exception as e:
+                    # Yüklenmemiş kalır, sonraki hydrate tekrar dener
+                    logger.error(f"❌ [{coin}] Candle yükleme hatası ({interval}): {e}")
+                    continue
+                with self._lock:
+                    if key in self._loaded:
+                        continue
+                    self._install(coin, interval, closed, open_candle)
+                    self._loaded.add(key)
+                self.stats["hydrated"] += 1
+                count += 1
+        if count:
+            logger.info(f"🕯 Candle'lar yüklendi: {count} seri")
+
+    def update(self, coin: str, ts: datetime, price: float, volume_24h: float = 0):
+        """Fiyat noktasıyla tüm interval'lerin açık candle'ını güncelle (DB'ye gidilmez)"""
+        if not price:
+            return
+        epoch = _to_epoch(ts)
+        with self._lock:
+            for interval, seconds in self.intervals.items():
+                key = (coin, interval)
+                closed = self._series(key)
+                start = epoch - epoch % seconds
+                candle = self._open.get(key)
+                if candle is not None and start < candle["start"]:
+                    continue  # Sırası geçmiş nokta
+                if candle is None or start > candle["start"]:
+                    if candle is not None:
+                        closed.append((candle["start"], candle["close"], candle["high"],
+                                       candle["low"], candle["volume_24h"]))
+                    candle = {"start": start, "open": price, "high": price, "low": price,
+                              "close": price, "volume_24h": volume_24h, "ticks": 0}
+                    self._open[key] = candle
+                else:
+                    candle["high"] = max(candle["high"], price)
+                    candle["low"] = min(candle["low"], price)
+                    candle["close"] = price
+                    candle["volume_24h"] = volume_24h
+                candle["ticks"] += 1
+                self._dirty[(coin, interval, start)] = candle
+        self.stats["updates"] += 1
+
+    def take_dirty(self) -> List[dict]:
+        """Yazılacak candle'ların kopyası (event loop'ta alınır, thread'de yazılır)"""
+        with self._lock:
+            dirty = [{"coin": coin, "interval": interval, **candle}
+                     for (coin, interval, _), candle in self._dirty.items()]
+            self._dirty = {}
+        return dirty
+
+    def restore_dirty(self, candles: List[dict]):
+        """Yazılamayan candle'ları tekrar kuyruğa al (daha yeni bir hali yoksa)"""
+        with self._lock:
+            for c in candles:
+                key = (c["coin"], c["interval"], c["start"])
+                if key not in self._dirty:
+                    self._dirty[key] = {k: v for k, v in c.items() if k not in ("coin", "interval")}
+
+    def write(self, candles: List[dict]):
+        """take_dirty çıktısını tek toplu yazımla upsert et"""
+        if not candles:
+            return
+        self.stats["written"] += get_storage().upsert_candles(
+            [{**c, "start": _to_datetime(int(c["start"]))} for c in candles])
+
+    def _window(self, coin: str, interval: str, hours: int = None) -> Optional[List[tuple]]:
+        """Son hours saatin candle'ları, son eleman açık candle (kilit altında; yüklenmemişse None)"""
+        key = (coin, interval)
+        if key not in self._loaded:
+            self.stats["not_loaded"] += 1
+            return None
+        hours = min(hours or self.history_hours, self.history_hours)
+        cutoff = datetime.now(timezone.utc).timestamp() - hours * 3600
+        candles = [c for c in self._closed[key] if c[0] >= cutoff]
+        candle = self._open.get(key)
+        if candle is not None:
+            candles.append((candle["start"], candle["close"], candle["high"], candle["low"], candle["volume_24h"]))
+        self.stats["reads"] += 1
+        return candles
+
+    def get_closes(self, coin: str, interval: str, hours: int = None) -> Optional[List[float]]:
+        """
+        Candle close fiyatları (eskiden yeniye, son eleman açık candle)
+
+        Returns:
+            Close listesi veya interval desteklenmiyorsa/seri yüklenmemişse None
+        """
+        if not self.supports(interval):
+            return None
+        with self._lock:
+            candles = self._window(coin, interval, hours)
+        return [c[1] for c in candles] if candles is not None else None
+
+    def get_ohlcv(self, coin: str, interval: str, hours: int = None) -> Optional[Dict[str, List[float]]]:
+        """
+        Candle close/high/low/hacim serileri (get_closes ile aynı candle'lar, son eleman açık candle)
+        Hacim olarak CMC'nin volume_24h değeri kullanılır.
+
+        Returns:
+            {"close": [...], "high": [...], "low": [...], "volume": [...]} veya
+            interval desteklenmiyorsa/seri yüklenmemişse None
+        """
+        if not self.supports(interval):
+            return None
+        with self._lock:
+            candles = self._window(coin, interval, hours)
+        if candles is None:
+            return None
+        return {
+            "close": [c[1] for c in candles],
+            "high": [c[2] for c in candles],
+            "low": [c[3] for c in candles],
+            "volume": [c[4] or 0.0 for c in candles],
+        }
+
+    def closed_after(self, coin: str, interval: str, start: float) -> Optional[Tuple[List[tuple], Optional[tuple]]]:
+        """
+        start'tan (epoch) sonra kapanmış candle'lar ve açık candle
+
+        Returns:
+            ([(start, close, high, low, volume_24h), ...] eskiden yeniye, açık candle aynı formatta veya None)
+            veya interval desteklenmiyorsa/seri yüklenmemişse None
+        """
+        if not self.supports(interval):
+            return None
+        key = (coin, interval)
+        with self._lock:
+            if key not in self._loaded:
+                self.stats["not_loaded"] += 1
+                return None
+            closed = []
+            for c in reversed(self._closed[key]):
+                if c[0] <= start:
+                    break
+                closed.append(c)
+            candle = self._open.get(key)
+            open_candle = None if candle is None else (
+                candle["start"], candle["close"], candle["high"], candle["low"], candle["volume_24h"])
+        closed.reverse()
+        return closed, open_candle
+
+    def build_candles(self, coin: str, price_data: List[dict]) -> List[dict]:
+        """
+        Ham fiyat geçmişinden candle'lar (durum değişmez; havuzda çağrılabilir)
+
+        Args:
+            price_data: [{"price": float, "timestamp": datetime, "volume_24h": float?}, ...]
+
+        Returns:
+            write formatında candle'lar (interval başına eskiden yeniye)
+        """
+        candles: Dict[Tuple[str, float], dict] = {}
+        for point in sorted(price_data, key=lambda p: p["timestamp"]):
+            price = point.get("price")
+            if not price:
+                continue
+            epoch = _to_epoch(point["timestamp"])
+            for interval, seconds in self.intervals.items():
+                start = epoch - epoch % seconds
+                candle = candles.get((interval, start))
+                if candle is None:
+                    candles[(interval, start)] = {
+                        "coin": coin, "interval": interval, "start": start, "open": price, "high": price,
+                        "low": price, "close": price, "volume_24h": point.get("volume_24h", 0), "ticks": 1,
+                    }
+                else:
+                    candle["high"] = max(candle["high"], price)
+                    candle["low"] = min(candle["low"], price)
+                    candle["close"] = price
+                    candle["volume_24h"] = point.get("volume_24h", 0)
+                    candle["ticks"] += 1
+        return list(candles.values())
+
+    def replace(self, coin: str, candles: List[dict]):
+        """
+        build_candles çıktısını bellekteki serilere uygula (örn. geçmiş veri import'u sonrası)
+        Seriler depolamadan tekrar okunmadan doğrudan yeniden kurulur; bu sırada canlı
+        güncellemeyle oluşan daha yeni candle'lar korunur.
+        """
+        by_interval: Dict[str, List[dict]] = {}
+        for c in candles:
+            by_interval.setdefault(c["interval"], []).append(
+                {k: v for k, v in c.items() if k not in ("coin", "interval")})
+        with self._lock:
+            for interval, series in by_interval.items():
+                if interval not in self.intervals:
+                    continue
+                closed = [(c["start"], c["close"], c["high"], c["low"], c["volume_24h"]) for c in series[:-1]]
+                self._install(coin, interval, closed, series[-1], overlapping=True)
+        logger.info(f"🕯 [{coin}] {len(candles)} candle yeniden oluşturuldu")
+
+    def get_status(self) -> dict:
+        return {
+            "intervals": list(self.intervals.keys()),
+            "series": len(self._closed),
+            "loaded": len(self._loaded),
+            "dirty": len(self._dirty),
+            **self.stats,
+        }
+
+
+# Global instance
+candle_store = CandleStore()
@@ -0,0 +1,126 @@
+# backend/circuit_breaker.py
+"""
+Host bazlı circuit breaker
+Upstream (CMC vb.) art arda hata verdiğinde tüm çağıranlar için istekleri
+geçici olarak keser (closed → open → half_open → closed)
+"""
+import os
+import time
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Circuit açıkken yapılan istek reddedildi"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit açık: {host} ({retry_in:.0f}s sonra tekrar denenecek)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Tek bir host için breaker durumu"""
+
+    def __init__(self, host: str,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self.stats = {"trips": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def before_request(self):
+        """
+        İstekten önce çağrılır
+
+        Raises:
+            CircuitOpenError: Circuit açıksa veya half-open probe zaten devam ediyorsa
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now < self.open_until:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.host, self.open_until - now)
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"🟡 [{self.host}] Circuit half-open, deneme isteğine izin veriliyor")
+
+        if self.state == HALF_OPEN:
+            # Sonuçlanmayan probe reset_seconds sonra zaman aşımına uğrar, yeni probe'a izin verilir
+            if self._probe_in_flight and now - self._probe_started < self.reset_seconds:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.host, self._probe_started + self.reset_seconds - now)
+            self._probe_in_flight = True
+            self._probe_started = now
+
+    def release_probe(self):
+        """İstek record_* çağrılmadan bittiyse (iptal, parse hatası) probe slot'unu bırak"""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        """Başarılı yanıt"""
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info(f"🟢 [{self.host}] Circuit kapandı")
+        self.state = CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Başarısız yanıt (timeout, 5xx, 429)"""
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip(self.reset_seconds)
+
+    def trip(self, seconds: float):
+        """Circuit'i belirtilen süre için aç (örn. Retry-After süresi)"""
+        now = time.monotonic()
+        if self.state != OPEN or now + seconds > self.open_until:
+            self.open_until = now + seconds
+        if self.state != OPEN:
+            self.stats["trips"] += 1
+            logger.warning(f"🔴 [{self.host}] Circuit açıldı ({seconds:.0f}s, {self.consecutive_failures} ardışık hata)")
+        self.state = OPEN
+        self._probe_in_flight = False
+
+    def get_status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": round(max(0.0, self.open_until - time.monotonic()), 1) if self.state == OPEN else 0,
+            **self.stats,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """Host için paylaşılan breaker'ı döndür"""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(host)
+        _breakers[host] = breaker
+    return breaker
+
+
+def get_breaker_stats() -> dict:
+    """Tüm host'ların breaker durumu"""
+    return {host: breaker.get_status() for host, breaker in _breakers.items()}
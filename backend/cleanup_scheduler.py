@@ -9,8 +9,9 @@ import asyncio
 import schedule
 import time
 from datetime import datetime, timezone, timedelta
-from db import SessionLocal, SignalHistory
+from storage import SIGNALS, get_storage
 # from price_tracker import PriceTracker  # DEVRE DIȘI - Coin-based fetch kullanıyoruz
+from db_async import run_db
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,43 +28,26 @@ class CleanupScheduler:
         """
         logger.info("🧹 Günlük temizlik başlatılıyor...")
         
-        db = SessionLocal()
+        storage = get_storage()
         try:
             # 1. SL'e takılanları sil
-            failed_signals = db.query(SignalHistory).filter(
-                SignalHistory.success == False
-            ).all()
-            
-            if failed_signals:
-                failed_ids = [s.id for s in failed_signals]
-                db.query(SignalHistory).filter(
-                    SignalHistory.id.in_(failed_ids)
-                ).delete(synchronize_session=False)
-                db.commit()
-                logger.info(f"❌ {len(failed_signals)} başarısız sinyal silindi")
+            failed_count = await run_db(storage.delete, SIGNALS, {"success": False})
+            if failed_count:
+                logger.info(f"❌ {failed_count} başarısız sinyal silindi")
             
             # 2. 7 günden eski pending sinyalleri sil
             seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-            old_pending = db.query(SignalHistory).filter(
-                SignalHistory.success == None,
-                SignalHistory.created_at < seven_days_ago
-            ).all()
-            
-            if old_pending:
-                old_ids = [s.id for s in old_pending]
-                db.query(SignalHistory).filter(
-                    SignalHistory.id.in_(old_ids)
-                ).delete(synchronize_session=False)
-                db.commit()
-                logger.info(f"⏰ {len(old_pending)} eski pending sinyal silindi (7 gün)")
+            old_pending_count = await run_db(storage.delete, SIGNALS, {
+                "success": None,
+                "created_at": {"$lt": seven_days_ago}
+            })
+            if old_pending_count:
+                logger.info(f"⏰ {old_pending_count} eski pending sinyal silindi (7 gün)")
             
             logger.info("✅ Günlük temizlik tamamlandı")
             
         except Exception as e:
             logger.error(f"Günlük temizlik hatası: {e}")
-            db.rollback()
-        finally:
-            db.close()
     
     async def monthly_cleanup(self):
         """
@@ -73,24 +57,21 @@ class CleanupScheduler:
         """
         logger.info("🗓 Aylık temizlik başlatılıyor...")
         
-        db = SessionLocal()
+        storage = get_storage()
         try:
             # 28 günden eski başarılı sinyaller
             twenty_eight_days_ago = datetime.now(timezone.utc) - timedelta(days=28)
-            old_successful = db.query(SignalHistory).filter(
-                SignalHistory.success == True,
-                SignalHistory.created_at < twenty_eight_days_ago
-            ).order_by(SignalHistory.reward.desc()).all()
+            old_successful = await run_db(storage.find, SIGNALS, {
+                "success": True,
+                "created_at": {"$lt": twenty_eight_days_ago}
+            }, sort=[("reward", -1)])
             
             if len(old_successful) > 100:
                 # Top 100 hariç geri kalanı sil
                 to_delete = old_successful[100:]
-                delete_ids = [s.id for s in to_delete]
+                delete_ids = [s["id"] for s in to_delete]
                 
-                db.query(SignalHistory).filter(
-                    SignalHistory.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-                db.commit()
+                await run_db(storage.delete, SIGNALS, {"id": {"$in": delete_ids}})
                 
                 logger.info(f"🏆 Top 100 başarılı sinyal korundu")
                 logger.info(f"🗑 {len(to_delete)} eski başarılı sinyal silindi")
@@ -101,9 +82,6 @@ class CleanupScheduler:
             
         except Exception as e:
             logger.error(f"Aylık temizlik hatası: {e}")
-            db.rollback()
-        finally:
-            db.close()
     
     def check_missed_cleanup(self):
         """
@@ -1,52 +1,264 @@
 # backend/cmc_client.py
-import time, asyncio, aiohttp
+import time, asyncio, aiohttp, random
 from aiolimiter import AsyncLimiter
-from typing import Dict
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 import os
+import logging
+from credit_budget import credit_budget
+from circuit_breaker import get_breaker, OPEN as CIRCUIT_OPEN
+
+logger = logging.getLogger(__name__)
+
+# Yük testlerinde cmc_replay.py sunucusuna yönlendirmek için değiştirilebilir
+CMC_BASE_URL = os.getenv("CMC_BASE_URL", "https://pro-api.coinmarketcap.com")
 
 # Free tier typical limit: 30 req / min (configure via env if needed)
-CMC_RATE_LIMIT = 30
+CMC_RATE_LIMIT = int(os.getenv("CMC_RATE_LIMIT", "30"))
 limiter = AsyncLimiter(CMC_RATE_LIMIT, 60)
 
+# quotes/latest tek istekte kabul edilen sembol sayısı ve URL uzunluğu limitleri
+CMC_MAX_SYMBOLS_PER_REQUEST = int(os.getenv("CMC_MAX_SYMBOLS_PER_REQUEST", "100"))
+CMC_MAX_SYMBOL_PARAM_LENGTH = int(os.getenv("CMC_MAX_SYMBOL_PARAM_LENGTH", "1500"))
+
+# Retry / backoff ayarları
+CMC_MAX_RETRIES = int(os.getenv("CMC_MAX_RETRIES", "3"))
+CMC_BACKOFF_BASE = float(os.getenv("CMC_BACKOFF_BASE", "1.0"))
+CMC_BACKOFF_MAX = float(os.getenv("CMC_BACKOFF_MAX", "30"))
+# Bundan uzun Retry-After değerlerinde istek içinde beklenmez, circuit açılır
+CMC_MAX_RETRY_AFTER = float(os.getenv("CMC_MAX_RETRY_AFTER", "60"))
+
+request_stats = {
+    "requests": 0,
+    "retries": 0,
+    "rate_limited": 0,
+    "server_errors": 0,
+    "network_errors": 0,
+    "failures": 0,
+}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff + jitter (saniye)"""
+    delay = min(CMC_BACKOFF_MAX, CMC_BACKOFF_BASE * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After başlığını saniyeye çevir (saniye veya HTTP tarih formatı)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Paylaşılan cache ayarları (saniye / kayıt sayısı)
+CMC_QUOTE_CACHE_TTL = float(os.getenv("CMC_QUOTE_CACHE_TTL", "10"))
+CMC_LISTINGS_CACHE_TTL = float(os.getenv("CMC_LISTINGS_CACHE_TTL", "60"))
+CMC_CACHE_MAX_ENTRIES = int(os.getenv("CMC_CACHE_MAX_ENTRIES", "2048"))
+
+
+class TTLCache:
+    """Boyutu sınırlı LRU + TTL cache (tüm CMCClient çağrıları arasında paylaşılır)"""
+
+    def __init__(self, max_entries: int = CMC_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict" = OrderedDict()
+
+    def get(self, key, ttl: float):
+        """TTL içindeyse değeri döndür, yoksa None"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at >= ttl:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.time(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _FetchCancelled(Exception):
+    """Single-flight isteğinin sahibi iptal edildi; bekleyenlerden biri isteği yeniden başlatır"""
+
+
+_shared_cache = TTLCache()
+_inflight: Dict[tuple, asyncio.Future] = {}
+cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+
 class CMCClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
         self.api_key = api_key
-        self.base = "https://pro-api.coinmarketcap.com"
-        self._cache: Dict = {}
+        self.base = (base_url or CMC_BASE_URL).rstrip("/")
+        self._cache = _shared_cache
 
     async def _request(self, session: aiohttp.ClientSession, path: str, params=None):
-        async with limiter:
-            url = f"{self.base}{path}"
-            headers = {"X-CMC_PRO_API_KEY": self.api_key}
+        """
+        CMC isteği: 429/5xx/timeout için exponential backoff + jitter ile tekrar dener,
+        Retry-After başlığına uyar ve host bazlı circuit breaker'ı günceller
+
+        Raises:
+            CircuitOpenError: CMC circuit'i açıksa (istek atılmaz)
+            aiohttp.ClientResponseError: Tekrar denenmeyen 4xx hataları
+        """
+        url = f"{self.base}{path}"
+        headers = {"X-CMC_PRO_API_KEY": self.api_key}
+        breaker = get_breaker(urlparse(self.base).netloc)
+
+        for attempt in range(CMC_MAX_RETRIES + 1):
+            breaker.before_request()
+            request_stats["requests"] += 1
+            retry_after = None
             try:
-                async with session.get(url, headers=headers, params=params, timeout=20) as resp:
-                    resp.raise_for_status()
-                    return await resp.json()
-            except Exception as e:
-                # simple retry strategy
-                await asyncio.sleep(1)
-                async with session.get(url, headers=headers, params=params, timeout=20) as resp:
-                    resp.raise_for_status()
-                    return await resp.json()
+                # Limiter slot'u sadece istek süresince tutulur, backoff beklemesi dışarıda
+                async with limiter:
+                    async with session.get(url, headers=headers, params=params, timeout=20) as resp:
+                        if resp.status == 429 or resp.status >= 500:
+                            retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                        resp.raise_for_status()
+                        data = await resp.json()
+                breaker.record_success()
+                break
+            except aiohttp.ClientResponseError as e:
+                if e.status == 429:
+                    request_stats["rate_limited"] += 1
+                elif e.status >= 500:
+                    request_stats["server_errors"] += 1
+                else:
+                    # Diğer 4xx: istek hatalı, upstream sağlıklı - tekrar deneme
+                    breaker.record_success()
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                request_stats["network_errors"] += 1
+                error = e
+            except BaseException:
+                # İptal (CancelledError) veya beklenmeyen hata: half-open probe slot'u takılı kalmasın
+                breaker.release_probe()
+                raise
+
+            breaker.record_failure()
+            if retry_after is not None and retry_after > CMC_MAX_RETRY_AFTER:
+                # Uzun Retry-After: loop'ları bekletmek yerine circuit'i o süre için aç
+                breaker.trip(retry_after)
+                raise error
+            if attempt >= CMC_MAX_RETRIES or breaker.state == CIRCUIT_OPEN:
+                request_stats["failures"] += 1
+                raise error
+
+            delay = retry_after if retry_after is not None else _backoff_delay(attempt)
+            request_stats["retries"] += 1
+            logger.warning(f"⚠️ CMC isteği başarısız ({error}), {delay:.1f}s sonra tekrar denenecek ({attempt + 1}/{CMC_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+        # Kredi bütçesi takibi
+        credit_budget.record((data.get("status") or {}).get("credit_count", 0))
+        return data
+
+    async def _cached(self, key: tuple, ttl: float, fetch):
+        """
+        Cache + single-flight: aynı anahtar için eşzamanlı çağıranlar tek isteği bekler
+
+        Args:
+            key: Cache anahtarı
+            ttl: Geçerlilik süresi (saniye)
+            fetch: Cache miss durumunda çağrılacak coroutine fonksiyonu
+        """
+        while True:
+            cached = self._cache.get(key, ttl)
+            if cached is not None:
+                cache_stats["hits"] += 1
+                return cached
+
+            inflight = _inflight.get(key)
+            if inflight is None:
+                break
+            cache_stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _FetchCancelled:
+                # Sahibin iptali bekleyenlere yansımaz: sıradaki isteği kendisi başlatır
+                continue
+
+        cache_stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            data = await fetch()
+            self._cache.set(key, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.set_exception(_FetchCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Bekleyen yoksa "exception never retrieved" uyarısını engelle
+            future.exception()
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    def get_cached_quote(self, symbol: str):
+        """Cache'te taze quote varsa döndür (istek atmaz)"""
+        cached = self._cache.get(("quote", symbol), CMC_QUOTE_CACHE_TTL)
+        if cached is not None:
+            cache_stats["hits"] += 1
+        return cached
 
     async def get_quote(self, session: aiohttp.ClientSession, symbol: str):
-        # simple short cache (10s)
         key = ("quote", symbol)
-        now = time.time()
-        if key in self._cache and now - self._cache[key][0] < 10:
-            return self._cache[key][1]
-        data = await self._request(session, "/v1/cryptocurrency/quotes/latest", params={"symbol": symbol, "convert":"USD"})
-        self._cache[key] = (now, data)
+        return await self._cached(
+            key, CMC_QUOTE_CACHE_TTL,
+            lambda: self._request(session, "/v1/cryptocurrency/quotes/latest", params={"symbol": symbol, "convert":"USD"})
+        )
+
+    async def get_quotes(self, session: aiohttp.ClientSession, symbols: List[str]):
+        """
+        Birden fazla sembol için tek istekte quote çek
+        Her sembolün yanıtı tek sembollük formatta paylaşılan cache'e de yazılır
+        
+        Args:
+            symbols: Coin sembolleri (chunk_symbols ile limitlere bölünmüş olmalı)
+        
+        Returns:
+            CMC yanıtı ({"status": ..., "data": {SYMBOL: {...}, ...}})
+        """
+        params = {"symbol": ",".join(symbols), "convert": "USD", "skip_invalid": "true"}
+        data = await self._request(session, "/v1/cryptocurrency/quotes/latest", params=params)
+        status = data.get("status", {})
+        for symbol, coin_data in (data.get("data") or {}).items():
+            self._cache.set(("quote", symbol), {"status": status, "data": {symbol: coin_data}})
         return data
 
     async def get_listings(self, session: aiohttp.ClientSession, limit=200):
         key = ("listings", limit)
-        now = time.time()
-        if key in self._cache and now - self._cache[key][0] < 60:
-            return self._cache[key][1]
-        data = await self._request(session, "/v1/cryptocurrency/listings/latest", params={"limit": limit})
-        self._cache[key] = (now, data)
-        return data
+        return await self._cached(
+            key, CMC_LISTINGS_CACHE_TTL,
+            lambda: self._request(session, "/v1/cryptocurrency/listings/latest", params={"limit": limit})
+        )
 
     async def get_historical_quotes(self, session: aiohttp.ClientSession, symbol: str, time_start: str, time_end: str, interval: str = "1h"):
         """
@@ -70,4 +282,67 @@ class CMCClient:
         }
         
         data = await self._request(session, "/v2/cryptocurrency/quotes/historical", params=params)
-        return data
\ No newline at end of file
+        return data
+
+_client: Optional[CMCClient] = None
+
+
+def get_cmc_client(api_key: str, base_url: Optional[str] = None) -> CMCClient:
+    """
+    Process genelinde tek CMCClient döndür (API key veya base URL değişirse yeniden oluşturur)
+    
+    Args:
+        api_key: CMC API anahtarı
+        base_url: CMC base URL (varsayılan: CMC_BASE_URL env)
+    
+    Returns:
+        Paylaşılan CMCClient
+    """
+    global _client
+    base = (base_url or CMC_BASE_URL).rstrip("/")
+    if _client is None or _client.api_key != api_key or _client.base != base:
+        _client = CMCClient(api_key, base)
+    return _client
+
+
+def get_cmc_request_stats() -> dict:
+    """İstek, retry ve circuit breaker metrikleri"""
+    from circuit_breaker import get_breaker_stats
+    return {**request_stats, "circuit_breakers": get_breaker_stats()}
+
+
+def get_cmc_stats() -> dict:
+    """Paylaşılan cache istatistikleri (hit / miss / coalesced)"""
+    lookups = cache_stats["hits"] + cache_stats["misses"] + cache_stats["coalesced"]
+    return {
+        **cache_stats,
+        "hit_rate": round((cache_stats["hits"] + cache_stats["coalesced"]) / lookups * 100, 2) if lookups else 0.0,
+        "cache_entries": len(_shared_cache),
+        "inflight": len(_inflight),
+    }
+
+
+def chunk_symbols(symbols: List[str],
+                  max_symbols: int = CMC_MAX_SYMBOLS_PER_REQUEST,
+                  max_length: int = CMC_MAX_SYMBOL_PARAM_LENGTH) -> List[List[str]]:
+    """
+    Sembol listesini CMC sembol sayısı ve URL uzunluğu limitlerine göre böl
+    
+    Returns:
+        Her biri tek istekte gönderilebilecek sembol grupları
+    """
+    chunks = []
+    current = []
+    current_length = 0
+    for symbol in symbols:
+        added_length = len(symbol) + (1 if current else 0)
+        if current and (len(current) >= max_symbols or current_length + added_length > max_length):
+            chunks.append(current)
+            current = []
+            current_length = 0
+            added_length = len(symbol)
+        current.append(symbol)
+        current_length += added_length
+    if current:
+        chunks.append(current)
+    return chunks
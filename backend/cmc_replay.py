@@ -0,0 +1,270 @@
+# backend/cmc_replay.py
+"""
+CoinMarketCap replay sunucusu (yük testi için)
+quotes/latest, listings/latest ve quotes/historical uçlarını kayıtlı
+yanıtlardan veya sentetik veriden, ayarlanabilir gecikme ve hata oranıyla sunar.
+Gerçek CMC kredisi harcamadan 1000+ coin ile pipeline testi yapılabilir.
+
+Kullanım:
+    python cmc_replay.py --port 8765 --latency-ms 80 --error-rate 0.01
+    CMC_BASE_URL=http://127.0.0.1:8765 CMC_RATE_LIMIT=100000 uvicorn server:app
+
+Kayıt dizini (--record-dir) formatı:
+    quotes_latest.json            - CMC quotes/latest yanıtı (istenen semboller buradan seçilir)
+    listings_latest.json          - CMC listings/latest yanıtı
+    quotes_historical/<SYM>.json  - CMC quotes/historical yanıtı
+Kayıtta bulunmayan semboller için sentetik veri üretilir.
+"""
+import os
+import json
+import math
+import random
+import asyncio
+import logging
+import argparse
+import hashlib
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Sentetik quote'ların last_updated değeri bu periyotta değişir (CMC ~60s)
+SYNTHETIC_REFRESH_SECONDS = 60
+HISTORICAL_INTERVAL_SECONDS = {
+    "5m": 300, "10m": 600, "15m": 900, "30m": 1800, "1h": 3600, "2h": 7200,
+    "6h": 21600, "12h": 43200, "24h": 86400, "1d": 86400, "7d": 604800,
+    "14d": 1209600, "30d": 2592000,
+}
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_iso(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class SyntheticMarket:
+    """Sembol başına deterministik random-walk fiyat üreticisi"""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    def _symbol_seed(self, symbol: str) -> int:
+        digest = hashlib.md5(f"{self.seed}:{symbol}".encode()).hexdigest()
+        return int(digest[:8], 16)
+
+    def base_price(self, symbol: str) -> float:
+        # 0.001$ - 50.000$ arası log-uniform başlangıç fiyatı
+        rnd = random.Random(self._symbol_seed(symbol))
+        return 10 ** rnd.uniform(-3, 4.7)
+
+    def price_at(self, symbol: str, ts: float) -> float:
+        """Zaman adımına göre deterministik fiyat (aynı ts için hep aynı değer)"""
+        step = int(ts // SYNTHETIC_REFRESH_SECONDS)
+        rnd = random.Random(self._symbol_seed(symbol) ^ step)
+        # Yavaş trend + adım bazlı gürültü
+        trend = math.sin(step / 240.0 + self._symbol_seed(symbol) % 100) * 0.05
+        noise = rnd.gauss(0, 0.004)
+        return self.base_price(symbol) * (1 + trend + noise)
+
+    def coin(self, symbol: str, now: float, rank: int = 1) -> dict:
+        """CMC quotes/latest formatında tek coin kaydı"""
+        updated = (now // SYNTHETIC_REFRESH_SECONDS) * SYNTHETIC_REFRESH_SECONDS
+        price = self.price_at(symbol, updated)
+
+        def change(seconds: float) -> float:
+            past = self.price_at(symbol, updated - seconds)
+            return (price - past) / past * 100
+
+        supply = 1e9 / max(self.base_price(symbol), 1e-6) ** 0.5
+        market_cap = price * supply
+        return {
+            "id": self._symbol_seed(symbol) % 100000,
+            "name": symbol.title(),
+            "symbol": symbol,
+            "slug": symbol.lower(),
+            "cmc_rank": rank,
+            "circulating_supply": supply,
+            "last_updated": _iso(updated),
+            "quote": {
+                "USD": {
+                    "price": price,
+                    "volume_24h": market_cap * 0.05,
+                    "volume_change_24h": change(86400) / 2,
+                    "percent_change_1h": change(3600),
+                    "percent_change_24h": change(86400),
+                    "percent_change_7d": change(604800),
+                    "percent_change_30d": change(2592000),
+                    "percent_change_60d": change(5184000),
+                    "percent_change_90d": change(7776000),
+                    "market_cap": market_cap,
+                    "market_cap_dominance": 0.0,
+                    "fully_diluted_market_cap": market_cap * 1.2,
+                    "last_updated": _iso(updated),
+                }
+            },
+        }
+
+
+class ReplayServer:
+    """CMC uçlarını taklit eden aiohttp uygulaması"""
+
+    def __init__(self, record_dir: Optional[str] = None, latency_ms: float = 0,
+                 latency_jitter_ms: float = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.market = SyntheticMarket(seed)
+        self.record_dir = Path(record_dir) if record_dir else None
+        self._recorded_quotes: Dict[str, dict] = {}
+        self._recorded_listings: Optional[dict] = None
+        self._random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "symbols": 0}
+        self._load_records()
+
+    def _load_records(self):
+        if not self.record_dir:
+            return
+        quotes_file = self.record_dir / "quotes_latest.json"
+        if quotes_file.exists():
+            data = json.loads(quotes_file.read_text()).get("data", {})
+            for symbol, coin in data.items():
+                # v2 formatında sembol başına liste gelebilir
+                self._recorded_quotes[symbol.upper()] = coin[0] if isinstance(coin, list) else coin
+        listings_file = self.record_dir / "listings_latest.json"
+        if listings_file.exists():
+            self._recorded_listings = json.loads(listings_file.read_text())
+        logger.info(f"📼 Kayıtlı yanıtlar yüklendi: {len(self._recorded_quotes)} quote, "
+                    f"listings={'var' if self._recorded_listings else 'yok'}")
+
+    def _status(self, started: float, credit_count: int = 1) -> dict:
+        return {
+            "timestamp": _iso(time.time()),
+            "error_code": 0,
+            "error_message": None,
+            "elapsed": int((time.perf_counter() - started) * 1000),
+            "credit_count": credit_count,
+            "notice": None,
+        }
+
+    async def _simulate(self) -> Optional[web.Response]:
+        """Gecikme ve hata enjeksiyonu; hata dönecekse yanıtı döndürür"""
+        self.stats["requests"] += 1
+        delay = self.latency_ms + self._random.uniform(-1, 1) * self.latency_jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {"status": {"error_code": 1008, "error_message": "You've exceeded your API Key's HTTP request rate limit."}},
+                status=429, headers={"Retry-After": "1"}
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"status": {"error_code": 500, "error_message": "Replay injected error"}}, status=503)
+        return None
+
+    async def quotes_latest(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        error = await self._simulate()
+        if error is not None:
+            return error
+        symbols = [s.strip().upper() for s in request.query.get("symbol", "").split(",") if s.strip()]
+        if not symbols:
+            return web.json_response({"status": {"error_code": 400, "error_message": "\"symbol\" is required"}}, status=400)
+        now = time.time()
+        data = {}
+        for i, symbol in enumerate(symbols):
+            data[symbol] = self._recorded_quotes.get(symbol) or self.market.coin(symbol, now, rank=i + 1)
+        self.stats["symbols"] += len(symbols)
+        # CMC: 100 sembol başına 1 kredi
+        return web.json_response({"status": self._status(started, 1 + (len(symbols) - 1) // 100), "data": data})
+
+    async def listings_latest(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        error = await self._simulate()
+        if error is not None:
+            return error
+        if self._recorded_listings is not None:
+            return web.json_response(self._recorded_listings)
+        limit = int(request.query.get("limit", "100"))
+        now = time.time()
+        data = [self.market.coin(f"SYN{i}", now, rank=i + 1) for i in range(limit)]
+        return web.json_response({"status": self._status(started, 1 + (limit - 1) // 200), "data": data})
+
+    async def quotes_historical(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        error = await self._simulate()
+        if error is not None:
+            return error
+        symbol = request.query.get("symbol", "").strip().upper()
+        if self.record_dir:
+            recorded = self.record_dir / "quotes_historical" / f"{symbol}.json"
+            if recorded.exists():
+                return web.json_response(json.loads(recorded.read_text()))
+
+        step = HISTORICAL_INTERVAL_SECONDS.get(request.query.get("interval", "1h"), 3600)
+        end = _parse_iso(request.query["time_end"]) if "time_end" in request.query else time.time()
+        start = _parse_iso(request.query["time_start"]) if "time_start" in request.query else end - step * 100
+        quotes = []
+        ts = start - start % step + step
+        while ts <= end:
+            price = self.market.price_at(symbol, ts)
+            quotes.append({
+                "timestamp": _iso(ts),
+                "quote": {"USD": {"price": price, "volume_24h": price * 1e6, "market_cap": price * 1e9, "timestamp": _iso(ts)}},
+            })
+            ts += step
+        data = {"id": self.market._symbol_seed(symbol) % 100000, "name": symbol.title(), "symbol": symbol, "quotes": quotes}
+        return web.json_response({"status": self._status(started, 1 + len(quotes) // 100), "data": data})
+
+    async def replay_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/cryptocurrency/quotes/latest", self.quotes_latest)
+        app.router.add_get("/v2/cryptocurrency/quotes/latest", self.quotes_latest)
+        app.router.add_get("/v1/cryptocurrency/listings/latest", self.listings_latest)
+        app.router.add_get("/v2/cryptocurrency/quotes/historical", self.quotes_historical)
+        app.router.add_get("/replay/stats", self.replay_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CoinMarketCap replay sunucusu")
+    parser.add_argument("--host", default=os.getenv("CMC_REPLAY_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CMC_REPLAY_PORT", "8765")))
+    parser.add_argument("--record-dir", default=os.getenv("CMC_REPLAY_RECORD_DIR"))
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("CMC_REPLAY_LATENCY_MS", "0")))
+    parser.add_argument("--latency-jitter-ms", type=float, default=float(os.getenv("CMC_REPLAY_LATENCY_JITTER_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("CMC_REPLAY_ERROR_RATE", "0")))
+    parser.add_argument("--rate-limit-rate", type=float, default=float(os.getenv("CMC_REPLAY_RATE_LIMIT_RATE", "0")))
+    parser.add_argument("--seed", type=int, default=int(os.getenv("CMC_REPLAY_SEED", "42")))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = ReplayServer(
+        record_dir=args.record_dir,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    logger.info(f"📼 CMC replay sunucusu: http://{args.host}:{args.port} "
+                f"(gecikme={args.latency_ms}ms, hata oranı={args.error_rate})")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
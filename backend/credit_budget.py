@@ -0,0 +1,220 @@
+# backend/credit_budget.py
+"""
+CMC kredi bütçesi takibi ve adaptive fetch interval
+CMC yanıtlarındaki status.credit_count değerlerini günlük/aylık toplar,
+config'deki bütçeye göre harcama hızını projekte eder ve coin başına
+fetch interval'ini volatiliteye göre sınırlar içinde ayarlar
+(config'te adaptive_fetch_enabled ile açılır)
+
+Sayaçlar bellekte tutulur; depolama backend'ine CREDIT_FLUSH_SECONDS'ta bir toplu
+yazılır (run_flusher). Bekleyen sayaçlar sadece event loop'ta değiştirilir; thread
+havuzuna yalnızca ayrılmış kopya gider, event loop'ta DB'ye gidilmez.
+"""
+import os
+import asyncio
+import calendar
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from data_sync import read_config
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan bütçe: CMC Basic plan (10.000 kredi / ay)
+DEFAULT_MONTHLY_BUDGET = 10000
+DEFAULT_DAILY_BUDGET = 333
+DEFAULT_MIN_INTERVAL_MINUTES = 1
+DEFAULT_MAX_INTERVAL_MINUTES = 60
+# Tick başına getirinin standart sapması (%) bu değerdeyse coin kendi fetch_interval_minutes değeriyle çekilir
+DEFAULT_REFERENCE_VOLATILITY = 0.1
+# Volatilite için kullanılan son fiyat sayısı
+VOLATILITY_POINTS = 21
+# Bekleyen kredi sayaçlarının depolamaya yazılma aralığı (saniye)
+CREDIT_FLUSH_SECONDS = float(os.getenv("CREDIT_FLUSH_SECONDS", "30"))
+
+
+class CreditBudget:
+    """Günlük ve aylık CMC kredi harcamasını izler"""
+
+    def __init__(self):
+        self.day_key: Optional[str] = None
+        self.month_key: Optional[str] = None
+        self.daily_used = 0
+        self.monthly_used = 0
+        self.calls = 0
+        self.intervals: Dict[str, float] = {}
+        # Henüz yazılmamış artışlar: gün → {"credits", "calls"}
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._loaded = False
+
+    def _roll_over(self, now: datetime):
+        """Gün/ay değiştiyse sayaçları sıfırla"""
+        day_key = now.strftime("%Y-%m-%d")
+        month_key = now.strftime("%Y-%m")
+        if self.month_key != month_key:
+            self.month_key = month_key
+            self.monthly_used = 0
+        if self.day_key != day_key:
+            self.day_key = day_key
+            self.daily_used = 0
+
+    def load(self):
+        """Restart sonrası bugünün ve bu ayın harcamasını depolamadan yükle (başlangıçta run_db ile)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        now = datetime.now(timezone.utc)
+        self._roll_over(now)
+        try:
+            for day, credits in get_storage().get_credit_usage(self.month_key).items():
+                self.monthly_used += credits
+                if day == self.day_key:
+                    self.daily_used += credits
+            logger.info(f"💳 CMC kredi kullanımı yüklendi: bugün {self.daily_used}, bu ay {self.monthly_used}")
+        except Exception as e:
+            logger.error(f"❌ Kredi kullanımı yükleme hatası: {e}")
+
+    def record(self, credit_count: int):
+        """
+        CMC yanıtındaki kredi harcamasını kaydet (sadece bellekte; flush ile yazılır)
+
+        Args:
+            credit_count: status.credit_count değeri
+        """
+        self._roll_over(datetime.now(timezone.utc))
+        credit_count = int(credit_count or 0)
+        self.calls += 1
+        if credit_count <= 0:
+            return
+        self.daily_used += credit_count
+        self.monthly_used += credit_count
+        pending = self._pending.setdefault(self.day_key, {"credits": 0, "calls": 0})
+        pending["credits"] += credit_count
+        pending["calls"] += 1
+
+    async def flush(self):
+        """
+        Bekleyen sayaçları depolamaya yaz; hata olursa tekrar kuyruğa alınır
+        Ayırma ve geri koyma event loop'ta yapılır (record ile yarışmaz), yazım thread havuzunda.
+        """
+        from db_async import run_db
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            await run_db(get_storage().add_credit_usage, pending)
+        except Exception as e:
+            logger.error(f"❌ Kredi kullanımı kaydetme hatası: {e}")
+            for day, counts in pending.items():
+                current = self._pending.setdefault(day, {"credits": 0, "calls": 0})
+                current["credits"] += counts["credits"]
+                current["calls"] += counts["calls"]
+
+    async def run_flusher(self):
+        """Sayaçları CREDIT_FLUSH_SECONDS'ta bir yaz"""
+        while True:
+            await asyncio.sleep(CREDIT_FLUSH_SECONDS)
+            await self.flush()
+
+    def get_budget_factor(self, cfg: dict = None) -> float:
+        """
+        Harcama hızına göre interval çarpanı
+
+        Returns:
+            >1: bütçe aşılacak, interval'ler uzatılmalı
+            <1: bütçe kullanılmıyor, interval'ler kısaltılabilir
+        """
+        cfg = cfg or read_config()
+        now = datetime.now(timezone.utc)
+        self._roll_over(now)
+
+        daily_budget = float(cfg.get("cmc_daily_credit_budget", DEFAULT_DAILY_BUDGET))
+        monthly_budget = float(cfg.get("cmc_monthly_credit_budget", DEFAULT_MONTHLY_BUDGET))
+
+        # Ay sonuna kadar kalan kredi günlere eşit bölünür
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        days_left = days_in_month - now.day + 1
+        monthly_allowance = max(monthly_budget - self.monthly_used + self.daily_used, 0) / days_left
+        allowance = min(daily_budget, monthly_allowance)
+        if allowance <= 0:
+            return 4.0
+
+        # Günün ilk saatinde projeksiyon güvenilir değil
+        elapsed_fraction = (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+        if elapsed_fraction < 1 / 24 or self.daily_used == 0:
+            return 1.0
+
+        projected = self.daily_used / elapsed_fraction
+        return max(0.5, min(4.0, projected / allowance))
+
+    def get_status(self) -> dict:
+        """Kredi kullanım durumu"""
+        cfg = read_config()
+        return {
+            "day": self.day_key,
+            "daily_used": self.daily_used,
+            "daily_budget": cfg.get("cmc_daily_credit_budget", DEFAULT_DAILY_BUDGET),
+            "month": self.month_key,
+            "monthly_used": self.monthly_used,
+            "monthly_budget": cfg.get("cmc_monthly_credit_budget", DEFAULT_MONTHLY_BUDGET),
+            "calls": self.calls,
+            "pending_days": len(self._pending),
+            "budget_factor": round(self.get_budget_factor(cfg), 3),
+            "intervals": {k: round(v, 2) for k, v in self.intervals.items()},
+        }
+
+
+def tick_volatility(prices: Sequence[float]) -> Optional[float]:
+    """Ardışık fiyatlar arası log getirinin standart sapması (%, yuvarlanmamış); veri yetersizse None"""
+    values = np.asarray(prices, dtype=np.float64)
+    values = values[values > 0]
+    if len(values) < 10:
+        return None
+    return float(np.std(np.diff(np.log(values))) * 100)
+
+
+async def get_adaptive_interval(symbol: str, base_minutes: float, cfg: dict = None) -> float:
+    """
+    Coin için bir sonraki fetch'e kadar beklenecek süre (dakika)
+
+    Volatil coinler daha sık, sakin coinler daha seyrek çekilir;
+    kredi harcama hızı bütçeyi aşıyorsa tüm interval'ler uzatılır.
+
+    Args:
+        symbol: Coin sembolü
+        base_minutes: Coin ayarındaki fetch_interval_minutes
+        cfg: Config (verilmezse okunur)
+
+    Returns:
+        Dakika cinsinden interval (config sınırları içinde)
+    """
+    cfg = cfg or read_config()
+    if not cfg.get("adaptive_fetch_enabled", False):
+        return base_minutes
+
+    min_minutes = float(cfg.get("fetch_interval_min_minutes", DEFAULT_MIN_INTERVAL_MINUTES))
+    max_minutes = float(cfg.get("fetch_interval_max_minutes", DEFAULT_MAX_INTERVAL_MINUTES))
+    reference_vol = float(cfg.get("adaptive_reference_volatility", DEFAULT_REFERENCE_VOLATILITY))
+
+    vol_factor = 1.0
+    try:
+        from db_async import get_recent_prices
+        volatility = tick_volatility(await get_recent_prices(symbol, count=VOLATILITY_POINTS))
+        if volatility is not None:
+            # Yüksek volatilite → kısa interval, düşük volatilite → uzun interval
+            vol_factor = max(0.25, min(4.0, reference_vol / max(volatility, 1e-6)))
+    except Exception as e:
+        logger.error(f"❌ [{symbol}] Adaptive interval volatilite hatası: {e}")
+
+    interval = base_minutes * vol_factor * credit_budget.get_budget_factor(cfg)
+    interval = max(min_minutes, min(max_minutes, interval))
+    credit_budget.intervals[symbol] = interval
+    return interval
+
+
+# Global instance
+credit_budget = CreditBudget()
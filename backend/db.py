@@ -1,62 +1,36 @@
-# backend/db_mongodb.py - MongoDB Version
-import os
-from pymongo import MongoClient, DESCENDING
+# backend/db.py - Sinyal kayıtları (storage.py backend'i üzerinden: MongoDB veya SQLite)
 from datetime import datetime, timezone
 import logging
 
-logger = logging.getLogger(__name__)
+from storage import SIGNALS, get_storage
 
-# MongoDB bağlantısı
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.getenv("DB_NAME", "crypto_bot")
+logger = logging.getLogger(__name__)
 
-# Global MongoDB client ve database
-_client = None
-_db = None
 
 def get_db():
-    """MongoDB database instance'ını döndür"""
-    global _client, _db
-    if _db is None:
-        try:
-            _client = MongoClient(MONGO_URL)
-            _db = _client[DB_NAME]
-            logger.info(f"✅ MongoDB bağlantısı başarılı: {DB_NAME}")
-        except Exception as e:
-            logger.error(f"❌ MongoDB bağlantı hatası: {e}")
-            raise
-    return _db
+    """MongoDB database instance'ını döndür (sadece MongoDB backend'inde)"""
+    from db_mongodb import get_db as get_mongo_db
+    return get_mongo_db()
 
 def init_db():
-    """MongoDB collections ve indexler oluştur"""
+    """Depolama backend'inin tablo/collection ve indexlerini oluştur"""
     try:
-        db = get_db()
-        
-        # signal_history collection için indexler
-        db.signal_history.create_index([("coin", 1)])
-        db.signal_history.create_index([("created_at", DESCENDING)])
-        db.signal_history.create_index([("coin", 1), ("timeframe", 1)])
-        
-        # performance_agg collection için indexler
-        db.performance_agg.create_index([("coin", 1), ("timeframe", 1)], unique=True)
-        
-        logger.info("✅ MongoDB collections ve indexler hazır")
+        storage = get_storage()
+        storage.init()
+        logger.info(f"✅ {storage.name} collections ve indexler hazır")
     except Exception as e:
-        logger.error(f"❌ MongoDB init hatası: {e}")
+        logger.error(f"❌ Veritabanı init hatası: {e}")
         raise
 
-# Helper fonksiyonlar - MongoDB
+# Helper fonksiyonlar
 def insert_signal_record(rec: dict):
     """Yeni sinyal kaydı ekle"""
     try:
-        db = get_db()
-        
         # created_at yoksa ekle
         if "created_at" not in rec:
             rec["created_at"] = datetime.now(timezone.utc)
-        
-        result = db.signal_history.insert_one(rec)
-        return str(result.inserted_id)
+
+        return get_storage().insert(SIGNALS, rec)
     except Exception as e:
         logger.error(f"❌ Signal insert hatası: {e}")
         raise
@@ -64,28 +38,18 @@ def insert_signal_record(rec: dict):
 def fetch_recent_signals(limit=100, coin_list=None, status=None):
     """En son sinyalleri getir - coin_list ve status filtresi"""
     try:
-        db = get_db()
-        
         # Query oluştur
         query = {}
-        
+
         # Coin list filtresi
         if coin_list:
             query["coin"] = {"$in": [c.upper() for c in coin_list]}
-        
+
         # Status filtresi
         if status and status.lower() != "all":
             query["signal_status"] = status.lower()
-        
-        cursor = db.signal_history.find(query).sort("created_at", DESCENDING).limit(limit)
-        
-        # MongoDB dökümanlarını dict listesine çevir
-        signals = []
-        for doc in cursor:
-            doc["id"] = str(doc["_id"])  # _id'yi id'ye çevir
-            signals.append(doc)
-        
-        return signals
+
+        return get_storage().find(SIGNALS, query, sort=[("created_at", -1)], limit=limit)
     except Exception as e:
         logger.error(f"❌ Fetch signals hatası: {e}")
         return []
@@ -93,16 +57,7 @@ def fetch_recent_signals(limit=100, coin_list=None, status=None):
 def get_signal_by_id(signal_id: str):
     """ID'ye göre sinyal getir"""
     try:
-        db = get_db()
-        from bson.objectid import ObjectId
-        
-        if not ObjectId.is_valid(signal_id):
-            return None
-        
-        doc = db.signal_history.find_one({"_id": ObjectId(signal_id)})
-        if doc:
-            doc["id"] = str(doc["_id"])
-        return doc
+        return get_storage().find_one(SIGNALS, {"id": signal_id})
     except Exception as e:
         logger.error(f"❌ Get signal by ID hatası: {e}")
         return None
@@ -110,22 +65,11 @@ def get_signal_by_id(signal_id: str):
 def update_signal_success(signal_id: str, success: bool, reward: float = None):
     """Sinyal başarı durumunu güncelle"""
     try:
-        db = get_db()
-        from bson.objectid import ObjectId
-        
-        if not ObjectId.is_valid(signal_id):
-            return False
-        
         update_data = {"success": success}
         if reward is not None:
             update_data["reward"] = reward
-        
-        result = db.signal_history.update_one(
-            {"_id": ObjectId(signal_id)},
-            {"$set": update_data}
-        )
-        
-        return result.modified_count > 0
+
+        return get_storage().update(SIGNALS, signal_id, update_data)
     except Exception as e:
         logger.error(f"❌ Update signal hatası: {e}")
         return False
@@ -133,14 +77,7 @@ def update_signal_success(signal_id: str, success: bool, reward: float = None):
 def delete_signal(signal_id: str):
     """Sinyal sil"""
     try:
-        db = get_db()
-        from bson.objectid import ObjectId
-        
-        if not ObjectId.is_valid(signal_id):
-            return False
-        
-        result = db.signal_history.delete_one({"_id": ObjectId(signal_id)})
-        return result.deleted_count > 0
+        return get_storage().delete(SIGNALS, {"id": signal_id}) > 0
     except Exception as e:
         logger.error(f"❌ Delete signal hatası: {e}")
         return False
@@ -148,9 +85,7 @@ def delete_signal(signal_id: str):
 def clear_all_signals():
     """Tüm sinyalleri temizle"""
     try:
-        db = get_db()
-        result = db.signal_history.delete_many({})
-        return result.deleted_count
+        return get_storage().delete(SIGNALS, {})
     except Exception as e:
         logger.error(f"❌ Clear all signals hatası: {e}")
         return 0
@@ -158,9 +93,7 @@ def clear_all_signals():
 def clear_failed_signals():
     """Başarısız sinyalleri temizle"""
     try:
-        db = get_db()
-        result = db.signal_history.delete_many({"success": False})
-        return result.deleted_count
+        return get_storage().delete(SIGNALS, {"success": False})
     except Exception as e:
         logger.error(f"❌ Clear failed signals hatası: {e}")
         return 0
@@ -168,50 +101,23 @@ def clear_failed_signals():
 def get_dashboard_stats():
     """Dashboard istatistikleri"""
     try:
-        db = get_db()
-        
-        # Toplam sinyal
-        total_signals = db.signal_history.count_documents({})
-        
-        # Başarılı, başarısız, bekleyen
-        successful = db.signal_history.count_documents({"success": True})
-        failed = db.signal_history.count_documents({"success": False})
-        pending = db.signal_history.count_documents({"success": None})
-        
+        stats = get_storage().signal_stats()
+
+        total_signals = stats["total"]
+        successful = stats["successful"]
+
         # Başarı oranı
         success_rate = (successful / total_signals * 100) if total_signals > 0 else 0
-        
-        # Maksimum kazanç/kayıp
-        max_gain_doc = db.signal_history.find_one(
-            {"reward": {"$ne": None}},
-            sort=[("reward", DESCENDING)]
-        )
-        max_loss_doc = db.signal_history.find_one(
-            {"reward": {"$ne": None}},
-            sort=[("reward", 1)]
-        )
-        
-        max_gain = max_gain_doc.get("reward", 0) if max_gain_doc else 0
-        max_loss = max_loss_doc.get("reward", 0) if max_loss_doc else 0
-        
-        # Ortalama reward
-        pipeline = [
-            {"$match": {"reward": {"$ne": None}}},
-            {"$group": {"_id": None, "avg_reward": {"$avg": "$reward"}}}
-        ]
-        avg_result = list(db.signal_history.aggregate(pipeline))
-        avg_reward = avg_result[0]["avg_reward"] if avg_result else 0
-        
+
+        max_gain = stats["max_gain"]
+        max_loss = stats["max_loss"]
+        avg_reward = stats["avg_reward"]
+
         # Top profitable signals (en karlı 5)
-        top_profitable_cursor = db.signal_history.find(
-            {"reward": {"$ne": None, "$gt": 0}},
-            sort=[("reward", DESCENDING)]
-        ).limit(5)
-        
         top_profitable = []
-        for doc in top_profitable_cursor:
+        for doc in stats["top_profitable"]:
             top_profitable.append({
-                "id": str(doc["_id"]),
+                "id": doc["id"],
                 "coin": doc.get("coin"),
                 "signal_type": doc.get("signal_type"),
                 "reward": round(doc.get("reward", 0), 2),
@@ -219,39 +125,27 @@ def get_dashboard_stats():
                 "timeframe": doc.get("timeframe"),
                 "created_at": doc.get("created_at").isoformat() if doc.get("created_at") else None
             })
-        
+
         # Coin başına performans
-        coin_pipeline = [
-            {"$group": {
-                "_id": "$coin",
-                "total_signals": {"$sum": 1},
-                "successful": {"$sum": {"$cond": [{"$eq": ["$success", True]}, 1, 0]}},
-                "avg_prob": {"$avg": "$probability"}
-            }},
-            {"$sort": {"total_signals": DESCENDING}},
-            {"$limit": 10}
-        ]
-        coin_performance_raw = list(db.signal_history.aggregate(coin_pipeline))
-        
         coin_performance = []
-        for cp in coin_performance_raw:
+        for cp in stats["coin_performance"]:
             total = cp["total_signals"]
-            successful = cp["successful"]
-            success_rate_coin = (successful / total * 100) if total > 0 else 0
+            successful_coin = cp["successful"]
+            success_rate_coin = (successful_coin / total * 100) if total > 0 else 0
             coin_performance.append({
-                "coin": cp["_id"],
+                "coin": cp["coin"],
                 "total_signals": total,
-                "successful": successful,
+                "successful": successful_coin,
                 "success_rate": round(success_rate_coin, 2)
             })
-        
+
         # Eski SQLite format'ına uyumlu response
         return {
             "summary": {
                 "total_signals": total_signals,
                 "successful_signals": successful,
-                "failed_signals": failed,
-                "pending_signals": pending,
+                "failed_signals": stats["failed"],
+                "pending_signals": stats["pending"],
                 "success_rate": round(success_rate, 2),
                 "max_gain": round(max_gain, 2) if max_gain else 0,
                 "max_loss": round(max_loss, 2) if max_loss else 0,
@@ -284,30 +178,21 @@ def get_dashboard_stats():
 def fetch_prune_candidates(cutoff_ts, min_samples, success_threshold):
     """Temizleme için aday kayıtları bul"""
     try:
-        db = get_db()
-        
-        # MongoDB aggregation pipeline
-        pipeline = [
-            {"$match": {"created_at": {"$lte": cutoff_ts}}},
-            {"$group": {
-                "_id": {"coin": "$coin", "timeframe": "$timeframe"},
-                "sample_count": {"$sum": 1},
-                "success_count": {"$sum": {"$cond": [{"$eq": ["$success", True]}, 1, 0]}}
-            }},
-            {"$match": {"sample_count": {"$gte": min_samples}}}
-        ]
-        
-        results = db.signal_history.aggregate(pipeline)
-        
+        # coin+timeframe bazında örnek ve başarı sayıları (sunucu tarafında gruplanır)
+        groups = get_storage().group_count(
+            SIGNALS, ("coin", "timeframe"), {"created_at": {"$lte": cutoff_ts}}, true_field="success"
+        )
+
         candidates = []
-        for r in results:
-            sample_count = r["sample_count"]
-            success_count = r["success_count"]
-            success_rate = success_count / sample_count if sample_count > 0 else 0
-            
+        for g in groups:
+            sample_count = g["count"]
+            if sample_count < min_samples:
+                continue
+            success_rate = g["true_count"] / sample_count if sample_count > 0 else 0
+
             if success_rate < success_threshold:
-                candidates.append((r["_id"]["coin"], r["_id"]["timeframe"]))
-        
+                candidates.append((g["coin"], g["timeframe"]))
+
         return candidates
     except Exception as e:
         logger.error(f"❌ Prune candidates hatası: {e}")
@@ -316,25 +201,20 @@ def fetch_prune_candidates(cutoff_ts, min_samples, success_threshold):
 def delete_records_by_coin_timeframe(coin, timeframe, cutoff_ts):
     """Belirli coin+timeframe için eski kayıtları sil"""
     try:
-        db = get_db()
-        
-        # Silinecek kayıtların ID'lerini al
-        cursor = db.signal_history.find({
+        storage = get_storage()
+        query = {
             "coin": coin,
             "timeframe": timeframe,
             "created_at": {"$lte": cutoff_ts}
-        }, {"_id": 1})
-        
-        ids = [str(doc["_id"]) for doc in cursor]
-        
+        }
+
+        # Silinecek kayıtların ID'lerini al
+        ids = [doc["id"] for doc in storage.find(SIGNALS, query)]
+
         # Sil
-        result = db.signal_history.delete_many({
-            "coin": coin,
-            "timeframe": timeframe,
-            "created_at": {"$lte": cutoff_ts}
-        })
-        
-        logger.info(f"✅ Silindi: {result.deleted_count} kayıt ({coin}/{timeframe})")
+        deleted = storage.delete(SIGNALS, query)
+
+        logger.info(f"✅ Silindi: {deleted} kayıt ({coin}/{timeframe})")
         return ids
     except Exception as e:
         logger.error(f"❌ Delete records hatası: {e}")
@@ -343,29 +223,7 @@ def delete_records_by_coin_timeframe(coin, timeframe, cutoff_ts):
 def fetch_records_by_ids(ids):
     """Belirli ID'lere sahip kayıtları getir"""
     try:
-        db = get_db()
-        from bson.objectid import ObjectId
-        
-        # String ID'leri ObjectId'ye çevir
-        object_ids = [ObjectId(id_str) for id_str in ids if ObjectId.is_valid(id_str)]
-        
-        cursor = db.signal_history.find({"_id": {"$in": object_ids}})
-        
-        records = []
-        for doc in cursor:
-            doc["id"] = str(doc["_id"])
-            records.append(doc)
-        
-        return records
+        return get_storage().find(SIGNALS, {"id": {"$in": list(ids)}})
     except Exception as e:
         logger.error(f"❌ Fetch by IDs hatası: {e}")
         return []
-
-# Backward compatibility için dummy class'lar
-class SessionLocal:
-    """Dummy class - MongoDB kullanıyor"""
-    pass
-
-class SignalHistory:
-    """Dummy class - MongoDB kullanıyor"""
-    pass
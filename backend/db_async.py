@@ -0,0 +1,145 @@
+# backend/db_async.py
+"""
+Event loop'u bloklamayan veritabanı erişimi
+pymongo senkron olduğu için sorgular sınırlı bir thread havuzunda çalıştırılır;
+yavaş bir sorgu diğer coin fetch'lerini ve API isteklerini bekletmez.
+Fonksiyonlar senkron modüllerle aynı isimleri taşır, sadece await edilir:
+
+    import db_async
+    prices = await db_async.get_recent_prices("BTC", count=50)
+
+Havuz boyutu DB_POOL_SIZE ile ayarlanır (varsayılan 8). Aynı anda en fazla bu
+kadar sorgu MongoDB'ye gider, fazlası kuyrukta bekler; pymongo'nun bağlantı
+havuzu (maxPoolSize=100) bu değerden büyük olduğu için bağlantı beklenmez.
+"""
+import os
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import db
+import price_alarms
+import price_history
+import manual_price_override
+import quote_snapshot
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+# Bu süreyi aşan sorgular loglanır
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+stats = {
+    "calls": 0,
+    "errors": 0,
+    "slow": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+}
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """Senkron DB fonksiyonunu thread havuzunda çalıştır ve sonucunu bekle"""
+    loop = asyncio.get_running_loop()
+    queued = time.perf_counter()
+
+    def call():
+        started = time.perf_counter()
+        wait_ms = (started - queued) * 1000
+        stats["total_wait_ms"] += wait_ms
+        stats["max_wait_ms"] = round(max(stats["max_wait_ms"], wait_ms), 2)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = round(max(stats["max_ms"], elapsed_ms), 2)
+            if elapsed_ms > DB_SLOW_QUERY_MS:
+                stats["slow"] += 1
+                logger.warning(f"🐢 Yavaş DB çağrısı: {getattr(func, '__qualname__', func)} ({elapsed_ms:.0f}ms)")
+
+    stats["calls"] += 1
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        return await loop.run_in_executor(_executor, call)
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        stats["in_flight"] -= 1
+
+
+def _async(func: Callable) -> Callable:
+    """Senkron fonksiyonun aynı isimli async karşılığı"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+
+# Sinyaller (db.py)
+insert_signal_record = _async(db.insert_signal_record)
+fetch_recent_signals = _async(db.fetch_recent_signals)
+get_signal_by_id = _async(db.get_signal_by_id)
+update_signal_success = _async(db.update_signal_success)
+delete_signal = _async(db.delete_signal)
+clear_all_signals = _async(db.clear_all_signals)
+clear_failed_signals = _async(db.clear_failed_signals)
+get_dashboard_stats = _async(db.get_dashboard_stats)
+
+# Fiyat geçmişi (price_history.py)
+get_price_history = _async(price_history.get_price_history)
+get_recent_prices = _async(price_history.get_recent_prices)
+get_recent_prices_with_timestamps = _async(price_history.get_recent_prices_with_timestamps)
+get_price_count = _async(price_history.get_price_count)
+get_price_statistics = _async(price_history.get_price_statistics)
+
+# Fiyat alarmları (price_alarms.py)
+create_price_alarm = _async(price_alarms.create_price_alarm)
+check_price_alarms = _async(price_alarms.check_price_alarms)
+get_active_alarms = _async(price_alarms.get_active_alarms)
+delete_alarm = _async(price_alarms.delete_alarm)
+get_alarm_statistics = _async(price_alarms.get_alarm_statistics)
+
+
+# Sinyal takibi (signal_tracker.py; modül ilk kullanımda import edilir)
+async def update_all_signals():
+    from signal_tracker import update_all_signals as func
+    return await run_db(func)
+
+
+async def get_signal_statistics():
+    from signal_tracker import get_signal_statistics as func
+    return await run_db(func)
+
+
+# Manuel fiyatlar (manual_price_override.py)
+set_manual_price = _async(manual_price_override.set_manual_price)
+get_manual_price = _async(manual_price_override.get_manual_price)
+remove_manual_price = _async(manual_price_override.remove_manual_price)
+get_all_manual_prices = _async(manual_price_override.get_all_manual_prices)
+
+# Quote snapshot'ları (quote_snapshot.py)
+save_snapshot = _async(quote_snapshot.save_snapshot)
+touch_snapshot = _async(quote_snapshot.touch_snapshot)
+
+
+def get_status() -> dict:
+    calls = stats["calls"]
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "avg_ms": round(stats["total_ms"] / calls, 2) if calls else 0.0,
+        "avg_wait_ms": round(stats["total_wait_ms"] / calls, 2) if calls else 0.0,
+        **{k: (round(v, 2) if isinstance(v, float) else v)
+           for k, v in stats.items() if k not in ("total_ms", "total_wait_ms")},
+    }
@@ -14,10 +14,16 @@ class FeatureFlags:
     
     # Feature flag'ler
     ENABLE_CANDLE_INTERVAL_ANALYSIS = "enable_candle_interval_analysis"
+    ENABLE_PRICE_ARCHIVE = "enable_price_archive"
+    ENABLE_PRICE_ROLLUPS = "enable_price_rollups"
+    ENABLE_STREAMING_INDICATORS = "enable_streaming_indicators"
     
     # Default değerler
     DEFAULTS = {
         ENABLE_CANDLE_INTERVAL_ANALYSIS: False,
+        ENABLE_PRICE_ARCHIVE: False,
+        ENABLE_PRICE_ROLLUPS: False,
+        ENABLE_STREAMING_INDICATORS: False,
     }
     
     @staticmethod
@@ -51,6 +57,21 @@ class FeatureFlags:
             logger.info("🔧 Feature Flag: Candle Interval Analysis ENABLED")
         return enabled
     
+    @staticmethod
+    def enable_price_archive() -> bool:
+        """Eski fiyat geçmişinin dosya arşivine taşınması aktif mi?"""
+        return FeatureFlags.is_enabled(FeatureFlags.ENABLE_PRICE_ARCHIVE)
+    
+    @staticmethod
+    def enable_price_rollups() -> bool:
+        """Fiyat geçmişinin katmanlı rollup'ları (compaction + uzun pencere okumaları) aktif mi?"""
+        return FeatureFlags.is_enabled(FeatureFlags.ENABLE_PRICE_ROLLUPS)
+    
+    @staticmethod
+    def enable_streaming_indicators() -> bool:
+        """Göstergelerin coin başına artımlı (streaming) durumdan okunması aktif mi?"""
+        return FeatureFlags.is_enabled(FeatureFlags.ENABLE_STREAMING_INDICATORS)
+    
     @staticmethod
     def set_flag(flag_name: str, value: bool):
         """
@@ -0,0 +1,243 @@
+# backend/fetch_scheduler.py
+"""
+Tek scheduler ile coin fetch zamanlaması
+Her coin için ayrı asyncio task yerine bir min-heap (sonraki çalışma zamanı)
+tutulur; zamanı gelen coinler sınırlı sayıda worker'a dağıtılır.
+Ekleme / çıkarma / yeniden zamanlama O(log n)'dir.
+"""
+import heapq
+import random
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 20
+DEFAULT_JITTER_SECONDS = 0.5
+# Hizalama açıkken tick'ler interval sınırından bu kadar sonra çalışır
+DEFAULT_ALIGN_OFFSET_SECONDS = 2.0
+
+
+class ScheduleEntry:
+    """Tek bir coin'in zamanlama bilgisi"""
+
+    __slots__ = ("symbol", "interval_minutes", "due", "version", "last_run")
+
+    def __init__(self, symbol: str, interval_minutes: float, due: float):
+        self.symbol = symbol
+        self.interval_minutes = interval_minutes
+        self.due = due
+        self.version = 0
+        self.last_run: Optional[float] = None
+
+
+class FetchScheduler:
+    """
+    Min-heap tabanlı fetch scheduler
+
+    Handler coin'i işler ve bir sonraki interval'i (dakika) döndürür;
+    None dönerse coin scheduler'dan çıkarılır (örn. passive olduysa).
+    """
+
+    def __init__(self, handler: Callable[[str], Awaitable[Optional[float]]],
+                 workers: int = DEFAULT_WORKERS,
+                 jitter_seconds: float = DEFAULT_JITTER_SECONDS,
+                 align_to_candles: bool = False,
+                 align_offset_seconds: float = DEFAULT_ALIGN_OFFSET_SECONDS):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.jitter_seconds = jitter_seconds
+        self.align_to_candles = align_to_candles
+        self.align_offset_seconds = align_offset_seconds
+
+        self._entries: Dict[str, ScheduleEntry] = {}
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: set = set()
+        self.stats = {"dispatched": 0, "completed": 0, "errors": 0, "max_lag_seconds": 0.0}
+
+    # ---------- Zamanlama ----------
+
+    def _push(self, entry: ScheduleEntry):
+        entry.version += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (entry.due, self._seq, entry.symbol, entry.version))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_due(self, interval_minutes: float, now: float) -> float:
+        """Interval sonrası çalışma zamanı (jitter ve opsiyonel candle hizalaması ile)"""
+        step = interval_minutes * 60
+        if self.align_to_candles and step > 0:
+            due = (int((now + step) // step)) * step + self.align_offset_seconds
+        else:
+            due = now + step
+        if self.jitter_seconds > 0:
+            due += random.uniform(0, self.jitter_seconds)
+        return due
+
+    def add(self, symbol: str, interval_minutes: float, due: Optional[float] = None):
+        """
+        Coin ekle (varsa yeniden zamanla)
+
+        Args:
+            symbol: Coin sembolü
+            interval_minutes: Fetch interval (dakika)
+            due: İlk çalışma zamanı (epoch saniye, varsayılan: hemen)
+        """
+        now = time.time()
+        if due is None:
+            due = now + (random.uniform(0, self.jitter_seconds) if self.jitter_seconds > 0 else 0)
+        entry = self._entries.get(symbol)
+        if entry is None:
+            entry = ScheduleEntry(symbol, interval_minutes, due)
+            self._entries[symbol] = entry
+        else:
+            entry.interval_minutes = interval_minutes
+            entry.due = due
+        self._push(entry)
+
+    def remove(self, symbol: str) -> bool:
+        """Coin'i çıkar (heap'teki kaydı lazy olarak geçersiz kalır)"""
+        entry = self._entries.pop(symbol, None)
+        if entry is None:
+            return False
+        entry.version += 1
+        return True
+
+    def reschedule(self, symbol: str, interval_minutes: Optional[float] = None, due: Optional[float] = None):
+        """
+        Coin'in interval'ini ve/veya sonraki çalışma zamanını değiştir
+
+        due verilmezse son çalışmadan itibaren yeni interval kadar sonraya kurulur.
+        """
+        entry = self._entries.get(symbol)
+        if entry is None:
+            if interval_minutes is not None:
+                self.add(symbol, interval_minutes, due)
+            return
+        if interval_minutes is not None:
+            entry.interval_minutes = interval_minutes
+        if due is None:
+            base = entry.last_run if entry.last_run is not None else time.time()
+            due = base + entry.interval_minutes * 60
+        entry.due = due
+        self._push(entry)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+
+    def get_interval(self, symbol: str) -> Optional[float]:
+        entry = self._entries.get(symbol)
+        return entry.interval_minutes if entry else None
+
+    def symbols(self) -> List[str]:
+        return list(self._entries.keys())
+
+    # ---------- Çalıştırma ----------
+
+    def start(self):
+        """Dispatcher ve worker task'larını başlat"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.workers * 2)
+        self._wakeup = asyncio.Event()
+        self._tasks.append(asyncio.create_task(self._dispatcher()))
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(i)))
+        logger.info(f"⏱ Fetch scheduler başlatıldı: {len(self._entries)} coin, {self.workers} worker")
+
+    async def stop(self):
+        """Tüm task'ları durdur"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+        logger.info("🛑 Fetch scheduler durduruldu")
+
+    async def _dispatcher(self):
+        """Zamanı gelen coinleri worker kuyruğuna aktar"""
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+
+            while self._heap:
+                due, _, symbol, version = self._heap[0]
+                entry = self._entries.get(symbol)
+                if entry is None or entry.version != version:
+                    heapq.heappop(self._heap)  # eski kayıt
+                    continue
+                if due > now:
+                    break
+                heapq.heappop(self._heap)
+                if symbol in self._running:
+                    # Önceki fetch hâlâ sürüyor; bitince yeniden zamanlanacak
+                    continue
+                self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], round(now - due, 3))
+                self._running.add(symbol)
+                self.stats["dispatched"] += 1
+                await self._queue.put(symbol)
+                now = time.time()
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self, worker_id: int):
+        """Kuyruktan coin alıp handler'ı çalıştır ve yeniden zamanla"""
+        while True:
+            symbol = await self._queue.get()
+            next_interval = None
+            try:
+                next_interval = await self.handler(symbol)
+                self.stats["completed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ [{symbol}] Scheduler handler hatası: {e}")
+                entry = self._entries.get(symbol)
+                next_interval = entry.interval_minutes if entry else None
+            finally:
+                self._running.discard(symbol)
+                self._queue.task_done()
+
+            entry = self._entries.get(symbol)
+            if entry is None:
+                continue
+            if next_interval is None:
+                self.remove(symbol)
+                continue
+            now = time.time()
+            entry.last_run = now
+            entry.due = self._next_due(next_interval, now)
+            self._push(entry)
+
+    def get_status(self) -> dict:
+        """Scheduler durumu"""
+        now = time.time()
+        next_due = None
+        if self._entries:
+            next_due = min(e.due for e in self._entries.values())
+        return {
+            "coins": len(self._entries),
+            "workers": self.workers,
+            "running": len(self._running),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "heap_size": len(self._heap),
+            "next_due_in_seconds": round(next_due - now, 1) if next_due else None,
+            "jitter_seconds": self.jitter_seconds,
+            "align_to_candles": self.align_to_candles,
+            **self.stats,
+        }
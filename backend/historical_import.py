@@ -0,0 +1,345 @@
+# backend/historical_import.py
+"""
+Geçmiş fiyat verisi import job'ları
+POST /api/historical/import isteği bekletilmez: job arka planda çalışır,
+ilerleme GET /api/historical/import/{job_id} ile okunur.
+
+- Coinler eşzamanlı çekilir (HISTORICAL_IMPORT_CONCURRENCY); tüm istekler
+  cmc_client'ın paylaşılan rate limiter'ından geçer
+- Aralık HISTORICAL_IMPORT_WINDOW_DAYS'lik pencerelere bölünür, her pencere
+  HISTORICAL_IMPORT_CHUNK_SIZE'lık toplu upsert'lerle yazılır
+  ((coin, timestamp) tekil: tekrar çalıştırmak mükerrer kayıt oluşturmaz)
+- Her pencereden sonra coin checkpoint'i dosyaya yazılır; restart sonrası
+  yarım kalan job'lar kaldıkları pencereden devam eder. Yazımlar tek bir writer
+  task'ında birleştirilir, dosya I/O'su thread havuzunda yapılır
+"""
+import os
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOBS_PATH = Path(os.getenv("IMPORT_JOBS_PATH", str(Path(__file__).parent / "data" / "import_jobs.json")))
+HISTORICAL_IMPORT_CONCURRENCY = int(os.getenv("HISTORICAL_IMPORT_CONCURRENCY", "4"))
+HISTORICAL_IMPORT_WINDOW_DAYS = int(os.getenv("HISTORICAL_IMPORT_WINDOW_DAYS", "7"))
+HISTORICAL_IMPORT_CHUNK_SIZE = int(os.getenv("HISTORICAL_IMPORT_CHUNK_SIZE", "1000"))
+# Dosyada tutulan bitmiş job sayısı
+MAX_FINISHED_JOBS = 20
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def parse_quotes(coin: str, hist_data: dict) -> Optional[List[dict]]:
+    """
+    CMC quotes/historical yanıtını fiyat noktalarına çevir
+
+    Returns:
+        [{"coin", "price", "volume_24h", "timestamp", "source"}, ...] veya veri yoksa None
+    """
+    if "data" not in hist_data or "quotes" not in hist_data["data"]:
+        return None
+    points = []
+    for quote in hist_data["data"]["quotes"]:
+        timestamp_str = quote.get("timestamp")
+        if not timestamp_str:
+            continue
+        usd_quote = quote.get("quote", {}).get("USD", {})
+        price = usd_quote.get("price") or 0
+        if price <= 0:
+            continue
+        points.append({
+            "coin": coin,
+            "price": price,
+            "volume_24h": usd_quote.get("volume_24h") or 0,
+            "timestamp": datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')),
+            "source": "historical_import"
+        })
+    return points
+
+
+class HistoricalImporter:
+    """Import job'ları ve coin checkpoint'leri"""
+
+    def __init__(self, path: Path = IMPORT_JOBS_PATH):
+        self.path = path
+        self.jobs: Dict[str, dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._loaded = False
+        # Checkpoint yazımı: istekler birleştirilir, tek writer task'ı yazar
+        self._save_needed: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        self.stats = {"jobs_started": 0, "jobs_resumed": 0, "windows": 0, "imported": 0, "skipped": 0, "errors": 0}
+
+    # ---- Kalıcılık ----
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if self.path.exists():
+                with open(self.path, "r") as f:
+                    self.jobs = json.load(f)
+        except Exception as e:
+            logger.error(f"❌ Import job dosyası okunamadı: {e}")
+            self.jobs = {}
+
+    def _save(self):
+        """Job'ların yazılmasını iste (event loop'u bloklamaz; yazım writer task'ında)"""
+        if self._save_needed is None:
+            self._save_needed = asyncio.Event()
+        self._save_needed.set()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run_writer())
+
+    async def _run_writer(self):
+        """Bekleyen yazım isteklerini sırayla (en güncel haliyle) yaz"""
+        while True:
+            await self._save_needed.wait()
+            self._save_needed.clear()
+            await self._flush()
+            if self._closing and not self._save_needed.is_set():
+                return
+
+    async def _flush(self):
+        """Job'ların kopyasını event loop'ta al, dosyaya thread havuzunda yaz"""
+        from db_async import run_db
+        finished = sorted(
+            (j for j in self.jobs.values() if j["status"] not in ACTIVE_STATUSES),
+            key=lambda j: j["created_at"]
+        )
+        for job in finished[:-MAX_FINISHED_JOBS]:
+            self.jobs.pop(job["id"], None)
+        try:
+            await run_db(self._write, json.dumps(self.jobs, indent=2))
+        except Exception as e:
+            logger.error(f"❌ Import job checkpoint yazılamadı: {e}")
+
+    def _write(self, data: str):
+        """Atomik yazım (tmp + rename)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    # ---- Job yönetimi ----
+
+    def start(self, coins: List[str], days: int, interval: str, api_key: str) -> dict:
+        """Yeni job oluştur ve arka planda başlat"""
+        self._load()
+        time_end = datetime.now(timezone.utc)
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "coins": coins,
+            "days": days,
+            "interval": interval,
+            "time_start": (time_end - timedelta(days=days)).isoformat(),
+            "time_end": time_end.isoformat(),
+            "created_at": time_end.isoformat(),
+            "finished_at": None,
+            "results": {
+                coin: {"status": "pending", "imported": 0, "skipped": 0, "total": 0, "checkpoint": None}
+                for coin in coins
+            },
+        }
+        self.jobs[job_id] = job
+        self._save()
+        self.stats["jobs_started"] += 1
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, api_key))
+        logger.info(f"📥 Geçmiş veri import job'ı başlatıldı: {job_id} ({len(coins)} coin, {days} gün, {interval})")
+        return self.view(job)
+
+    def resume_pending(self, api_key: Optional[str]) -> int:
+        """Restart öncesi yarım kalan job'lara checkpoint'lerinden devam et"""
+        self._load()
+        pending = [j for j in self.jobs.values() if j["status"] in ACTIVE_STATUSES and j["id"] not in self._tasks]
+        if not pending:
+            return 0
+        if not api_key:
+            logger.warning(f"⚠️ {len(pending)} yarım import job'ı var ama CMC_API_KEY yok, devam edilmiyor")
+            return 0
+        for job in pending:
+            self.stats["jobs_resumed"] += 1
+            self._tasks[job["id"]] = asyncio.create_task(self._run(job["id"], api_key))
+            logger.info(f"♻️ Import job'ı devam ediyor: {job['id']}")
+        return len(pending)
+
+    async def stop(self):
+        """Çalışan job'ları durdur (checkpoint'ler dosyada kalır, sonraki açılışta devam edilir)"""
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Son checkpoint'ler yazılana kadar beklenir
+        if self._writer is not None and not self._writer.done():
+            self._closing = True
+            self._save_needed.set()
+            await self._writer
+        self._writer = None
+        self._closing = False
+
+    async def _run(self, job_id: str, api_key: str):
+        from cmc_client import get_cmc_client
+        from http_session import get_session
+
+        job = self.jobs[job_id]
+        job["status"] = "running"
+        self._save()
+
+        client = get_cmc_client(api_key)
+        session = get_session("cmc")
+        semaphore = asyncio.Semaphore(HISTORICAL_IMPORT_CONCURRENCY)
+
+        async def import_one(coin: str):
+            async with semaphore:
+                await self._import_coin(job, coin, client, session)
+
+        try:
+            await asyncio.gather(*(
+                import_one(coin) for coin, result in job["results"].items()
+                if result["status"] not in ("success", "error")
+            ))
+            job["status"] = "completed"
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+            imported = sum(r["imported"] for r in job["results"].values())
+            logger.info(f"✅ Import job'ı tamamlandı: {job_id} ({imported} yeni kayıt)")
+        except asyncio.CancelledError:
+            # Status "running" kalır: sonraki açılışta resume_pending devam eder
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+            logger.error(f"❌ Import job'ı başarısız: {job_id}: {e}")
+        finally:
+            self._save()
+            self._tasks.pop(job_id, None)
+
+    async def _import_coin(self, job: dict, coin: str, client, session):
+        """Coin'i pencere pencere çek, toplu upsert et ve checkpoint'i ilerlet"""
+        from db_async import run_db
+
+        result = job["results"][coin]
+        result["status"] = "running"
+        storage = get_storage()
+        time_start = datetime.fromisoformat(job["time_start"])
+        time_end = datetime.fromisoformat(job["time_end"])
+        window_start = datetime.fromisoformat(result["checkpoint"]) if result["checkpoint"] else time_start
+        window = timedelta(days=HISTORICAL_IMPORT_WINDOW_DAYS)
+        found_any = result["total"] > 0
+
+        try:
+            while window_start < time_end:
+                window_end = min(window_start + window, time_end)
+                hist_data = await client.get_historical_quotes(
+                    session, coin, window_start.isoformat(), window_end.isoformat(), job["interval"]
+                )
+                points = parse_quotes(coin, hist_data)
+                if points:
+                    found_any = True
+                    written = 0
+                    for i in range(0, len(points), HISTORICAL_IMPORT_CHUNK_SIZE):
+                        written += await run_db(storage.upsert_prices, points[i:i + HISTORICAL_IMPORT_CHUNK_SIZE])
+                    result["imported"] += written
+                    result["skipped"] += len(points) - written
+                    result["total"] += len(points)
+                    self.stats["imported"] += written
+                    self.stats["skipped"] += len(points) - written
+
+                result["checkpoint"] = window_end.isoformat()
+                self.stats["windows"] += 1
+                self._save()
+                window_start = window_end
+
+            if not found_any:
+                result["status"] = "error"
+                result["message"] = "Veri bulunamadı (API limiti olabilir)"
+                logger.warning(f"⚠️ [{coin}] Geçmiş veri bulunamadı")
+                return
+
+            result["status"] = "success"
+            logger.info(f"✅ [{coin}] {result['imported']} yeni kayıt eklendi, {result['skipped']} atlandı")
+            if result["imported"]:
+                await self._refresh_derived(coin, time_start, job["days"])
+
+        except asyncio.CancelledError:
+            result["status"] = "pending"
+            raise
+        except Exception as e:
+            result["status"] = "error"
+            result["message"] = str(e)
+            self.stats["errors"] += 1
+            logger.error(f"❌ [{coin}] Geçmiş veri hatası: {e}")
+        finally:
+            self._save()
+
+    @staticmethod
+    async def _refresh_derived(coin: str, time_start: datetime, days: int):
+        """Bellek içi fiyat buffer'ı, candle'lar, rollup'lar ve gösterge durumları/cache'i yeni geçmişle yeniden oluşturulsun"""
+        from db_async import get_recent_prices_with_timestamps, run_db
+        from price_ring_buffer import price_ring
+        from candle_store import candle_store
+        from price_rollup import invalidate_rollups
+        from indicator_stream import indicator_engine
+        from indicator_cache import indicator_cache
+
+        price_ring.invalidate(coin)
+        indicator_engine.reset(coin)
+        indicator_cache.invalidate(coin)
+        price_data = await get_recent_prices_with_timestamps(coin, hours=days * 24)
+        # Candle'lar havuzda oluşturulup yazılır, bellekteki seriler event loop'ta güncellenir
+        candles = await run_db(candle_store.build_candles, coin, price_data)
+        await run_db(candle_store.write, candles)
+        candle_store.replace(coin, candles)
+        await run_db(invalidate_rollups, coin, time_start)
+
+    # ---- Okuma ----
+
+    @staticmethod
+    def view(job: dict) -> dict:
+        """API yanıtı (checkpoint'ler hariç)"""
+        results = {
+            coin: {k: v for k, v in r.items() if k != "checkpoint"}
+            for coin, r in job["results"].items()
+        }
+        done = sum(1 for r in results.values() if r["status"] in ("success", "error"))
+        return {
+            **{k: v for k, v in job.items() if k != "results"},
+            "progress": {"done": done, "total": len(results)},
+            "results": results,
+        }
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self._load()
+        job = self.jobs.get(job_id)
+        return self.view(job) if job else None
+
+    def list_jobs(self) -> List[dict]:
+        self._load()
+        jobs = sorted(self.jobs.values(), key=lambda j: j["created_at"], reverse=True)
+        return [{k: v for k, v in self.view(j).items() if k != "results"} for j in jobs]
+
+    def get_status(self) -> dict:
+        self._load()
+        return {
+            "active_jobs": sum(1 for j in self.jobs.values() if j["status"] in ACTIVE_STATUSES),
+            "running_tasks": len(self._tasks),
+            "concurrency": HISTORICAL_IMPORT_CONCURRENCY,
+            **self.stats,
+        }
+
+
+# Global instance
+historical_importer = HistoricalImporter()
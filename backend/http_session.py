@@ -0,0 +1,81 @@
+# backend/http_session.py
+"""
+Process genelinde paylaşılan HTTP bağlantı havuzu
+CMC, Telegram ve fiyat doğrulama çağrıları her tick'te yeni
+aiohttp.ClientSession açmak yerine buradaki kalıcı session'ları ödünç alır
+(keep-alive, DNS cache ve host başına bağlantı limiti ile)
+"""
+import os
+import logging
+from typing import Dict
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Bağlantı havuzu ayarları (env ile değiştirilebilir)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+# Servis bazlı toplam timeout (saniye)
+SESSION_TIMEOUTS = {
+    "cmc": float(os.getenv("HTTP_TIMEOUT_CMC", "20")),
+    "telegram": float(os.getenv("HTTP_TIMEOUT_TELEGRAM", "15")),
+    "validator": float(os.getenv("HTTP_TIMEOUT_VALIDATOR", "10")),
+    "default": float(os.getenv("HTTP_TIMEOUT_DEFAULT", "20")),
+}
+
+_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+
+def _create_session(name: str) -> aiohttp.ClientSession:
+    """Yeni kalıcı session oluştur"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=SESSION_TIMEOUTS.get(name, SESSION_TIMEOUTS["default"]),
+        connect=HTTP_CONNECT_TIMEOUT,
+    )
+    logger.info(f"🌐 HTTP session oluşturuldu: {name} (limit/host={HTTP_POOL_LIMIT_PER_HOST}, timeout={timeout.total}s)")
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def get_session(name: str = "default") -> aiohttp.ClientSession:
+    """
+    Paylaşılan session'ı döndür (yoksa veya kapanmışsa oluşturur)
+
+    Args:
+        name: Servis adı ("cmc", "telegram", "validator", "default")
+
+    Returns:
+        aiohttp.ClientSession - çağıran taraf kapatmamalı
+    """
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        session = _create_session(name)
+        _sessions[name] = session
+    return session
+
+
+async def init_sessions():
+    """Uygulama başlangıcında tüm servis session'larını hazırla"""
+    for name in SESSION_TIMEOUTS:
+        get_session(name)
+    logger.info(f"✅ HTTP bağlantı havuzu hazır ({len(_sessions)} session)")
+
+
+async def close_sessions():
+    """Uygulama kapanırken tüm session'ları kapat"""
+    for name, session in list(_sessions.items()):
+        if not session.closed:
+            await session.close()
+    _sessions.clear()
+    logger.info("🛑 HTTP bağlantı havuzu kapatıldı")
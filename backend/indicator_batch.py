@@ -0,0 +1,257 @@
+# backend/indicator_batch.py
+"""
+Coinler arası toplu gösterge hesaplama
+Hizalı (coin x zaman) fiyat matrisi için RSI, MACD, EMA 9/21/50/200,
+volatilite ve signal strength tek vektörize geçişte hesaplanır; sonuç
+coin başına bir kayıt içeren structured array'dir.
+
+scan_coins fiyatları bellekteki ring buffer'dan (veya candle store'dan)
+alır, aynı uzunluktaki serileri tek matriste toplar; her coin'in sonucu
+calculate_indicators(prices) ile aynıdır. GET /api/scanner bunu kullanır.
+"""
+import time
+import logging
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from indicator_kernels import ema_series, macd_series, rsi_series, volatility_series
+
+logger = logging.getLogger(__name__)
+
+# calculate_indicators'a verilen minimum veri (MACD) ve analyzer'ın tick penceresi
+MIN_POINTS = 26
+DEFAULT_TICK_COUNT = 50
+# Candle analizinde kullanılan geçmiş (analyzer ile aynı)
+CANDLE_HISTORY_HOURS = 168
+
+BATCH_DTYPE = np.dtype([
+    ("coin", "U20"),
+    ("points", "i4"),
+    ("price", "f8"),
+    ("rsi", "f8"),
+    ("rsi_signal", "U10"),
+    ("macd", "f8"),
+    ("macd_signal_line", "f8"),
+    ("macd_histogram", "f8"),
+    ("macd_signal", "U10"),
+    ("ema9", "f8"),
+    ("ema21", "f8"),
+    ("ema50", "f8"),
+    ("ema200", "f8"),
+    ("ema_signal", "U10"),
+    ("ema_cross", "U12"),
+    ("volatility", "f8"),
+    ("score", "f8"),
+    ("level", "U11"),
+    ("direction", "U10"),
+    ("bullish_count", "i4"),
+    ("bearish_count", "i4"),
+    ("total_count", "i4"),
+])
+
+stats = {"scans": 0, "coins": 0, "skipped": 0, "batches": 0, "last_ms": 0.0}
+
+
+def _signal(values: np.ndarray, bullish: np.ndarray, bearish: np.ndarray,
+            labels=("BULLISH", "BEARISH", "NEUTRAL")) -> np.ndarray:
+    """Vektörize sinyal etiketi; değer yoksa (NaN) boş string"""
+    out = np.where(bullish, labels[0], np.where(bearish, labels[1], labels[2]))
+    return np.where(np.isnan(values), "", out)
+
+
+def signal_strength(records: np.ndarray):
+    """calculate_signal_strength'in vektörize hali (records alanlarını doldurur)"""
+    score = np.zeros(len(records))
+    bullish = np.zeros(len(records), dtype=np.int32)
+    bearish = np.zeros(len(records), dtype=np.int32)
+    total = np.zeros(len(records), dtype=np.int32)
+
+    # (alan, puan, yükseliş etiketi, düşüş etiketi) - calculate_signal_strength ile aynı ağırlıklar
+    for field, points, up, down in (
+        ("rsi_signal", 30, "OVERSOLD", "OVERBOUGHT"),
+        ("macd_signal", 35, "BULLISH", "BEARISH"),
+        ("ema_signal", 20, "BULLISH", "BEARISH"),
+        ("ema_cross", 15, "GOLDEN_CROSS", "DEATH_CROSS"),
+    ):
+        values = records[field]
+        is_up = values == up
+        is_down = values == down
+        total += values != ""
+        bullish += is_up
+        bearish += is_down
+        score += np.where(is_up | is_down, points, 0)
+
+    records["score"] = np.round(score, 1)
+    records["direction"] = np.where(bullish > bearish, "BULLISH", np.where(bearish > bullish, "BEARISH", "NEUTRAL"))
+    records["level"] = np.select(
+        [score >= 80, score >= 60, score >= 40, score >= 20],
+        ["VERY_STRONG", "STRONG", "MODERATE", "WEAK"],
+        "VERY_WEAK"
+    )
+    records["bullish_count"] = bullish
+    records["bearish_count"] = bearish
+    records["total_count"] = total
+
+
+def batch_indicators(matrix: np.ndarray, coins: Sequence[str] = None) -> np.ndarray:
+    """
+    Hizalı fiyat matrisi için tüm göstergeler
+
+    Args:
+        matrix: (coin x zaman) fiyatlar, en yeni fiyat son sütunda; satırlar eşit uzunlukta (en az 1 sütun)
+        coins: Satır sırasıyla coin sembolleri
+
+    Returns:
+        BATCH_DTYPE structured array (satır başına bir kayıt; hesaplanamayan değerler NaN / "")
+    """
+    prices = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    rows, length = prices.shape
+    records = np.zeros(rows, dtype=BATCH_DTYPE)
+    if coins is not None:
+        records["coin"] = list(coins)
+    records["points"] = length
+    current = prices[:, -1]
+    records["price"] = current
+
+    # RSI (2 ondalık)
+    rsi = np.round(rsi_series(prices, 14)[:, -1], 2)
+    records["rsi"] = rsi
+    records["rsi_signal"] = _signal(rsi, rsi < 30, rsi > 70, ("OVERSOLD", "OVERBOUGHT", "NEUTRAL"))
+
+    # MACD (4 ondalık, en az 26 veri)
+    macd, signal, histogram = (s[:, -1] for s in macd_series(prices, 12, 26, 9))
+    if length < 26:
+        macd = signal = histogram = np.full(rows, np.nan)
+    macd, signal, histogram = np.round(macd, 4), np.round(signal, 4), np.round(histogram, 4)
+    records["macd"] = macd
+    records["macd_signal_line"] = signal
+    records["macd_histogram"] = histogram
+    records["macd_signal"] = _signal(macd, (macd > signal) & (histogram > 0), (macd < signal) & (histogram < 0))
+
+    # EMA'lar (4 ondalık)
+    ema = {period: np.round(ema_series(prices, period)[:, -1], 4) for period in (9, 21, 50, 200)}
+    for period, values in ema.items():
+        records[f"ema{period}"] = values
+    ema_short = ema[9] - ema[21]
+    records["ema_signal"] = _signal(
+        ema_short,
+        (ema[9] > ema[21]) & (current > ema[9]),
+        (ema[9] < ema[21]) & (current < ema[9])
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff_percent = (ema[50] - ema[200]) / ema[200] * 100
+    records["ema_cross"] = _signal(diff_percent, diff_percent > 0.5, diff_percent < -0.5,
+                                   ("GOLDEN_CROSS", "DEATH_CROSS", "NEUTRAL"))
+
+    # Volatilite (son 20 fiyat, 2 ondalık)
+    records["volatility"] = np.round(volatility_series(prices[:, -20:], 20)[:, -1], 2)
+
+    signal_strength(records)
+    return records
+
+
+def collect_prices(coins: Sequence[str], interval: str = None, count: int = None) -> Dict[str, np.ndarray]:
+    """
+    Coinlerin son fiyatları (bellekteki ring buffer veya candle store)
+
+    Args:
+        interval: Candle interval'i (None: ham tick'ler)
+        count: Coin başına son nokta sayısı (tick'lerde varsayılan DEFAULT_TICK_COUNT,
+               candle'larda CANDLE_HISTORY_HOURS'un tamamı)
+    """
+    prices = {}
+    if interval:
+        from candle_store import candle_store
+        if not candle_store.supports(interval):
+            return prices
+        for coin in coins:
+            # Yüklenmemiş seriler atlanır (okuma havuzda çalışır, DB'ye gidilmez)
+            closes = candle_store.get_closes(coin, interval, hours=CANDLE_HISTORY_HOURS)
+            if closes is not None:
+                prices[coin] = np.asarray(closes[-count:] if count else closes, dtype=np.float64)
+    else:
+        from price_ring_buffer import price_ring
+        for coin in coins:
+            latest = price_ring.latest(coin, count or DEFAULT_TICK_COUNT)
+            if latest is not None:
+                prices[coin] = latest
+    return prices
+
+
+def scan_coins(coins: Sequence[str], interval: str = None, count: int = None) -> np.ndarray:
+    """
+    Coinlerin göstergelerini toplu hesapla (aynı uzunluktaki seriler tek matris)
+
+    Returns:
+        BATCH_DTYPE structured array; MIN_POINTS'ten az verisi olan coinler atlanır
+    """
+    started = time.perf_counter()
+    prices = collect_prices(coins, interval, count)
+
+    groups: Dict[int, List[str]] = {}
+    for coin, series in prices.items():
+        if len(series) >= MIN_POINTS:
+            groups.setdefault(len(series), []).append(coin)
+
+    parts = [
+        batch_indicators(np.stack([prices[coin] for coin in group]), group)
+        for group in groups.values()
+    ]
+    records = np.concatenate(parts) if parts else np.zeros(0, dtype=BATCH_DTYPE)
+
+    stats["scans"] += 1
+    stats["batches"] += len(parts)
+    stats["coins"] += len(records)
+    stats["skipped"] += len(coins) - len(records)
+    stats["last_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return records
+
+
+def rank(records: np.ndarray, direction: str = None, min_score: float = 0, limit: int = None) -> np.ndarray:
+    """Kayıtları filtrele ve signal strength skoruna göre (yüksekten düşüğe) sırala"""
+    mask = records["score"] >= min_score
+    if direction:
+        mask &= records["direction"] == direction.upper()
+    records = records[mask]
+    return records[np.argsort(-records["score"], kind="stable")][:limit]
+
+
+def _value(value):
+    """NaN / boş string → None"""
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (str, np.str_)):
+        return str(value) or None
+    return int(value)
+
+
+def to_dict(record) -> dict:
+    """Tek kayıt → calculate_indicators formatı (+ coin, points, price)"""
+    result = {
+        "coin": str(record["coin"]),
+        "points": int(record["points"]),
+        "price": _value(record["price"]),
+    }
+    for field in ("rsi", "rsi_signal", "macd", "macd_signal_line", "macd_histogram",
+                  "macd_signal", "ema9", "ema21", "ema_signal"):
+        result[field] = _value(record[field])
+    if result["ema9"] is None or result["ema21"] is None:
+        result["ema9"] = result["ema21"] = result["ema_signal"] = None
+    for field in ("ema50", "ema200", "ema_cross", "volatility"):
+        value = _value(record[field])
+        if value is not None:
+            result[field] = value
+    result["signal_strength"] = {
+        "score": float(record["score"]),
+        "level": str(record["level"]),
+        "direction": str(record["direction"]),
+        "bullish_count": int(record["bullish_count"]),
+        "bearish_count": int(record["bearish_count"]),
+        "total_count": int(record["total_count"]),
+    }
+    return result
+
+
+def get_status() -> dict:
+    return dict(stats)
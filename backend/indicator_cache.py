@@ -0,0 +1,155 @@
+# backend/indicator_cache.py
+"""
+Gösterge sonuç cache'i
+/api/indicators/{symbol} ve analyze_single_coin aynı veri üzerinde aynı
+göstergeleri tekrar tekrar hesaplıyordu. Sonuçlar (coin, seri, en yeni
+fiyatın zamanı) anahtarıyla boyutu sınırlı bir LRU'da tutulur:
+- seri: "tick" (son 50 ham fiyat), candle interval'i veya istatistik türü
+- En yeni fiyatın zamanı bellekteki ring buffer'dan okunur; yeni fiyat
+  geldiğinde anahtar değişir ve eski sonuç kendiliğinden geçersiz olur
+- (coin, seri) başına tek kayıt tutulur, eskisinin yerine yenisi yazılır
+- Varsayılan dışı gösterge seçimleri ayrı seri olarak tutulur (series_key)
+
+Ring buffer'ı yüklü olmayan coinler cache'lenmez (her seferinde hesaplanır).
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from indicators import calculate_indicators
+from indicator_registry import DEFAULT_INDICATORS, INDICATORS, resolve
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_CACHE_SIZE = int(os.getenv("INDICATOR_CACHE_SIZE", "4096"))
+
+TICK_SERIES = "tick"
+# calculate_indicators için minimum veri (MACD) ve son fiyat penceresi
+MIN_POINTS = 26
+TICK_COUNT = 50
+
+
+def newest_timestamp(coin: str) -> Optional[float]:
+    """Coin'in en yeni fiyatının zamanı (ring buffer'dan, DB'ye gidilmez)"""
+    from price_ring_buffer import price_ring
+    return price_ring.last_timestamp(coin)
+
+
+def series_key(series: str, names: Iterable[str] = None) -> str:
+    """Seri + gösterge seçimi anahtarı (varsayılan seçim için seri adı aynen)"""
+    names = resolve(names)
+    if names == DEFAULT_INDICATORS:
+        return series
+    return f"{series}|{'+'.join(names)}"
+
+
+class IndicatorCache:
+    """(coin, seri) başına son sonuç; en yeni fiyat zamanı eşleşirse hit"""
+
+    def __init__(self, max_entries: int = INDICATOR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, coin: str, series: str, newest_ts: Optional[float]):
+        """newest_ts ile hesaplanmış sonuç varsa döndür, yoksa None"""
+        if newest_ts is None:
+            self.stats["misses"] += 1
+            return None
+        key = (coin, series)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            stored_ts, value = entry
+            if stored_ts != newest_ts:
+                # Yeni veri gelmiş: eski sonuç geçersiz
+                del self._data[key]
+                self.stats["stale"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, coin: str, series: str, newest_ts: Optional[float], value):
+        if newest_ts is None or value is None:
+            return
+        with self._lock:
+            self._data[(coin, series)] = (newest_ts, value)
+            self._data.move_to_end((coin, series))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, coin: str = None):
+        """Coin'in (veya tümünün) sonuçlarını at (örn. geçmiş veri import'u sonrası)"""
+        with self._lock:
+            keys = [k for k in self._data if coin is None or k[0] == coin]
+            for key in keys:
+                del self._data[key]
+            self.stats["invalidations"] += len(keys)
+
+    def get_status(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+# Global instance
+indicator_cache = IndicatorCache()
+
+
+async def recent_indicators(coin: str, count: int = TICK_COUNT, names: Iterable[str] = None) -> Tuple[dict, int]:
+    """
+    Son count ham fiyatın göstergeleri (cache'li; analyzer ve /api/indicators paylaşır)
+
+    Args:
+        names: Hesaplanacak göstergeler (None: varsayılanlar, bkz. indicator_registry)
+
+    Returns:
+        (calculate_indicators sonucu veya veri yetersizse {}, kullanılan fiyat sayısı)
+    """
+    from db_async import get_recent_prices
+
+    names = resolve(names)
+    series = series_key(TICK_SERIES if count == TICK_COUNT else f"{TICK_SERIES}:{count}", names)
+    # Anahtar okumadan önce alınır: arada gelen fiyat sonraki okumada miss'e yol açar, eski sonuç dönmez
+    newest = newest_timestamp(coin)
+    cached = indicator_cache.get(coin, series, newest)
+    if cached is not None:
+        return cached
+
+    prices = await get_recent_prices(coin, count=count)
+    ohlcv = None
+    if any("volume" in INDICATORS[name].inputs for name in names):
+        # Ham tick'lerde hacim (volume_24h) sadece ring buffer'da hazır; DB'ye ayrıca gidilmez
+        from price_ring_buffer import price_ring
+        window = price_ring.tail(coin, len(prices))
+        if window is not None and len(window[2]) == len(prices) and newest_timestamp(coin) == newest:
+            ohlcv = {"volume": window[2]}
+    result = (calculate_indicators(prices, names, ohlcv=ohlcv) if len(prices) >= MIN_POINTS else {}, len(prices))
+    indicator_cache.put(coin, series, newest, result)
+    return result
+
+
+async def price_statistics(coin: str, hours: int = 24) -> Optional[dict]:
+    """get_price_statistics (cache'li)"""
+    from db_async import get_price_statistics
+
+    series = f"stats:{hours}"
+    newest = newest_timestamp(coin)
+    cached = indicator_cache.get(coin, series, newest)
+    if cached is not None:
+        return cached
+    stats = await get_price_statistics(coin, hours=hours)
+    indicator_cache.put(coin, series, newest, stats)
+    return stats
@@ -0,0 +1,225 @@
+# backend/indicator_kernels.py
+"""
+Vektörize gösterge kernel'ları (tam seri)
+EMA, Wilder RSI, MACD ve kayan volatilite (ve indicator_registry'deki Bollinger,
+ATR, Stochastic, OBV, VWAP) tüm seri için NumPy ile hesaplanır; grafikler ve
+backtest'ler seriyi, indicators.py son değeri kullanır.
+
+Üstel ortalamalar y[n] = d * y[n-1] + a * x[n] özyinelemesinin kapalı formuyla
+(cumsum) hesaplanır. d^-n taşmasın diye seri bloklara bölünür: blok başına
+tek bir NumPy geçişi yapılır, Python döngüsü sadece bloklar üzerindedir.
+
+Tüm seriler giriş uzunluğundadır; ısınma süresi dolmayan noktalar NaN'dır.
+2D giriş (coin x zaman) son eksen boyunca satır satır hesaplanır.
+"""
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Blok içinde d^-k bu ölçeği (e^200) aşmaz: taşma olmaz, hassasiyet korunur
+_EWM_MAX_LOG_SCALE = 200.0
+
+
+def _as_array(prices: Sequence[float]) -> np.ndarray:
+    return np.asarray(prices, dtype=np.float64)
+
+
+def ewm(values: np.ndarray, alpha: float, init) -> np.ndarray:
+    """
+    y[n] = (1 - alpha) * y[n-1] + alpha * x[n], y[-1] = init (son eksen boyunca)
+
+    Args:
+        values: Giriş serisi (1D veya coin x zaman)
+        alpha: Yumuşatma katsayısı (0 < alpha <= 1)
+        init: Başlangıç değeri (ilk noktadan önceki y; 2D'de satır başına)
+    """
+    x = _as_array(values)
+    out = np.empty_like(x)
+    decay = 1.0 - alpha
+    length = x.shape[-1]
+    if length == 0:
+        return out
+    if decay <= 0:
+        out[...] = x * alpha
+        return out
+
+    block = max(1, int(_EWM_MAX_LOG_SCALE / -math.log(decay)))
+    powers = decay ** np.arange(min(block, length))
+    prev = np.asarray(init, dtype=np.float64)[..., None]
+    for start in range(0, length, block):
+        chunk = x[..., start:start + block]
+        p = powers[:chunk.shape[-1]]
+        y = p * (decay * prev + alpha * np.cumsum(chunk / p, axis=-1))
+        out[..., start:start + block] = y
+        prev = y[..., -1:]
+    return out
+
+
+def ema_series(prices: Sequence[float], period: int) -> np.ndarray:
+    """EMA serisi; ilk değer ilk period fiyatın ortalaması (calculate_ema ile aynı)"""
+    x = _as_array(prices)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < period:
+        return out
+    seed = x[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = ewm(x[..., period:], 2 / (period + 1), seed)
+    return out
+
+
+def rsi_series(prices: Sequence[float], period: int = 14) -> np.ndarray:
+    """Wilder RSI serisi; ilk değer period + 1. fiyatta (calculate_rsi ile aynı, yuvarlanmamış)"""
+    x = _as_array(prices)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < period + 1:
+        return out
+    deltas = np.diff(x, axis=-1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    shape = x.shape[:-1] + (x.shape[-1] - period,)
+    avg_gain = np.empty(shape)
+    avg_loss = np.empty(shape)
+    avg_gain[..., 0] = gains[..., :period].mean(axis=-1)
+    avg_loss[..., 0] = losses[..., :period].mean(axis=-1)
+    avg_gain[..., 1:] = ewm(gains[..., period:], 1 / period, avg_gain[..., 0])
+    avg_loss[..., 1:] = ewm(losses[..., period:], 1 / period, avg_loss[..., 0])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    out[..., period:] = np.where(avg_loss == 0, 100.0, rsi)
+    return out
+
+
+def macd_series(prices: Sequence[float],
+                fast_period: int = 12,
+                slow_period: int = 26,
+                signal_period: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD, sinyal ve histogram serileri (calculate_macd ile aynı: EMA'lar ilk fiyatla,
+    sinyal EMA'sı ilk MACD değeriyle başlar)
+
+    Returns:
+        (macd, signal, histogram) - giriş uzunluğunda
+    """
+    x = _as_array(prices)
+    if x.shape[-1] == 0:
+        return x.copy(), x.copy(), x.copy()
+    first = x[..., 0]
+    macd = ewm(x, 2 / (fast_period + 1), first) - ewm(x, 2 / (slow_period + 1), first)
+    signal = ewm(macd, 2 / (signal_period + 1), macd[..., 0])
+    return macd, signal, macd - signal
+
+
+def volatility_series(prices: Sequence[float], window: int = 20) -> np.ndarray:
+    """Kayan pencere volatilitesi (std / ortalama * 100, calculate_volatility ile aynı, yuvarlanmamış)"""
+    x = _as_array(prices)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < window or window < 2:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+    mean = windows.mean(axis=-1)
+    std = windows.std(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., window - 1:] = np.where(mean > 0, std / mean * 100, 0.0)
+    return out
+
+
+def sma_series(values: Sequence[float], period: int) -> np.ndarray:
+    """Basit hareketli ortalama serisi"""
+    x = _as_array(values)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < period:
+        return out
+    out[..., period - 1:] = np.lib.stride_tricks.sliding_window_view(x, period, axis=-1).mean(axis=-1)
+    return out
+
+
+def bollinger_series(prices: Sequence[float], period: int = 20,
+                     num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger bantları (orta bant SMA, bant genişliği popülasyon std)
+
+    Returns:
+        (middle, upper, lower) - giriş uzunluğunda
+    """
+    x = _as_array(prices)
+    middle = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan)
+    if x.shape[-1] >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(x, period, axis=-1)
+        middle[..., period - 1:] = windows.mean(axis=-1)
+        std[..., period - 1:] = windows.std(axis=-1)
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+def true_range_series(high: Sequence[float], low: Sequence[float], close: Sequence[float]) -> np.ndarray:
+    """True range; ilk nokta high - low"""
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    tr = h - l
+    if c.shape[-1] > 1:
+        prev = c[..., :-1]
+        tr[..., 1:] = np.maximum(tr[..., 1:], np.maximum(np.abs(h[..., 1:] - prev), np.abs(l[..., 1:] - prev)))
+    return tr
+
+
+def atr_series(high: Sequence[float], low: Sequence[float], close: Sequence[float], period: int = 14) -> np.ndarray:
+    """Wilder ATR; ilk değer ilk period true range'in ortalaması"""
+    tr = true_range_series(high, low, close)
+    out = np.full(tr.shape, np.nan)
+    if tr.shape[-1] < period:
+        return out
+    seed = tr[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = ewm(tr[..., period:], 1 / period, seed)
+    return out
+
+
+def stochastic_series(high: Sequence[float], low: Sequence[float], close: Sequence[float],
+                      k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stochastic osilatör (%K son k_period'un aralığında close'un yeri, %D %K'nın SMA'sı)
+    Aralık sıfırsa %K = 50.
+
+    Returns:
+        (%K, %D) - giriş uzunluğunda
+    """
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    k = np.full(c.shape, np.nan)
+    if c.shape[-1] >= k_period:
+        highest = np.lib.stride_tricks.sliding_window_view(h, k_period, axis=-1).max(axis=-1)
+        lowest = np.lib.stride_tricks.sliding_window_view(l, k_period, axis=-1).min(axis=-1)
+        span = highest - lowest
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k[..., k_period - 1:] = np.where(span > 0, (c[..., k_period - 1:] - lowest) / span * 100, 50.0)
+    d = np.full(c.shape, np.nan)
+    start = k_period - 1
+    if c.shape[-1] - start >= d_period:
+        d[..., start:] = sma_series(k[..., start:], d_period)
+    return k, d
+
+
+def obv_series(close: Sequence[float], volume: Sequence[float]) -> np.ndarray:
+    """On-balance volume (ilk nokta 0; close yükselirse hacim eklenir, düşerse çıkarılır)"""
+    c, v = _as_array(close), _as_array(volume)
+    out = np.zeros(c.shape)
+    if c.shape[-1] > 1:
+        out[..., 1:] = np.cumsum(np.sign(np.diff(c, axis=-1)) * v[..., 1:], axis=-1)
+    return out
+
+
+def vwap_series(high: Sequence[float], low: Sequence[float], close: Sequence[float],
+                volume: Sequence[float], period: int = 20) -> np.ndarray:
+    """Kayan pencere VWAP (tipik fiyat (h + l + c) / 3, hacimle ağırlıklı); hacim sıfırsa tipik fiyat ortalaması"""
+    h, l, c, v = _as_array(high), _as_array(low), _as_array(close), _as_array(volume)
+    out = np.full(c.shape, np.nan)
+    if c.shape[-1] < period:
+        return out
+    typical = (h + l + c) / 3
+    pv = np.lib.stride_tricks.sliding_window_view(typical * v, period, axis=-1).sum(axis=-1)
+    vol = np.lib.stride_tricks.sliding_window_view(v, period, axis=-1).sum(axis=-1)
+    mean = np.lib.stride_tricks.sliding_window_view(typical, period, axis=-1).mean(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., period - 1:] = np.where(vol > 0, pv / vol, mean)
+    return out
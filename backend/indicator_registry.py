@@ -0,0 +1,516 @@
+# backend/indicator_registry.py
+"""
+Gösterge registry'si
+Her gösterge girişlerini (close veya candle varsa high/low/volume), son değer
+için gereken minimum veriyi (warm-up), vektörize hesaplamasını (tam seriden
+son değer) ve artımlı (streaming, nokta başına O(1)) durumunu tanımlar.
+
+calculate_indicators sadece istenen göstergeleri hesaplar: coin ayarındaki
+(yoksa global) "indicators" listesi + modelin kullandıkları (model_stub.
+MODEL_INDICATORS). Liste verilmemişse varsayılanlar (RSI, MACD, EMA 9/21,
+EMA 50/200, volatilite) hesaplanır; çıktı eskisiyle aynıdır.
+
+Ham tick'lerde high = low = close'tur. CMC sadece kayan 24 saatlik hacmi
+(volume_24h) verdiği için OBV ve VWAP'ın nokta başına hacmi ardışık volume_24h
+farkıdır (negatif farklar 0); volume_24h hiç yoksa bu göstergeler atlanır.
+"""
+import math
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indicator_kernels import (
+    atr_series,
+    bollinger_series,
+    obv_series,
+    stochastic_series,
+    vwap_series,
+)
+from indicators import (
+    calculate_ema,
+    calculate_macd,
+    calculate_rsi,
+    calculate_volatility,
+    get_ema_cross_signal,
+    get_ema_signal,
+    get_macd_signal,
+    get_rsi_signal,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalIndicator(ABC):
+    """Artımlı gösterge durumu: her nokta O(1), values() son değerler"""
+
+    @abstractmethod
+    def update(self, close: float, high: float, low: float, volume: Optional[float]):
+        """Yeni nokta; volume CMC'nin kayan volume_24h değeridir"""
+
+    @abstractmethod
+    def values(self) -> dict:
+        """Son değer alanları (warm-up dolmadıysa {})"""
+
+    def to_dict(self) -> dict:
+        return {k: [list(i) if isinstance(i, tuple) else i for i in v] if isinstance(v, deque) else v
+                for k, v in vars(self).items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["IncrementalIndicator"]:
+        """Kayıtlı durum; alanları değişmişse None (durum geçmişten yeniden kurulur)"""
+        state = cls()
+        if not set(vars(state)) <= set(data):
+            return None
+        for key, value in data.items():
+            current = getattr(state, key, None)
+            if isinstance(current, deque):
+                value = deque((tuple(i) if isinstance(i, list) else i for i in value), maxlen=current.maxlen)
+            setattr(state, key, value)
+        return state
+
+
+class IndicatorSpec(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]
+    warmup: int
+    # Vektörize: {"close": ndarray, ...} → son değer alanları (veri yetersizse {})
+    compute: Callable[[Dict[str, np.ndarray]], dict]
+    # Artımlı durum fabrikası; None: indicator_stream.IndicatorState içinde (çekirdek göstergeler)
+    incremental: Optional[Callable[[], IncrementalIndicator]] = None
+
+
+INDICATORS: Dict[str, IndicatorSpec] = {}
+
+
+def register(spec: IndicatorSpec) -> IndicatorSpec:
+    INDICATORS[spec.name] = spec
+    return spec
+
+
+# ---- Çekirdek göstergeler (calculate_indicators'ın varsayılan çıktısı) ----
+
+def _rsi(series: Dict[str, np.ndarray]) -> dict:
+    rsi = calculate_rsi(series["close"], period=14)
+    if rsi is None:
+        return {}
+    return {"rsi": rsi, "rsi_signal": get_rsi_signal(rsi)}
+
+
+def _macd(series: Dict[str, np.ndarray]) -> dict:
+    macd_result = calculate_macd(series["close"], fast_period=12, slow_period=26, signal_period=9)
+    if macd_result is None:
+        return {}
+    macd, signal, histogram = macd_result
+    return {
+        "macd": macd,
+        "macd_signal_line": signal,
+        "macd_histogram": histogram,
+        "macd_signal": get_macd_signal(macd, signal, histogram),
+    }
+
+
+def _ema(series: Dict[str, np.ndarray]) -> dict:
+    close = series["close"]
+    ema9 = calculate_ema(close, period=9)
+    ema21 = calculate_ema(close, period=21)
+    if ema9 is None or ema21 is None:
+        return {}
+    return {"ema9": ema9, "ema21": ema21, "ema_signal": get_ema_signal(ema9, ema21, float(close[-1]))}
+
+
+def _ema_long(series: Dict[str, np.ndarray]) -> dict:
+    result = {}
+    ema50 = calculate_ema(series["close"], period=50)
+    ema200 = calculate_ema(series["close"], period=200)
+    if ema50 is not None:
+        result["ema50"] = ema50
+    if ema200 is not None:
+        result["ema200"] = ema200
+    # Golden Cross / Death Cross tespiti
+    if ema50 is not None and ema200 is not None:
+        result["ema_cross"] = get_ema_cross_signal(ema50, ema200)
+    return result
+
+
+def _volatility(series: Dict[str, np.ndarray]) -> dict:
+    return {"volatility": calculate_volatility(series["close"][-20:])}
+
+
+register(IndicatorSpec("rsi", ("close",), 15, _rsi))
+register(IndicatorSpec("macd", ("close",), 26, _macd))
+register(IndicatorSpec("ema", ("close",), 21, _ema))
+register(IndicatorSpec("ema_long", ("close",), 50, _ema_long))
+register(IndicatorSpec("volatility", ("close",), 20, _volatility))
+
+DEFAULT_INDICATORS = ("rsi", "macd", "ema", "ema_long", "volatility")
+
+
+# ---- Bollinger bantları (20, 2 std) ----
+
+BOLLINGER_PERIOD, BOLLINGER_STD = 20, 2.0
+
+
+def _bollinger_fields(middle: float, upper: float, lower: float, close: float) -> dict:
+    if close > upper:
+        signal = "OVERBOUGHT"
+    elif close < lower:
+        signal = "OVERSOLD"
+    else:
+        signal = "NEUTRAL"
+    return {
+        "bb_upper": round(upper, 8),
+        "bb_middle": round(middle, 8),
+        "bb_lower": round(lower, 8),
+        "bb_width": round((upper - lower) / middle * 100 if middle > 0 else 0, 2),
+        "bb_percent_b": round((close - lower) / (upper - lower) if upper > lower else 0.5, 4),
+        "bb_signal": signal,
+    }
+
+
+def _bollinger(series: Dict[str, np.ndarray]) -> dict:
+    close = series["close"][-BOLLINGER_PERIOD:]
+    middle, upper, lower = (float(s[-1]) for s in bollinger_series(close, BOLLINGER_PERIOD, BOLLINGER_STD))
+    if math.isnan(middle):
+        return {}
+    return _bollinger_fields(middle, upper, lower, float(close[-1]))
+
+
+class BollingerState(IncrementalIndicator):
+    """Kayan pencere ortalama ve varyans (Welford)"""
+
+    def __init__(self):
+        self.window = deque(maxlen=BOLLINGER_PERIOD)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, close, high, low, volume):
+        if len(self.window) < BOLLINGER_PERIOD:
+            self.window.append(close)
+            delta = close - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (close - self.mean)
+        else:
+            old = self.window[0]
+            self.window.append(close)
+            old_mean = self.mean
+            self.mean += (close - old) / BOLLINGER_PERIOD
+            self.m2 = max(0.0, self.m2 + (close - old) * (close - self.mean + old - old_mean))
+
+    def values(self) -> dict:
+        if len(self.window) < BOLLINGER_PERIOD:
+            return {}
+        band = BOLLINGER_STD * math.sqrt(self.m2 / BOLLINGER_PERIOD)
+        return _bollinger_fields(self.mean, self.mean + band, self.mean - band, self.window[-1])
+
+
+register(IndicatorSpec("bollinger", ("close",), BOLLINGER_PERIOD, _bollinger, BollingerState))
+
+
+# ---- ATR (14, Wilder) ----
+
+ATR_PERIOD = 14
+
+
+def _atr_fields(atr: float, close: float) -> dict:
+    return {"atr": round(atr, 8), "atr_percent": round(atr / close * 100 if close > 0 else 0, 2)}
+
+
+def _atr(series: Dict[str, np.ndarray]) -> dict:
+    atr = float(atr_series(series["high"], series["low"], series["close"], ATR_PERIOD)[-1])
+    if math.isnan(atr):
+        return {}
+    return _atr_fields(atr, float(series["close"][-1]))
+
+
+class ATRState(IncrementalIndicator):
+    def __init__(self):
+        self.count = 0
+        self.prev_close = None
+        self.seed = 0.0
+        self.atr = None
+
+    def update(self, close, high, low, volume):
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < ATR_PERIOD:
+            self.seed += tr
+        elif self.count == ATR_PERIOD:
+            self.atr = (self.seed + tr) / ATR_PERIOD
+        else:
+            self.atr += (tr - self.atr) / ATR_PERIOD
+
+    def values(self) -> dict:
+        if self.atr is None:
+            return {}
+        return _atr_fields(self.atr, self.prev_close)
+
+
+register(IndicatorSpec("atr", ("high", "low", "close"), ATR_PERIOD, _atr, ATRState))
+
+
+# ---- Stochastic (%K 14, %D 3) ----
+
+STOCH_K_PERIOD, STOCH_D_PERIOD = 14, 3
+
+
+def _stochastic_fields(k: float, d: Optional[float]) -> dict:
+    if k < 20:
+        signal = "OVERSOLD"
+    elif k > 80:
+        signal = "OVERBOUGHT"
+    else:
+        signal = "NEUTRAL"
+    return {"stoch_k": round(k, 2), "stoch_d": round(d, 2) if d is not None else None, "stoch_signal": signal}
+
+
+def _stochastic(series: Dict[str, np.ndarray]) -> dict:
+    window = STOCH_K_PERIOD + STOCH_D_PERIOD - 1
+    k, d = stochastic_series(series["high"][-window:], series["low"][-window:], series["close"][-window:],
+                             STOCH_K_PERIOD, STOCH_D_PERIOD)
+    k, d = float(k[-1]), float(d[-1])
+    if math.isnan(k):
+        return {}
+    return _stochastic_fields(k, None if math.isnan(d) else d)
+
+
+class StochasticState(IncrementalIndicator):
+    """Pencere max/min'i monoton kuyruklarla (amortize O(1))"""
+
+    def __init__(self):
+        self.index = 0
+        self.highs = deque()  # (index, high) azalan
+        self.lows = deque()  # (index, low) artan
+        self.k_values = deque(maxlen=STOCH_D_PERIOD)
+
+    def update(self, close, high, low, volume):
+        i = self.index
+        self.index += 1
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((i, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((i, low))
+        expired = i - STOCH_K_PERIOD
+        while self.highs[0][0] <= expired:
+            self.highs.popleft()
+        while self.lows[0][0] <= expired:
+            self.lows.popleft()
+        if self.index >= STOCH_K_PERIOD:
+            span = self.highs[0][1] - self.lows[0][1]
+            self.k_values.append((close - self.lows[0][1]) / span * 100 if span > 0 else 50.0)
+
+    def values(self) -> dict:
+        if not self.k_values:
+            return {}
+        d = sum(self.k_values) / STOCH_D_PERIOD if len(self.k_values) == STOCH_D_PERIOD else None
+        return _stochastic_fields(self.k_values[-1], d)
+
+
+register(IndicatorSpec("stochastic", ("high", "low", "close"), STOCH_K_PERIOD, _stochastic, StochasticState))
+
+
+# ---- Hacim (volume_24h farkı) ----
+
+def interval_volume(volume_24h: np.ndarray) -> np.ndarray:
+    """Kayan 24 saatlik hacim serisinden nokta başına hacim (ilk nokta ve eksik hacimler 0)"""
+    if not len(volume_24h):
+        return volume_24h
+    previous = np.concatenate(([volume_24h[0]], volume_24h[:-1]))
+    delta = np.maximum(volume_24h - previous, 0.0)
+    delta[(previous <= 0) | (volume_24h <= 0)] = 0.0
+    return delta
+
+
+def _volume_delta(previous: Optional[float], volume_24h: Optional[float]) -> float:
+    """interval_volume'un tek noktalık karşılığı"""
+    if not previous or not volume_24h or previous <= 0 or volume_24h <= 0:
+        return 0.0
+    return max(volume_24h - previous, 0.0)
+
+
+# ---- OBV ----
+
+def _obv(series: Dict[str, np.ndarray]) -> dict:
+    return {"obv": round(float(obv_series(series["close"], series["volume"])[-1]), 2)}
+
+
+class OBVState(IncrementalIndicator):
+    def __init__(self):
+        self.prev_close = None
+        self.prev_volume_24h = None
+        self.obv = 0.0
+
+    def update(self, close, high, low, volume):
+        volume, self.prev_volume_24h = _volume_delta(self.prev_volume_24h, volume), volume
+        if self.prev_close is not None:
+            if close > self.prev_close:
+                self.obv += volume
+            elif close < self.prev_close:
+                self.obv -= volume
+        self.prev_close = close
+
+    def values(self) -> dict:
+        if self.prev_close is None:
+            return {}
+        return {"obv": round(self.obv, 2)}
+
+
+register(IndicatorSpec("obv", ("close", "volume"), 1, _obv, OBVState))
+
+
+# ---- VWAP (kayan 20) ----
+
+VWAP_PERIOD = 20
+
+
+def _vwap_fields(vwap: float, close: float) -> dict:
+    if close > vwap:
+        signal = "BULLISH"
+    elif close < vwap:
+        signal = "BEARISH"
+    else:
+        signal = "NEUTRAL"
+    return {"vwap": round(vwap, 8), "vwap_signal": signal}
+
+
+def _vwap(series: Dict[str, np.ndarray]) -> dict:
+    window = slice(-VWAP_PERIOD, None)
+    vwap = float(vwap_series(series["high"][window], series["low"][window], series["close"][window],
+                             series["volume"][window], VWAP_PERIOD)[-1])
+    if math.isnan(vwap):
+        return {}
+    return _vwap_fields(vwap, float(series["close"][-1]))
+
+
+class VWAPState(IncrementalIndicator):
+    """Pencere toplamları; kayan toplam hatası birikmesin diye pencere dolunca yeniden toplanır"""
+
+    def __init__(self):
+        self.window = deque(maxlen=VWAP_PERIOD)  # (tipik * hacim, hacim, tipik)
+        self.sums = [0.0, 0.0, 0.0]
+        self.since_resync = 0
+        self.close = None
+        self.prev_volume_24h = None
+
+    def update(self, close, high, low, volume):
+        typical = (high + low + close) / 3
+        volume, self.prev_volume_24h = _volume_delta(self.prev_volume_24h, volume), volume
+        point = (typical * volume, volume, typical)
+        if len(self.window) == VWAP_PERIOD:
+            old = self.window[0]
+            self.sums = [s - o for s, o in zip(self.sums, old)]
+        self.window.append(point)
+        self.sums = [s + p for s, p in zip(self.sums, point)]
+        self.close = close
+        self.since_resync += 1
+        if self.since_resync >= VWAP_PERIOD:
+            self.sums = [math.fsum(p[i] for p in self.window) for i in range(3)]
+            self.since_resync = 0
+
+    def values(self) -> dict:
+        if len(self.window) < VWAP_PERIOD:
+            return {}
+        pv, vol, typical = self.sums
+        return _vwap_fields(pv / vol if vol > 0 else typical / VWAP_PERIOD, self.close)
+
+
+register(IndicatorSpec("vwap", ("high", "low", "close", "volume"), VWAP_PERIOD, _vwap, VWAPState))
+
+
+# ---- Seçim ve hesaplama ----
+
+def resolve(names: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """İstenen göstergeler (registry sırasıyla, bilinmeyenler atlanır); None → varsayılanlar"""
+    if names is None:
+        return DEFAULT_INDICATORS
+    wanted = set(names)
+    unknown = wanted - set(INDICATORS)
+    if unknown:
+        logger.warning(f"⚠️ Bilinmeyen gösterge(ler) atlandı: {', '.join(sorted(unknown))}")
+    return tuple(name for name in INDICATORS if name in wanted)
+
+
+def select_indicators(coin_config: dict = None, cfg: dict = None) -> Tuple[str, ...]:
+    """
+    Coin için hesaplanacak göstergeler
+
+    Coin ayarındaki (yoksa global config'teki) "indicators" listesi + modelin kullandıkları;
+    liste yoksa varsayılanlar.
+    """
+    from model_stub import MODEL_INDICATORS
+
+    requested = (coin_config or {}).get("indicators") or (cfg or {}).get("indicators")
+    if not requested:
+        return DEFAULT_INDICATORS
+    return resolve(list(MODEL_INDICATORS) + list(requested))
+
+
+def build_inputs(prices: Sequence[float], ohlcv: dict = None) -> Dict[str, np.ndarray]:
+    """
+    Gösterge girişleri (close zorunlu; high/low yoksa close, hacim yoksa girişte yer almaz)
+
+    Args:
+        prices: Close fiyatları (en yeni sonda)
+        ohlcv: {"high": [...], "low": [...], "volume": [...]} (close ile aynı uzunlukta, opsiyonel;
+            volume kayan volume_24h değerleridir, nokta başına hacme çevrilir)
+    """
+    close = np.asarray(prices, dtype=np.float64)
+    series = {"close": close}
+    ohlcv = ohlcv or {}
+    for name in ("high", "low", "volume"):
+        values = ohlcv.get(name)
+        if values is not None and len(values) == len(close):
+            values = np.asarray(values, dtype=np.float64)
+            if name == "volume":
+                if not np.any(values > 0):
+                    continue
+                values = interval_volume(values)
+            series[name] = values
+        elif name != "volume":
+            series[name] = close
+    return series
+
+
+def compute_indicators(series: Dict[str, np.ndarray], names: Iterable[str]) -> dict:
+    """İstenen göstergelerin vektörize hesabı (warm-up'ı dolmayan veya girişi olmayanlar atlanır)"""
+    result = {}
+    length = len(series["close"])
+    for name in names:
+        spec = INDICATORS[name]
+        if length < spec.warmup or any(i not in series for i in spec.inputs):
+            continue
+        result.update(spec.compute(series))
+    return result
+
+
+def create_incremental(names: Iterable[str]) -> Dict[str, IncrementalIndicator]:
+    """Artımlı durumu registry'de tanımlı (çekirdek dışı) göstergeler için yeni durumlar"""
+    return {name: INDICATORS[name].incremental() for name in names if INDICATORS[name].incremental}
+
+
+def incremental_from_dict(data: Dict[str, dict]) -> Dict[str, IncrementalIndicator]:
+    states = {}
+    for name, value in data.items():
+        spec = INDICATORS.get(name)
+        if spec is not None and spec.incremental:
+            state = spec.incremental.from_dict(value)
+            if state is not None:
+                states[name] = state
+    return states
+
+
+def list_indicators() -> List[dict]:
+    """Registry içeriği (API için); çekirdek göstergeler IndicatorState'te artımlıdır"""
+    return [
+        {"name": s.name, "inputs": list(s.inputs), "warmup": s.warmup,
+         "default": s.name in DEFAULT_INDICATORS,
+         "incremental": s.incremental is not None or s.name in DEFAULT_INDICATORS}
+        for s in INDICATORS.values()
+    ]
@@ -0,0 +1,424 @@
+# backend/indicator_stream.py
+"""
+Artımlı (streaming) gösterge durumu
+calculate_indicators her tick'te RSI, MACD ve EMA'ları tüm pencere üzerinden
+yeniden hesaplar. Burada coin ve seri (ham tick veya candle interval'i) başına
+EMA değerleri, Wilder ortalamaları, MACD sinyal EMA'sı ve volatilite için
+kayan pencere Welford varyansı tutulur; her yeni fiyat/kapanmış candle O(1)
+ile işlenir, maliyet lookback uzunluğundan bağımsızdır.
+
+Yeni noktalar okuma anında bellek içi kaynaklardan alınır (price_ring,
+candle_store): durum sadece son işlenen noktadan sonrasını uygular. Durum
+INDICATOR_STATE_PATH dosyasına periyodik yazılır (kopya event loop'ta alınır,
+JSON ve dosya yazımı thread havuzunda); restart sonrası tam replay gerekmez.
+
+Registry'deki diğer göstergeler (Bollinger, ATR, ...) istendiği anda durumla
+birlikte tutulur (IndicatorState.extras, indicator_registry artımlı durumları).
+
+FEATURE_ENABLE_STREAMING_INDICATORS ile analyzer bu durumu kullanır.
+Not: Pencere yerine tüm geçmiş kullanıldığından değerler son 50 fiyatla
+hesaplanandan (özellikle EMA200 ve RSI) küçük farklar gösterebilir.
+"""
+import os
+import copy
+import json
+import math
+import asyncio
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from indicators import (
+    calculate_signal_strength,
+    get_ema_cross_signal,
+    get_ema_signal,
+    get_macd_signal,
+    get_rsi_signal,
+)
+from indicator_registry import (
+    INDICATORS,
+    IncrementalIndicator,
+    create_incremental,
+    incremental_from_dict,
+    resolve,
+)
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_STATE_PATH = Path(os.getenv("INDICATOR_STATE_PATH", str(Path(__file__).parent / "data" / "indicator_state.json")))
+INDICATOR_STATE_SAVE_SECONDS = float(os.getenv("INDICATOR_STATE_SAVE_SECONDS", "60"))
+# Bundan eski kaydedilmiş durumlar yüklenmez (bellekteki veriden yeniden oluşturulur)
+INDICATOR_STATE_MAX_AGE_HOURS = float(os.getenv("INDICATOR_STATE_MAX_AGE_HOURS", "24"))
+
+TICK_SERIES = "tick"
+EMA_PERIODS = (9, 21, 50, 200)
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+VOLATILITY_WINDOW = 20
+# calculate_indicators'a verilen minimum veri (MACD)
+MIN_POINTS = 26
+
+
+def _alpha(period: int) -> float:
+    return 2 / (period + 1)
+
+
+class IndicatorState:
+    """Tek bir fiyat serisinin gösterge durumu (calculate_indicators ile aynı formüller)"""
+
+    def __init__(self):
+        self.count = 0
+        self.last_marker = -math.inf  # Son işlenen noktanın zamanı (tick ts / candle start)
+        self.last_price: Optional[float] = None
+        # EMA: ilk değer ilk N fiyatın ortalaması (calculate_ema)
+        self.ema: Dict[int, Optional[float]] = {p: None for p in EMA_PERIODS}
+        self.ema_seed: Dict[int, float] = {p: 0.0 for p in EMA_PERIODS}
+        # MACD: EMA'lar ilk fiyatla başlar (calculate_macd)
+        self.macd_fast: Optional[float] = None
+        self.macd_slow: Optional[float] = None
+        self.macd_signal: Optional[float] = None
+        # RSI: ilk period değişimin ortalaması, sonra Wilder smoothing
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        # Volatilite: son VOLATILITY_WINDOW fiyatın ortalaması ve M2'si (kayan Welford)
+        self.window: Deque[float] = deque(maxlen=VOLATILITY_WINDOW)
+        self.mean = 0.0
+        self.m2 = 0.0
+        # Registry'deki diğer göstergelerin artımlı durumları (istendikçe eklenir)
+        self.extras: Dict[str, IncrementalIndicator] = {}
+
+    def update(self, price: float, marker: float = None, high: float = None, low: float = None,
+               volume: float = None):
+        """Yeni fiyat (O(1)); high/low verilmezse fiyat kullanılır"""
+        price = float(price)
+        prev = self.last_price
+        self.count += 1
+        n = self.count
+
+        # EMA 9/21/50/200
+        for period in EMA_PERIODS:
+            if n < period:
+                self.ema_seed[period] += price
+            elif n == period:
+                self.ema[period] = (self.ema_seed[period] + price) / period
+            else:
+                self.ema[period] += (price - self.ema[period]) * _alpha(period)
+
+        # MACD
+        if self.macd_fast is None:
+            self.macd_fast = self.macd_slow = price
+            self.macd_signal = 0.0
+        else:
+            self.macd_fast += (price - self.macd_fast) * _alpha(MACD_FAST)
+            self.macd_slow += (price - self.macd_slow) * _alpha(MACD_SLOW)
+            self.macd_signal += (self.macd_fast - self.macd_slow - self.macd_signal) * _alpha(MACD_SIGNAL)
+
+        # RSI (n-1 değişim)
+        if prev is not None:
+            delta = price - prev
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            deltas = n - 1
+            if deltas <= RSI_PERIOD:
+                self.avg_gain += gain / RSI_PERIOD
+                self.avg_loss += loss / RSI_PERIOD
+            else:
+                self.avg_gain = (self.avg_gain * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+                self.avg_loss = (self.avg_loss * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+
+        # Volatilite (kayan pencere Welford)
+        if len(self.window) < VOLATILITY_WINDOW:
+            self.window.append(price)
+            k = len(self.window)
+            delta = price - self.mean
+            self.mean += delta / k
+            self.m2 += delta * (price - self.mean)
+        else:
+            old = self.window[0]
+            self.window.append(price)
+            old_mean = self.mean
+            self.mean += (price - old) / VOLATILITY_WINDOW
+            self.m2 = max(0.0, self.m2 + (price - old) * (price - self.mean + old - old_mean))
+
+        for extra in self.extras.values():
+            extra.update(price, price if high is None else high, price if low is None else low, volume)
+
+        self.last_price = price
+        if marker is not None:
+            self.last_marker = marker
+
+    def clone(self) -> "IndicatorState":
+        other = IndicatorState.__new__(IndicatorState)
+        other.__dict__.update(self.__dict__)
+        other.ema = dict(self.ema)
+        other.ema_seed = dict(self.ema_seed)
+        other.window = deque(self.window, maxlen=VOLATILITY_WINDOW)
+        other.extras = copy.deepcopy(self.extras)
+        return other
+
+    def indicators(self, names: Iterable[str] = None) -> dict:
+        """calculate_indicators(prices, names) ile aynı formatta sonuç"""
+        names = resolve(names)
+        n = self.count
+        result = {
+            "rsi": None,
+            "rsi_signal": None,
+            "macd": None,
+            "macd_signal_line": None,
+            "macd_histogram": None,
+            "macd_signal": None,
+            "ema9": None,
+            "ema21": None,
+            "ema_signal": None
+        }
+
+        if "rsi" in names and n >= RSI_PERIOD + 1:
+            if self.avg_loss == 0:
+                rsi = 100.0
+            else:
+                rsi = round(100 - (100 / (1 + self.avg_gain / self.avg_loss)), 2)
+            result["rsi"] = rsi
+            result["rsi_signal"] = get_rsi_signal(rsi)
+
+        if "macd" in names and n >= MACD_SLOW:
+            macd = self.macd_fast - self.macd_slow
+            # calculate_macd: sinyal EMA'sı MACD'nin ilk değeriyle (0) başlar
+            histogram = round(macd - self.macd_signal, 4)
+            macd, signal = round(macd, 4), round(self.macd_signal, 4)
+            result["macd"] = macd
+            result["macd_signal_line"] = signal
+            result["macd_histogram"] = histogram
+            result["macd_signal"] = get_macd_signal(macd, signal, histogram)
+
+        ema = {p: round(v, 4) if v is not None else None for p, v in self.ema.items()}
+        if "ema" in names and ema[9] is not None and ema[21] is not None:
+            result["ema9"] = ema[9]
+            result["ema21"] = ema[21]
+            result["ema_signal"] = get_ema_signal(ema[9], ema[21], self.last_price)
+        if "ema_long" in names:
+            if ema[50] is not None:
+                result["ema50"] = ema[50]
+            if ema[200] is not None:
+                result["ema200"] = ema[200]
+            if ema[50] is not None and ema[200] is not None:
+                result["ema_cross"] = get_ema_cross_signal(ema[50], ema[200])
+
+        if "volatility" in names and len(self.window) >= VOLATILITY_WINDOW:
+            std = math.sqrt(self.m2 / VOLATILITY_WINDOW)
+            result["volatility"] = round((std / self.mean) * 100 if self.mean > 0 else 0, 2)
+
+        for name in names:
+            extra = self.extras.get(name)
+            if extra is not None and n >= INDICATORS[name].warmup:
+                result.update(extra.values())
+
+        result["signal_strength"] = calculate_signal_strength(result)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count, "last_marker": self.last_marker, "last_price": self.last_price,
+            "ema": {str(p): v for p, v in self.ema.items()}, "ema_seed": {str(p): v for p, v in self.ema_seed.items()},
+            "macd_fast": self.macd_fast, "macd_slow": self.macd_slow, "macd_signal": self.macd_signal,
+            "avg_gain": self.avg_gain, "avg_loss": self.avg_loss,
+            "window": list(self.window), "mean": self.mean, "m2": self.m2,
+            "extras": {name: extra.to_dict() for name, extra in self.extras.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        state = cls()
+        for key in ("count", "last_marker", "last_price", "macd_fast", "macd_slow", "macd_signal",
+                    "avg_gain", "avg_loss", "mean", "m2"):
+            setattr(state, key, data[key])
+        state.ema = {int(p): v for p, v in data["ema"].items()}
+        state.ema_seed = {int(p): v for p, v in data["ema_seed"].items()}
+        state.window = deque(data["window"], maxlen=VOLATILITY_WINDOW)
+        state.extras = incremental_from_dict(data.get("extras", {}))
+        return state
+
+
+class IndicatorEngine:
+    """Coin/seri bazlı gösterge durumları"""
+
+    def __init__(self, path: Path = INDICATOR_STATE_PATH):
+        self.path = path
+        self._states: Dict[Tuple[str, str], IndicatorState] = {}
+        self.stats = {"reads": 0, "updates": 0, "not_ready": 0, "loaded": 0, "saved": 0}
+
+    def _state(self, coin: str, series: str) -> IndicatorState:
+        state = self._states.get((coin, series))
+        if state is None:
+            state = self._states[(coin, series)] = IndicatorState()
+        return state
+
+    def _ensure_extras(self, state: IndicatorState, names: Tuple[str, ...], history):
+        """
+        İstenen ama durumda olmayan registry göstergelerini ekle; bellekteki geçmişin
+        durumun zaten işlediği kısmı (last_marker'a kadar) yeni durumlara uygulanır
+
+        Args:
+            history: (marker, close, high, low, volume) noktalarını döndüren fonksiyon
+        """
+        missing = [name for name in names if name not in state.extras and INDICATORS[name].incremental]
+        if not missing:
+            return
+        extras = create_incremental(missing)
+        if state.count:
+            for marker, close, high, low, volume in history():
+                if marker > state.last_marker:
+                    break
+                for extra in extras.values():
+                    extra.update(close, high, low, volume)
+        state.extras.update(extras)
+
+    def tick_indicators(self, coin: str, names: Iterable[str] = None) -> Optional[dict]:
+        """
+        Ham tick serisinin göstergeleri (price_ring'deki yeni noktalar uygulanır)
+
+        Returns:
+            calculate_indicators formatında sonuç veya buffer yüklü değilse/veri yetersizse None
+        """
+        from price_ring_buffer import price_ring
+        self.stats["reads"] += 1
+        names = resolve(names)
+        state = self._state(coin, TICK_SERIES)
+
+        def history():
+            points = price_ring.after(coin, -math.inf)
+            if points is None:
+                return
+            for ts, price, volume in zip(*(arr.tolist() for arr in points)):
+                yield ts, price, price, price, volume
+
+        self._ensure_extras(state, names, history)
+        new = price_ring.after(coin, state.last_marker)
+        if new is None:
+            self.stats["not_ready"] += 1
+            return None
+        for ts, price, volume in zip(*(arr.tolist() for arr in new)):
+            state.update(price, ts, volume=volume)
+        self.stats["updates"] += len(new[0])
+        if state.count < MIN_POINTS:
+            self.stats["not_ready"] += 1
+            return None
+        return state.indicators(names)
+
+    def candle_indicators(self, coin: str, interval: str, names: Iterable[str] = None) -> Optional[dict]:
+        """
+        Candle serisinin göstergeleri (kapanmış candle'lar duruma işlenir, açık candle sadece sonuca katılır)
+
+        Returns:
+            calculate_indicators formatında sonuç veya interval desteklenmiyorsa/veri yetersizse None
+        """
+        from candle_store import candle_store
+        self.stats["reads"] += 1
+        names = resolve(names)
+        state = self._state(coin, interval)
+
+        def history():
+            candles = candle_store.closed_after(coin, interval, -math.inf)
+            return candles[0] if candles else []
+
+        self._ensure_extras(state, names, history)
+        new = candle_store.closed_after(coin, interval, state.last_marker)
+        if new is None:
+            self.stats["not_ready"] += 1
+            return None
+        closed, open_candle = new
+        for start, close, high, low, volume in closed:
+            state.update(close, start, high, low, volume)
+        self.stats["updates"] += len(closed)
+        if open_candle is not None:
+            # candle_store.get_closes gibi son eleman açık candle
+            state = state.clone()
+            _, close, high, low, volume = open_candle
+            state.update(close, None, high, low, volume)
+        if state.count < MIN_POINTS:
+            self.stats["not_ready"] += 1
+            return None
+        return state.indicators(names)
+
+    def reset(self, coin: str):
+        """Coin'in tüm durumlarını at (örn. geçmiş veri import'u sonrası); sonraki okumada yeniden oluşturulur"""
+        for key in [k for k in self._states if k[0] == coin]:
+            del self._states[key]
+
+    # ---- Kalıcılık ----
+
+    def _read(self) -> Dict[Tuple[str, str], IndicatorState]:
+        """Dosyadaki güncel durumlar (thread havuzunda; engine durumu değişmez)"""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"❌ Gösterge durumu okunamadı: {e}")
+            return {}
+        cutoff = time.time() - INDICATOR_STATE_MAX_AGE_HOURS * 3600
+        states = {}
+        for key, value in data.get("states", {}).items():
+            coin, _, series = key.partition("|")
+            try:
+                state = IndicatorState.from_dict(value)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if state.last_marker >= cutoff:
+                states[(coin, series)] = state
+        return states
+
+    async def load(self):
+        """Kaydedilmiş durumları yükle (INDICATOR_STATE_MAX_AGE_HOURS'tan eskiler atlanır)"""
+        from db_async import run_db
+        states = await run_db(self._read)
+        # Bu sırada oluşmuş canlı durumlar korunur
+        for key, state in states.items():
+            self._states.setdefault(key, state)
+        self.stats["loaded"] = len(states)
+        logger.info(f"📈 {len(states)} gösterge durumu yüklendi")
+
+    def _snapshot(self) -> dict:
+        """Durumların kopyası (event loop'ta; deque'ler listeye kopyalanır)"""
+        return {
+            "saved_at": time.time(),
+            "states": {f"{coin}|{series}": state.to_dict() for (coin, series), state in self._states.items()
+                       if state.count},
+        }
+
+    def _write(self, data: dict):
+        """Kopyayı atomik olarak yaz (tmp + rename; thread havuzunda)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    async def save(self):
+        """Durumları kaydet; JSON ve dosya yazımı event loop'u bloklamaz"""
+        from db_async import run_db
+        data = self._snapshot()
+        try:
+            await run_db(self._write, data)
+            self.stats["saved"] = len(data["states"])
+        except Exception as e:
+            logger.error(f"❌ Gösterge durumu kaydedilemedi: {e}")
+
+    async def run_persister(self):
+        """Durumları INDICATOR_STATE_SAVE_SECONDS'ta bir kaydet"""
+        while True:
+            await asyncio.sleep(INDICATOR_STATE_SAVE_SECONDS)
+            await self.save()
+
+    def get_status(self) -> dict:
+        return {
+            "series": len(self._states),
+            "coins": len({coin for coin, _ in self._states}),
+            **self.stats,
+        }
+
+
+# Global instance
+indicator_engine = IndicatorEngine()
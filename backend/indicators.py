@@ -1,11 +1,14 @@
 # backend/indicators.py
 """
 Teknik göstergeler: RSI, MACD, EMA ve Adaptive Timeframe
+(Bollinger, ATR, Stochastic, OBV, VWAP ve gösterge seçimi: indicator_registry)
 """
 import numpy as np
 from typing import List, Tuple, Optional
 import logging
 
+from indicator_kernels import ema_series, macd_series, rsi_series
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,28 +78,8 @@ def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
         return None
     
     try:
-        # Fiyat değişimlerini hesapla
-        deltas = np.diff(prices)
-        
-        # Kazanç ve kayıpları ayır
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        # İlk ortalama
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-        
-        # Sonraki değerler için smoothed averages
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-        
-        # RSI hesapla
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        # Wilder smoothing tüm seri için vektörize (indicator_kernels.rsi_series, kayıp yoksa 100)
+        rsi = float(rsi_series(prices, period)[-1])
         
         return round(rsi, 2)
     
@@ -126,29 +109,10 @@ def calculate_macd(prices: List[float],
         return None
     
     try:
-        prices_array = np.array(prices)
-        
-        # EMA hesaplama fonksiyonu
-        def calculate_ema(data, period):
-            multiplier = 2 / (period + 1)
-            ema = [data[0]]  # İlk değer
-            for price in data[1:]:
-                ema.append((price - ema[-1]) * multiplier + ema[-1])
-            return np.array(ema)
+        # MACD line = Fast EMA - Slow EMA, Signal line = MACD'nin EMA'sı (indicator_kernels.macd_series)
+        macd_line, signal_line, histogram = macd_series(prices, fast_period, slow_period, signal_period)
         
-        # Hızlı ve yavaş EMA'ları hesapla
-        fast_ema = calculate_ema(prices_array, fast_period)
-        slow_ema = calculate_ema(prices_array, slow_period)
-        
-        # MACD line = Fast EMA - Slow EMA
-        macd_line = fast_ema - slow_ema
-        
-        # Signal line = MACD'nin EMA'sı (yeterli veri varsa)
-        if len(macd_line) >= signal_period:
-            signal_line = calculate_ema(macd_line, signal_period)
-            # Histogram = MACD - Signal
-            histogram = macd_line - signal_line
-        else:
+        if len(macd_line) < signal_period:
             # Yeterli veri yoksa sadece MACD line kullan
             signal_line = np.array([macd_line[-1]])
             histogram = np.array([0.0])
@@ -210,15 +174,8 @@ def calculate_ema(prices: List[float], period: int) -> Optional[float]:
         return None
     
     try:
-        prices_array = np.array(prices)
-        multiplier = 2 / (period + 1)
-        
-        # İlk EMA = İlk N fiyatın ortalaması
-        ema = np.mean(prices_array[:period])
-        
-        # Sonraki değerleri hesapla
-        for price in prices_array[period:]:
-            ema = (price - ema) * multiplier + ema
+        # İlk EMA = İlk N fiyatın ortalaması, sonrası vektörize (indicator_kernels.ema_series)
+        ema = ema_series(prices, period)[-1]
         
         return round(float(ema), 4)
     
@@ -408,12 +365,14 @@ def calculate_signal_strength(indicators: dict) -> dict:
     }
 
 
-def calculate_indicators(prices: List[float]) -> dict:
+def calculate_indicators(prices: List[float], names: List[str] = None, ohlcv: dict = None) -> dict:
     """
-    Tüm göstergeleri hesapla ve döndür
+    İstenen göstergeleri hesapla ve döndür (indicator_registry)
     
     Args:
         prices: Fiyat listesi (en yeni fiyat sonda)
+        names: Gösterge adları (None: RSI, MACD, EMA 9/21, EMA 50/200, volatilite)
+        ohlcv: Candle high/low/hacim serileri (opsiyonel; ATR, Stochastic, OBV, VWAP için)
     
     Returns:
         {
@@ -425,9 +384,13 @@ def calculate_indicators(prices: List[float]) -> dict:
             "macd_signal": str,
             "ema9": float,
             "ema21": float,
-            "ema_signal": str
+            "ema_signal": str,
+            ... (istenen diğer göstergeler),
+            "signal_strength": dict
         }
     """
+    from indicator_registry import build_inputs, compute_indicators, resolve
+    
     result = {
         "rsi": None,
         "rsi_signal": None,
@@ -440,51 +403,8 @@ def calculate_indicators(prices: List[float]) -> dict:
         "ema_signal": None
     }
     
-    # RSI hesapla
-    rsi = calculate_rsi(prices, period=14)
-    if rsi is not None:
-        result["rsi"] = rsi
-        result["rsi_signal"] = get_rsi_signal(rsi)
-    
-    # MACD hesapla
-    macd_result = calculate_macd(prices, fast_period=12, slow_period=26, signal_period=9)
-    if macd_result is not None:
-        macd, signal, histogram = macd_result
-        result["macd"] = macd
-        result["macd_signal_line"] = signal
-        result["macd_histogram"] = histogram
-        result["macd_signal"] = get_macd_signal(macd, signal, histogram)
-    
-    # EMA hesapla (kısa vadeli)
-    ema9 = calculate_ema(prices, period=9)
-    ema21 = calculate_ema(prices, period=21)
-    
-    # EMA hesapla (uzun vadeli)
-    ema50 = calculate_ema(prices, period=50)
-    ema200 = calculate_ema(prices, period=200)
-    
-    current_price = prices[-1] if prices else 0
-    
-    # Kısa vadeli EMA
-    if ema9 is not None and ema21 is not None:
-        result["ema9"] = ema9
-        result["ema21"] = ema21
-        result["ema_signal"] = get_ema_signal(ema9, ema21, current_price)
-    
-    # Uzun vadeli EMA
-    if ema50 is not None:
-        result["ema50"] = ema50
-    if ema200 is not None:
-        result["ema200"] = ema200
-    
-    # Golden Cross / Death Cross tespiti
-    if ema50 is not None and ema200 is not None:
-        result["ema_cross"] = get_ema_cross_signal(ema50, ema200)
-    
-    # Volatilite hesapla (son 20 fiyat için)
-    if len(prices) >= 20:
-        volatility = calculate_volatility(prices[-20:])
-        result["volatility"] = volatility
+    # Sadece istenen göstergeler (warm-up'ı dolmayanlar atlanır)
+    result.update(compute_indicators(build_inputs(prices, ohlcv), resolve(names)))
     
     # Combined Signal Strength (RSI + MACD + EMA)
     result["signal_strength"] = calculate_signal_strength(result)
@@ -0,0 +1,79 @@
+# backend/loop_monitor.py
+"""
+Event loop gecikme (lag) ölçümü
+Periyodik olarak kısa bir sleep yapılır ve planlanandan ne kadar geç
+uyanıldığı ölçülür. Event loop'u bloklayan senkron işler (ör. thread
+havuzuna alınmamış DB sorguları) bu gecikmede doğrudan görünür.
+"""
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+# Bu değeri aşan gecikmeler "stall" sayılır ve loglanır
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "250"))
+
+
+class LoopLagMonitor:
+    """Event loop gecikmesini örnekler (son window ölçüm üzerinden istatistik)"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS,
+                 warn_ms: float = LOOP_LAG_WARN_MS, window: int = 600):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"samples": 0, "stalls": 0, "max_ms": 0.0, "last_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"⏱ Event loop lag monitörü başlatıldı ({self.interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - started - self.interval) * 1000)
+            self._samples.append(lag_ms)
+            self.stats["samples"] += 1
+            self.stats["last_ms"] = round(lag_ms, 2)
+            self.stats["max_ms"] = round(max(self.stats["max_ms"], lag_ms), 2)
+            if lag_ms > self.warn_ms:
+                self.stats["stalls"] += 1
+                logger.warning(f"🐌 Event loop {lag_ms:.0f}ms bloklandı")
+
+    def get_status(self) -> dict:
+        samples = sorted(self._samples)
+        n = len(samples)
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "avg_ms": round(sum(samples) / n, 2) if n else 0.0,
+            "p50_ms": round(samples[n // 2], 2) if n else 0.0,
+            "p99_ms": round(samples[min(n - 1, int(n * 0.99))], 2) if n else 0.0,
+            **self.stats,
+        }
+
+
+# Global instance
+loop_monitor = LoopLagMonitor()
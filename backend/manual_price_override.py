@@ -4,9 +4,8 @@ Manuel fiyat override sistemi
 Kullanıcı belirli coinler için manuel fiyat belirleyebilir
 """
 import logging
-from datetime import datetime, timezone
 from typing import Optional, Dict
-from db_mongodb import get_db
+from storage import get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -24,21 +23,8 @@ def set_manual_price(coin: str, price: float, source: str = "manual") -> bool:
         Başarılı mı?
     """
     try:
-        db = get_db()
-        
-        override = {
-            "coin": coin.upper(),
-            "price": price,
-            "source": source,
-            "updated_at": datetime.now(timezone.utc)
-        }
-        
         # Upsert (varsa güncelle, yoksa ekle)
-        db.manual_price_overrides.update_one(
-            {"coin": coin.upper()},
-            {"$set": override},
-            upsert=True
-        )
+        get_storage().set_manual_price(coin.upper(), price, source)
         
         logger.info(f"✅ [{coin}] Manuel fiyat belirlendi: ${price} (Kaynak: {source})")
         return True
@@ -59,9 +45,7 @@ def get_manual_price(coin: str) -> Optional[float]:
         Manuel fiyat veya None
     """
     try:
-        db = get_db()
-        
-        override = db.manual_price_overrides.find_one({"coin": coin.upper()})
+        override = get_storage().get_manual_price(coin.upper())
         
         if override:
             price = override["price"]
@@ -86,11 +70,7 @@ def remove_manual_price(coin: str) -> bool:
         Başarılı mı?
     """
     try:
-        db = get_db()
-        
-        result = db.manual_price_overrides.delete_one({"coin": coin.upper()})
-        
-        if result.deleted_count > 0:
+        if get_storage().delete_manual_price(coin.upper()):
             logger.info(f"✅ [{coin}] Manuel fiyat kaldırıldı")
             return True
         
@@ -109,9 +89,7 @@ def get_all_manual_prices() -> Dict[str, float]:
         {coin: price} dictionary
     """
     try:
-        db = get_db()
-        
-        overrides = list(db.manual_price_overrides.find())
+        overrides = get_storage().all_manual_prices()
         
         return {o["coin"]: o["price"] for o in overrides}
     
@@ -0,0 +1,183 @@
+# backend/migrate_price_history.py
+"""
+price_history → MongoDB native time-series migration
+
+Doküman başına tick formatındaki price_history collection'ını, coin
+metaField'lı time-series collection'a taşır (MongoDB 5.0+). Time-series
+collection'lar yeniden adlandırılamadığı için eski collection önce
+price_history_legacy olarak saklanır, yeni collection price_history adıyla
+oluşturulup veriler batch halinde kopyalanır.
+
+Backend durdurulmuşken çalıştırılmalıdır; ardından PRICE_HISTORY_STORAGE=timeseries
+ile başlatılır. Kopyalama (coin, timestamp) sırasıyla yapılır; yarıda kesilen
+bir migration tekrar çalıştırıldığında hedefteki son noktadan devam eder,
+zaten kopyalanmış noktalar ikinci kez yazılmaz.
+
+Kullanım:
+    python migrate_price_history.py --stats            # boyut ve 7 günlük okuma süresi
+    python migrate_price_history.py --migrate          # taşı (legacy saklanır)
+    python migrate_price_history.py --drop-legacy      # doğrulama sonrası legacy'yi sil
+"""
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from db_mongodb import get_db
+from price_history import (
+    PRICE_HISTORY_COLLECTION,
+    create_timeseries_collection,
+    ensure_indexes,
+    is_timeseries_collection,
+)
+
+logger = logging.getLogger(__name__)
+
+LEGACY_COLLECTION = f"{PRICE_HISTORY_COLLECTION}_legacy"
+
+
+def collection_stats(db, name: str) -> dict:
+    """Collection boyutu ve örnek bir coin için 7 günlük okuma süresi"""
+    if name not in db.list_collection_names():
+        return {"collection": name, "exists": False}
+
+    stats = db.command("collStats", name)
+    collection = db[name]
+    sample = collection.find_one({}, {"coin": 1})
+    read_ms = None
+    points = 0
+    if sample:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        started = time.perf_counter()
+        points = sum(1 for _ in collection.find(
+            {"coin": sample["coin"], "timestamp": {"$gte": cutoff}},
+            {"_id": 0, "price": 1, "timestamp": 1}
+        ).sort("timestamp", 1))
+        read_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    return {
+        "collection": name,
+        "exists": True,
+        "timeseries": is_timeseries_collection(db, name),
+        "documents": stats.get("count"),
+        "size_bytes": stats.get("size"),
+        "storage_bytes": stats.get("storageSize"),
+        "index_bytes": stats.get("totalIndexSize"),
+        "sample_coin": sample.get("coin") if sample else None,
+        "read_7d_points": points,
+        "read_7d_ms": read_ms,
+    }
+
+
+def _resume_query(target) -> tuple:
+    """
+    Hedefte en son kopyalanan (coin, timestamp) noktasından sonrasının sorgusu
+
+    Batch'ler sıralı (ordered) yazıldığı için hedef, legacy'nin (coin, timestamp)
+    sırasındaki bir ön ekidir. Aynı anahtarlı mükerrer noktalar için son anahtarda
+    hedefteki adet kadar doküman atlanır.
+    Returns: (sorgu, son anahtarda atlanacak doküman sayısı, son nokta)
+    """
+    last = target.find_one({}, {"_id": 0, "coin": 1, "timestamp": 1},
+                           sort=[("coin", -1), ("timestamp", -1)])
+    if not last:
+        return {}, 0, None
+    coin, ts = last["coin"], last["timestamp"]
+    query = {"$or": [
+        {"coin": {"$gt": coin}},
+        {"coin": coin, "timestamp": {"$gte": ts}},
+    ]}
+    return query, target.count_documents({"coin": coin, "timestamp": ts}), last
+
+
+def migrate(batch_size: int = 10000) -> dict:
+    """price_history'yi time-series collection'a taşı (yarım kalmışsa devam et)"""
+    db = get_db()
+    names = db.list_collection_names()
+
+    if LEGACY_COLLECTION in names:
+        if PRICE_HISTORY_COLLECTION in names and not is_timeseries_collection(db):
+            raise RuntimeError(f"{LEGACY_COLLECTION} ve time-series olmayan {PRICE_HISTORY_COLLECTION} "
+                               f"birlikte var; önceki migration'ı kontrol edin")
+        logger.info(f"♻️ Yarım kalmış migration devam ediyor ({LEGACY_COLLECTION} mevcut)")
+    elif PRICE_HISTORY_COLLECTION in names and is_timeseries_collection(db):
+        logger.info("✅ price_history zaten time-series, migration gerekmiyor")
+        return {"status": "skipped"}
+    elif PRICE_HISTORY_COLLECTION in names:
+        db[PRICE_HISTORY_COLLECTION].rename(LEGACY_COLLECTION)
+        logger.info(f"📦 {PRICE_HISTORY_COLLECTION} → {LEGACY_COLLECTION}")
+    else:
+        create_timeseries_collection(db)
+        ensure_indexes(db)
+        return {"status": "created", "copied": 0}
+
+    if PRICE_HISTORY_COLLECTION not in db.list_collection_names():
+        create_timeseries_collection(db)
+    # Devam noktası (coin, timestamp) index'iyle bulunur
+    ensure_indexes(db)
+    target = db[PRICE_HISTORY_COLLECTION]
+    legacy = db[LEGACY_COLLECTION]
+
+    query, skip_at_last, last = _resume_query(target)
+    if last:
+        logger.info(f"⏩ {last['coin']} {last['timestamp']} sonrasından devam ediliyor")
+
+    total = legacy.estimated_document_count()
+    copied = 0
+    batch = []
+    started = time.perf_counter()
+    cursor = legacy.find(query, {"_id": 0}).sort([("coin", 1), ("timestamp", 1)])
+    for doc in cursor:
+        if "timestamp" not in doc or "coin" not in doc:
+            continue
+        if skip_at_last and doc["coin"] == last["coin"] and doc["timestamp"] == last["timestamp"]:
+            skip_at_last -= 1
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            # Sıralı yazım: kesinti olursa hedef yine legacy sırasının ön eki kalır
+            target.insert_many(batch, ordered=True)
+            copied += len(batch)
+            batch = []
+            logger.info(f"➡️ {copied}/{total} kopyalandı")
+    if batch:
+        target.insert_many(batch, ordered=True)
+        copied += len(batch)
+
+    elapsed = round(time.perf_counter() - started, 1)
+    logger.info(f"✅ Migration tamamlandı: {copied} nokta, {elapsed}s "
+                f"(doğrulama sonrası --drop-legacy ile {LEGACY_COLLECTION} silinebilir)")
+    return {"status": "resumed" if last else "migrated", "copied": copied,
+            "legacy_documents": total, "seconds": elapsed}
+
+
+def drop_legacy():
+    db = get_db()
+    if not is_timeseries_collection(db):
+        raise RuntimeError("price_history time-series değil; legacy silinmedi")
+    db.drop_collection(LEGACY_COLLECTION)
+    logger.info(f"🗑️ {LEGACY_COLLECTION} silindi")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="price_history time-series migration")
+    parser.add_argument("--stats", action="store_true", help="Boyut ve 7 günlük okuma süresini göster")
+    parser.add_argument("--migrate", action="store_true", help="Time-series collection'a taşı")
+    parser.add_argument("--drop-legacy", action="store_true", help="Eski collection'ı sil")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    db = get_db()
+
+    if args.migrate:
+        print(migrate(args.batch_size))
+    if args.drop_legacy:
+        drop_legacy()
+    if args.stats or not (args.migrate or args.drop_legacy):
+        for name in (PRICE_HISTORY_COLLECTION, LEGACY_COLLECTION):
+            print(collection_stats(db, name))
+
+
+if __name__ == "__main__":
+    main()
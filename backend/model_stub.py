@@ -1,6 +1,10 @@
 # backend/model_stub.py
 # This is current "model" - a rule-based stub. Replace with XGBoost/LightGBM later.
 
+# Modelin kullandığı göstergeler (signal_strength: RSI, MACD, EMA 9/21, EMA 50/200 sinyalleri);
+# coin ayarında gösterge listesi verilse de bunlar her zaman hesaplanır
+MODEL_INDICATORS = ("rsi", "macd", "ema", "ema_long")
+
 def calculate_tp_sl(signal_type: str, current_price: float, probability: float):
     """
     TP (Take Profit) ve SL (Stop Loss) hesaplama
@@ -1,7 +1,7 @@
 # backend/notifier.py
 import os, json, asyncio
-import aiohttp
 from data_sync import read_config
+from http_session import get_session
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,14 +26,14 @@ async def send_telegram_message_async(text: str, parse_mode="HTML", buttons=None
         payload["reply_markup"] = json.dumps({"inline_keyboard": buttons})
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=payload) as resp:
-                result = await resp.json()
-                if result.get('ok'):
-                    logger.debug(f"✅ Telegram mesajı gönderildi")
-                else:
-                    logger.error(f"❌ Telegram API hatası: {result}")
-                return result
+        session = get_session("telegram")
+        async with session.post(url, data=payload) as resp:
+            result = await resp.json()
+            if result.get('ok'):
+                logger.debug(f"✅ Telegram mesajı gönderildi")
+            else:
+                logger.error(f"❌ Telegram API hatası: {result}")
+            return result
     except Exception as e:
         logger.error(f"❌ Telegram gönderme hatası: {e}")
         return {"ok": False, "error": str(e)}
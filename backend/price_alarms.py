@@ -7,7 +7,7 @@ Fiyat hedef seviyeye ulaşınca Telegram bildirimi gönderir
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, List
-from db_mongodb import get_db
+from storage import ALARMS, get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +40,6 @@ def create_price_alarm(
             logger.info(f"⏸️ [{coin}] Alarm sistemi pasif - alarm oluşturulmadı")
             return None
         
-        db = get_db()
-        
         alarm = {
             "coin": coin,
             "target_price": target_price,
@@ -54,8 +52,7 @@ def create_price_alarm(
             "triggered_at": None
         }
         
-        result = db.price_alarms.insert_one(alarm)
-        alarm_id = str(result.inserted_id)
+        alarm_id = get_storage().insert(ALARMS, alarm)
         
         logger.info(f"✅ [{coin}] Fiyat alarmı oluşturuldu: {target_price}$ (ID: {alarm_id})")
         return alarm_id
@@ -84,14 +81,14 @@ def check_price_alarms(coin: str, current_price: float) -> List[Dict]:
         if not cfg.get("alarms_enabled", True):
             return []
         
-        db = get_db()
+        storage = get_storage()
         
         # Aktif alarmları al
-        alarms = list(db.price_alarms.find({
+        alarms = storage.find(ALARMS, {
             "coin": coin,
             "is_active": True,
             "triggered": False
-        }).limit(100))
+        }, limit=100)
         
         triggered_alarms = []
         
@@ -129,16 +126,11 @@ def check_price_alarms(coin: str, current_price: float) -> List[Dict]:
             
             if should_trigger:
                 # Alarmı tetikle
-                db.price_alarms.update_one(
-                    {"_id": alarm["_id"]},
-                    {
-                        "$set": {
-                            "triggered": True,
-                            "triggered_at": datetime.now(timezone.utc),
-                            "triggered_price": current_price
-                        }
-                    }
-                )
+                storage.update(ALARMS, alarm["id"], {
+                    "triggered": True,
+                    "triggered_at": datetime.now(timezone.utc),
+                    "triggered_price": current_price
+                })
                 
                 alarm["triggered_price"] = current_price
                 triggered_alarms.append(alarm)
@@ -163,17 +155,13 @@ def get_active_alarms(coin: Optional[str] = None) -> List[Dict]:
         Aktif alarmlar listesi
     """
     try:
-        db = get_db()
-        
         query = {"is_active": True, "triggered": False}
         if coin:
             query["coin"] = coin
         
-        alarms = list(db.price_alarms.find(query).sort("created_at", -1).limit(100))
+        alarms = get_storage().find(ALARMS, query, sort=[("created_at", -1)], limit=100)
         
-        # ObjectId'yi string'e çevir
         for alarm in alarms:
-            alarm["_id"] = str(alarm["_id"])
             if alarm.get("signal_id"):
                 alarm["signal_id"] = str(alarm["signal_id"])
         
@@ -195,15 +183,7 @@ def delete_alarm(alarm_id: str) -> bool:
         Başarılı mı?
     """
     try:
-        db = get_db()
-        from bson import ObjectId
-        
-        result = db.price_alarms.update_one(
-            {"_id": ObjectId(alarm_id)},
-            {"$set": {"is_active": False}}
-        )
-        
-        if result.modified_count > 0:
+        if get_storage().update(ALARMS, alarm_id, {"is_active": False}):
             logger.info(f"✅ Alarm silindi: {alarm_id}")
             return True
         return False
@@ -225,29 +205,22 @@ def get_alarm_statistics() -> Dict:
         }
     """
     try:
-        db = get_db()
+        storage = get_storage()
         
-        # Aktif alarmlar
-        active_count = db.price_alarms.count_documents({
+        # Aktif alarmlar (coin bazında, sunucu tarafında sayılır)
+        active_by_coin = storage.group_count(ALARMS, ("coin",), {
             "is_active": True,
             "triggered": False
         })
+        by_coin = {item["coin"]: item["count"] for item in active_by_coin}
         
         # Tetiklenen alarmlar
-        triggered_count = db.price_alarms.count_documents({
+        triggered_count = storage.count(ALARMS, {
             "triggered": True
         })
         
-        # Coin bazında
-        pipeline = [
-            {"$match": {"is_active": True, "triggered": False}},
-            {"$group": {"_id": "$coin", "count": {"$sum": 1}}}
-        ]
-        by_coin_cursor = db.price_alarms.aggregate(pipeline)
-        by_coin = {item["_id"]: item["count"] for item in by_coin_cursor}
-        
         return {
-            "total_active": active_count,
+            "total_active": sum(by_coin.values()),
             "total_triggered": triggered_count,
             "by_coin": by_coin
         }
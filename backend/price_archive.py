@@ -0,0 +1,215 @@
+# backend/price_archive.py
+"""
+Eski fiyat geçmişi için kolon bazlı arşiv
+PRICE_ARCHIVE_AFTER_DAYS'ten eski tick'ler veritabanından coin ve gün bazlı
+.npy dosyalarına (timestamp, price, volume) taşınır. Okumalar dosyaları
+memory-map ile açar; get_price_history arşiv ve veritabanı verisini birleştirir.
+
+Dizin yapısı:
+    PRICE_ARCHIVE_DIR/<COIN>/<YYYY-MM-DD>.npy
+"""
+import os
+import re
+import asyncio
+import logging
+import time as _time
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PRICE_ARCHIVE_DIR = Path(os.getenv("PRICE_ARCHIVE_DIR", str(Path(__file__).parent / "data" / "price_archive")))
+PRICE_ARCHIVE_AFTER_DAYS = int(os.getenv("PRICE_ARCHIVE_AFTER_DAYS", "14"))
+PRICE_ARCHIVE_INTERVAL_HOURS = float(os.getenv("PRICE_ARCHIVE_INTERVAL_HOURS", "6"))
+
+ARCHIVE_DTYPE = np.dtype([("ts", "<f8"), ("price", "<f8"), ("volume", "<f8")])
+
+last_run = {"started_at": None, "seconds": None, "coins": 0, "days": 0, "points": 0, "errors": 0}
+
+
+def _coin_dir(coin: str) -> Path:
+    return PRICE_ARCHIVE_DIR / re.sub(r"[^A-Za-z0-9_-]", "_", coin.upper())
+
+
+def _day_path(coin: str, day: date) -> Path:
+    return _coin_dir(coin) / f"{day.isoformat()}.npy"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _to_epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def archived_days(coin: str) -> List[date]:
+    """Coin için arşivlenmiş günler (sıralı)"""
+    directory = _coin_dir(coin)
+    if not directory.exists():
+        return []
+    days = []
+    for name in os.listdir(directory):
+        if name.endswith(".npy") and not name.endswith(".tmp.npy"):
+            try:
+                days.append(date.fromisoformat(name[:-4]))
+            except ValueError:
+                continue
+    return sorted(days)
+
+
+def archive_boundary(coin: str) -> Optional[datetime]:
+    """Bu zamandan önceki veri arşivde, sonrası veritabanında (arşiv yoksa None)"""
+    days = archived_days(coin)
+    if not days:
+        return None
+    return _day_start(days[-1] + timedelta(days=1))
+
+
+def read_archive(coin: str, start: datetime, end: datetime = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Arşivden [start, end) aralığındaki noktalar (eskiden yeniye)
+
+    Returns:
+        (timestamp epoch, price, volume) dizileri
+    """
+    start_ts = _to_epoch(start)
+    end_ts = _to_epoch(end) if end else float("inf")
+    parts = []
+    for day in archived_days(coin):
+        day_start = _to_epoch(_day_start(day))
+        if day_start + 86400 <= start_ts or day_start >= end_ts:
+            continue
+        data = np.load(_day_path(coin, day), mmap_mode="r")
+        lo = int(np.searchsorted(data["ts"], start_ts, side="left"))
+        hi = int(np.searchsorted(data["ts"], end_ts, side="left"))
+        if hi > lo:
+            parts.append(data[lo:hi])
+    if not parts:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, empty
+    merged = np.concatenate(parts)
+    return merged["ts"], merged["price"], merged["volume"]
+
+
+def _archive_day(storage, coin: str, day: date) -> int:
+    """Tek bir günü dosyaya yaz ve veritabanından sil"""
+    start = _day_start(day)
+    end = start + timedelta(days=1)
+    docs = storage.find_prices(coin, since=start, until=end)
+    if not docs:
+        return 0
+
+    arr = np.array(
+        [(_to_epoch(d["timestamp"]), d.get("price") or 0.0, d.get("volume_24h") or 0.0) for d in docs],
+        dtype=ARCHIVE_DTYPE
+    )
+    path = _day_path(coin, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        # Önceki (yarım kalmış) çalıştırmanın verisiyle birleştir
+        arr = np.concatenate((np.load(path), arr))
+    arr = np.unique(arr)  # ts'e göre sıralı, tekrarsız
+
+    tmp = path.with_name(f"{path.stem}.tmp.npy")
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+    # Dosya yerindeyken veritabanından sil
+    storage.delete_prices(coin, since=start, until=end)
+    return len(docs)
+
+
+def archive_old_prices(after_days: int = PRICE_ARCHIVE_AFTER_DAYS) -> dict:
+    """
+    after_days'ten eski tam günleri arşivle (senkron; thread'de çalıştırılır)
+
+    Not: time-series modunda silme için MongoDB 7.0+ gerekir.
+    """
+    from storage import get_storage
+    storage = get_storage()
+    cutoff_day = (datetime.now(timezone.utc) - timedelta(days=after_days)).date()
+    cutoff = _day_start(cutoff_day)
+
+    started = _time.perf_counter()
+    stats = {"started_at": datetime.now(timezone.utc).isoformat(), "coins": 0, "days": 0, "points": 0, "errors": 0}
+    for coin in storage.price_coins(until=cutoff):
+        oldest = storage.find_prices(coin, until=cutoff, limit=1)
+        if not oldest:
+            continue
+        stats["coins"] += 1
+        day = oldest[0]["timestamp"].date()
+        while day < cutoff_day:
+            try:
+                moved = _archive_day(storage, coin, day)
+                if moved:
+                    stats["days"] += 1
+                    stats["points"] += moved
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"❌ [{coin}] {day} arşivleme hatası: {e}")
+            day += timedelta(days=1)
+
+    stats["seconds"] = round(_time.perf_counter() - started, 2)
+    last_run.update(stats)
+    logger.info(f"🗄 Fiyat arşivi: {stats['coins']} coin, {stats['days']} gün, {stats['points']} nokta ({stats['seconds']}s)")
+    return stats
+
+
+def prune_archive(before: datetime) -> int:
+    """before'dan önce biten arşiv günlerini sil (ham tick retention'ı); silinen dosya sayısı"""
+    if not PRICE_ARCHIVE_DIR.exists():
+        return 0
+    cutoff_day = before.astimezone(timezone.utc).date() if before.tzinfo else before.date()
+    removed = 0
+    for coin_dir in PRICE_ARCHIVE_DIR.iterdir():
+        if not coin_dir.is_dir():
+            continue
+        for day in archived_days(coin_dir.name):
+            if day >= cutoff_day:
+                break
+            os.remove(_day_path(coin_dir.name, day))
+            removed += 1
+    if removed:
+        logger.info(f"🗑️ Fiyat arşivi: {removed} eski gün dosyası silindi")
+    return removed
+
+
+async def run_archiver():
+    """Arka plan arşivleyici (feature flag açıkken PRICE_ARCHIVE_INTERVAL_HOURS'ta bir)"""
+    from feature_flags import feature_flags
+    from db_async import run_db
+    while True:
+        try:
+            if feature_flags.enable_price_archive():
+                await run_db(archive_old_prices)
+        except Exception as e:
+            logger.error(f"❌ Fiyat arşivleyici hatası: {e}")
+        await asyncio.sleep(PRICE_ARCHIVE_INTERVAL_HOURS * 3600)
+
+
+def get_archive_status() -> dict:
+    """Arşiv dizini ve son çalıştırma bilgisi"""
+    files = 0
+    size = 0
+    coins = 0
+    if PRICE_ARCHIVE_DIR.exists():
+        for coin_dir in PRICE_ARCHIVE_DIR.iterdir():
+            if coin_dir.is_dir():
+                coins += 1
+                for f in coin_dir.glob("*.npy"):
+                    files += 1
+                    size += f.stat().st_size
+    return {
+        "dir": str(PRICE_ARCHIVE_DIR),
+        "after_days": PRICE_ARCHIVE_AFTER_DAYS,
+        "coins": coins,
+        "files": files,
+        "bytes": size,
+        "last_run": dict(last_run),
+    }
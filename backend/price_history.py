@@ -2,53 +2,157 @@
 """
 Fiyat geçmişi yönetimi
 RSI ve MACD hesaplamaları için gerekli fiyat verilerini saklar
+Okuma/yazmalar storage backend'i üzerinden yapılır; collection, index ve
+time-series yardımcıları MongoDB backend'ine özeldir.
 """
+import os
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
+from pymongo.errors import OperationFailure
 from db_mongodb import get_db
+from price_ring_buffer import price_ring, epoch_to_naive_utc
+from price_archive import archive_boundary, read_archive
+from price_rollup import read_rollups, select_tier
+from storage import get_storage
 
 logger = logging.getLogger(__name__)
 
+# Ham tick saklama süresi (TTL index ile MongoDB tarafından silinir);
+# daha uzun süreler price_rollup katmanlarında (5m, 1h) tutulur
+PRICE_HISTORY_RETENTION_DAYS = int(os.getenv("PRICE_HISTORY_RETENTION_DAYS", "90"))
 
-def save_price_point(coin: str, price: float, volume_24h: float = 0):
+# Depolama modu:
+#   "documents"  - her tick bir doküman (varsayılan)
+#   "timeseries" - MongoDB native time-series collection (MongoDB 5.0+, coin metaField,
+#                  sıkıştırılmış bucket'lar); mevcut veri migrate_price_history.py ile taşınır
+PRICE_HISTORY_STORAGE = os.getenv("PRICE_HISTORY_STORAGE", "documents").lower()
+PRICE_HISTORY_COLLECTION = "price_history"
+PRICE_HISTORY_TS_GRANULARITY = os.getenv("PRICE_HISTORY_TS_GRANULARITY", "minutes")
+
+# Coin başına kayıt sayısı (sadece loglama için, her insert'te count_documents yerine)
+_price_counts: Dict[str, int] = {}
+
+
+def get_price_collection(db=None):
+    """price_history collection'ı (tüm okuma/yazmalar bu fonksiyon üzerinden yapılır)"""
+    db = db if db is not None else get_db()
+    return db[PRICE_HISTORY_COLLECTION]
+
+
+def is_timeseries_collection(db, name: str = PRICE_HISTORY_COLLECTION) -> bool:
+    """Collection native time-series mi?"""
+    info = next(iter(db.list_collections(filter={"name": name})), None)
+    return bool(info and info.get("type") == "timeseries")
+
+
+def create_timeseries_collection(db, name: str = PRICE_HISTORY_COLLECTION):
+    """price_history formatında time-series collection oluştur"""
+    db.create_collection(
+        name,
+        timeseries={"timeField": "timestamp", "metaField": "coin", "granularity": PRICE_HISTORY_TS_GRANULARITY},
+        expireAfterSeconds=PRICE_HISTORY_RETENTION_DAYS * 86400
+    )
+    logger.info(f"🕒 Time-series collection oluşturuldu: {name} ({PRICE_HISTORY_TS_GRANULARITY})")
+
+
+def ensure_indexes(db=None):
+    """
+    price_history indexlerini oluştur
+
+    - (coin, timestamp): coin bazlı zaman aralığı ve son N kayıt sorguları
+    - (coin, timestamp) unique: idempotent import (doküman modu; mükerrer veri varsa atlanır)
+    - timestamp TTL: PRICE_HISTORY_RETENTION_DAYS'ten eski kayıtlar otomatik silinir
+      (time-series modunda collection'ın expireAfterSeconds ayarı kullanılır)
+    """
+    db = db if db is not None else get_db()
+    ttl_seconds = PRICE_HISTORY_RETENTION_DAYS * 86400
+
+    if is_timeseries_collection(db):
+        db.command("collMod", PRICE_HISTORY_COLLECTION, expireAfterSeconds=ttl_seconds)
+        get_price_collection(db).create_index([("coin", 1), ("timestamp", -1)])
+        return
+
+    if PRICE_HISTORY_STORAGE == "timeseries":
+        if not db.list_collection_names(filter={"name": PRICE_HISTORY_COLLECTION}):
+            create_timeseries_collection(db)
+            get_price_collection(db).create_index([("coin", 1), ("timestamp", -1)])
+            return
+        logger.warning("⚠️ price_history time-series değil, migrate_price_history.py çalıştırılmalı. "
+                       "Şimdilik doküman modu indexleri kullanılıyor.")
+
+    collection = get_price_collection(db)
+    collection.create_index([("coin", 1), ("timestamp", -1)])
+    try:
+        # Aynı (coin, timestamp) iki kez yazılmaz (geçmiş veri import'u upsert'leri)
+        collection.create_index([("coin", 1), ("timestamp", 1)], unique=True, name="coin_timestamp_unique")
+    except OperationFailure as e:
+        logger.warning(f"⚠️ price_history unique index oluşturulamadı (mükerrer kayıtlar olabilir): {e}")
+    try:
+        collection.create_index([("timestamp", 1)], expireAfterSeconds=ttl_seconds)
+    except OperationFailure:
+        # Index farklı bir TTL ile zaten var → süreyi güncelle
+        db.command("collMod", PRICE_HISTORY_COLLECTION,
+                   index={"keyPattern": {"timestamp": 1}, "expireAfterSeconds": ttl_seconds})
+        logger.info(f"🔁 price_history TTL güncellendi: {PRICE_HISTORY_RETENTION_DAYS} gün")
+
+
+def note_price_saved(coin: str, price: float):
+    """Kaydedilen nokta için sayaç ve log (ilk birkaç kayıt ve her 10 kayıtta bir)"""
+    count = _price_counts.get(coin)
+    if count is None:
+        count = get_storage().count_prices(coin)
+    else:
+        count += 1
+    _price_counts[coin] = count
+    if count <= 5 or count % 10 == 0:
+        logger.info(f"💾 [{coin}] Fiyat kaydedildi: ${price:.4f} (Toplam: {count} kayıt)")
+
+
+def save_price_point(coin: str, price: float, volume_24h: float = 0, timestamp: datetime = None):
     """
-    Coin için fiyat noktası kaydet
+    Coin için fiyat noktası kaydet (senkron; fetch döngüsü price_writer kullanır)
     
     Args:
         coin: Coin sembolü
         price: Fiyat
         volume_24h: 24 saatlik hacim
+        timestamp: Nokta zamanı (varsayılan: şimdi)
     """
     try:
-        db = get_db()
-        
         price_point = {
             "coin": coin,
             "price": price,
             "volume_24h": volume_24h,
-            "timestamp": datetime.now(timezone.utc)
+            "timestamp": timestamp or datetime.now(timezone.utc)
         }
         
-        result = db.price_history.insert_one(price_point)
-        # İlk birkaç kayıt için log
-        count = db.price_history.count_documents({"coin": coin})
-        if count <= 5 or count % 10 == 0:
-            logger.info(f"💾 [{coin}] Fiyat kaydedildi: ${price:.4f} (Toplam: {count} kayıt)")
+        get_storage().insert_prices([price_point])
         
-        # Eski verileri temizle (90 günden eski)
-        cutoff = datetime.now(timezone.utc) - timedelta(days=90)
-        deleted = db.price_history.delete_many({
-            "coin": coin,
-            "timestamp": {"$lt": cutoff}
-        })
-        if deleted.deleted_count > 0:
-            logger.info(f"🗑️ [{coin}] {deleted.deleted_count} eski kayıt silindi")
+        # Eski kayıtlar retention ile silinir (MongoDB: TTL index), öncesinde price_rollup katmanlarına toplanır
+        note_price_saved(coin, price)
         
     except Exception as e:
         logger.error(f"❌ Fiyat kaydetme hatası [{coin}]: {e}", exc_info=True)
 
 
+def _pending_points(coin: str, records: List[dict] = None) -> List[dict]:
+    """
+    Write-behind buffer'da bekleyen (henüz yazılmamış) noktalar
+
+    records verilirse, flush sırasında DB'ye ulaşmış olabilecek noktalar
+    (son DB kaydından eski/eşit olanlar) tekrar eklenmez.
+    """
+    from price_writer import price_writer
+    pending = price_writer.pending_points(coin)
+    if pending and records:
+        last_ts = records[-1].get("timestamp")
+        if last_ts is not None:
+            last_ts = last_ts.replace(tzinfo=None)
+            pending = [r for r in pending if r["timestamp"].replace(tzinfo=None) > last_ts]
+    return pending
+
+
 def get_price_history(coin: str, hours: int = 24, limit: int = 500) -> List[float]:
     """
     Coin için fiyat geçmişini getir
@@ -62,19 +166,33 @@ def get_price_history(coin: str, hours: int = 24, limit: int = 500) -> List[floa
         Fiyat listesi (eski → yeni)
     """
     try:
-        db = get_db()
-        
         # Zaman aralığını belirle
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        # Fiyat geçmişini getir
-        cursor = db.price_history.find({
-            "coin": coin,
-            "timestamp": {"$gte": cutoff}
-        }).sort("timestamp", 1).limit(limit)
+        # Uzun pencereler rollup katmanından (bucket close'ları) okunur
+        tier = select_tier(hours, limit)
+        if tier is not None:
+            return [r["close"] for r in read_rollups(coin, tier, cutoff)][:limit]
         
-        prices = [doc["price"] for doc in cursor]
+        # Bellek içi buffer aralığı kapsıyorsa DB sorgusu yapılmaz
+        window = price_ring.since(coin, cutoff)
+        if window is not None:
+            return window[1][:limit].tolist()
         
+        # Arşive taşınmış eski günler memory-mapped dosyalardan okunur
+        prices: List[float] = []
+        boundary = archive_boundary(coin)
+        if boundary is not None and cutoff < boundary:
+            prices = read_archive(coin, cutoff, boundary)[1][:limit].tolist()
+            cutoff = boundary
+            if len(prices) >= limit:
+                return prices
+
+        # Fiyat geçmişini getir
+        records = get_storage().find_prices(coin, since=cutoff, limit=limit - len(prices))
+
+        prices.extend(r["price"] for r in records)
+
         return prices
     
     except Exception as e:
@@ -95,26 +213,30 @@ def get_recent_prices(coin: str, hours: int = 24, count: int = None) -> List[flo
         Fiyat listesi (en eskiden yeniye)
     """
     try:
-        db = get_db()
+        # Bellek içi buffer aralığı kapsıyorsa DB sorgusu yapılmaz
+        if count is None:
+            window = price_ring.since(coin, datetime.now(timezone.utc) - timedelta(hours=hours))
+        else:
+            window = price_ring.tail(coin, count)
+        if window is not None:
+            return window[1].tolist()
         
         # Zaman aralığı
         if count is None:
             cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-            cursor = db.price_history.find({
-                "coin": coin,
-                "timestamp": {"$gte": cutoff}
-            }).sort("timestamp", 1)  # Eskiden yeniye
+            records = get_storage().find_prices(coin, since=cutoff)  # Eskiden yeniye
         else:
-            cursor = db.price_history.find({
-                "coin": coin
-            }).sort("timestamp", -1).limit(count)  # En yeni count kadar
+            # En yeni count kadar
+            records = get_storage().find_prices(coin, limit=count, newest_first=True)
             
-            # Liste halinde al ve ters çevir (eskiden yeniye)
-            records = list(cursor)
+            # Ters çevir (eskiden yeniye)
             records.reverse()
-            return [r["price"] for r in records if "price" in r]
+            prices = [r["price"] for r in records]
+            prices.extend(r["price"] for r in _pending_points(coin, records))
+            return prices[-count:] if count else prices
         
-        prices = [r["price"] for r in cursor if "price" in r]
+        prices = [r["price"] for r in records]
+        prices.extend(r["price"] for r in _pending_points(coin, records))
         return prices
     
     except Exception as e:
@@ -134,22 +256,27 @@ def get_recent_prices_with_timestamps(coin: str, hours: int = 24) -> List[dict]:
         [{"price": float, "timestamp": datetime}, ...] (en eskiden yeniye)
     """
     try:
-        db = get_db()
-        
         # Zaman aralığı
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-        cursor = db.price_history.find({
-            "coin": coin,
-            "timestamp": {"$gte": cutoff}
-        }).sort("timestamp", 1)  # Eskiden yeniye
         
-        price_data = []
-        for record in cursor:
-            if "price" in record and "timestamp" in record:
-                price_data.append({
-                    "price": record["price"],
-                    "timestamp": record["timestamp"]
-                })
+        # Bellek içi buffer aralığı kapsıyorsa DB sorgusu yapılmaz
+        window = price_ring.since(coin, cutoff)
+        if window is not None:
+            ts, prices, _ = window
+            return [
+                {"price": float(price), "timestamp": epoch_to_naive_utc(t)}
+                for t, price in zip(ts.tolist(), prices.tolist())
+            ]
+        
+        records = get_storage().find_prices(coin, since=cutoff)  # Eskiden yeniye
+        price_data = [{"price": r["price"], "timestamp": r["timestamp"]} for r in records]
+        
+        # Bekleyen noktalar (MongoDB gibi naive UTC timestamp ile)
+        for record in _pending_points(coin, records):
+            price_data.append({
+                "price": record["price"],
+                "timestamp": record["timestamp"].replace(tzinfo=None)
+            })
         
         return price_data
     
@@ -169,9 +296,7 @@ def get_price_count(coin: str) -> int:
         Toplam kayıt sayısı
     """
     try:
-        db = get_db()
-        count = db.price_history.count_documents({"coin": coin})
-        return count
+        return get_storage().count_prices(coin)
     
     except Exception as e:
         logger.error(f"Fiyat sayısı okuma hatası [{coin}]: {e}")
@@ -230,16 +355,18 @@ def cleanup_old_prices(days: int = 90):
         days: Kaç günden eski veriler silinsin
     """
     try:
-        db = get_db()
+        storage = get_storage()
+        
+        if storage.name == "mongo" and is_timeseries_collection(get_db()):
+            # Time-series collection'da eski bucket'lar expireAfterSeconds ile silinir
+            return
         
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
         
-        result = db.price_history.delete_many({
-            "timestamp": {"$lt": cutoff}
-        })
+        deleted = storage.delete_prices(until=cutoff)
         
-        if result.deleted_count > 0:
-            logger.info(f"🗑️ {result.deleted_count} eski fiyat verisi silindi")
+        if deleted > 0:
+            logger.info(f"🗑️ {deleted} eski fiyat verisi silindi")
     
     except Exception as e:
         logger.error(f"❌ Fiyat temizleme hatası: {e}")
@@ -0,0 +1,258 @@
+# backend/price_ring_buffer.py
+"""
+Coin başına bellek içi fiyat geçmişi (NumPy ring buffer)
+Son N fiyat noktası (timestamp, fiyat, hacim) önceden ayrılmış dizilerde
+tutulur; analiz ve indikatör okumaları MongoDB'ye gitmeden buradan yapılır.
+Buffer başlangıçta MongoDB'den doldurulur ve her fetch'te eklenir.
+Okumalar db_async thread havuzundan da yapıldığı için erişim kilitlidir.
+"""
+import os
+import math
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Coin başına saklanan nokta sayısı (0: devre dışı)
+PRICE_RING_CAPACITY = int(os.getenv("PRICE_RING_CAPACITY", "4096"))
+
+
+def _to_epoch(ts: datetime) -> float:
+    """MongoDB'den gelen naive (UTC) veya aware datetime → epoch saniye"""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class PriceRing:
+    """Tek coin için sabit kapasiteli (timestamp, price, volume) halkası"""
+
+    __slots__ = ("capacity", "ts", "price", "volume", "start", "size", "covered_from")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.start = 0
+        self.size = 0
+        # Bu zamandan sonraki tüm noktalar buffer'da (-inf: coin'in tüm geçmişi)
+        self.covered_from = -math.inf
+
+    def append(self, ts: float, price: float, volume: float = 0.0):
+        if self.size < self.capacity:
+            i = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            # En eski nokta düşer
+            i = self.start
+            self.start = (self.start + 1) % self.capacity
+            self.covered_from = self.ts[self.start]
+        self.ts[i] = ts
+        self.price[i] = price
+        self.volume[i] = volume or 0.0
+
+    def _ordered(self, arr: np.ndarray) -> np.ndarray:
+        end = self.start + self.size
+        if end <= self.capacity:
+            return arr[self.start:end]
+        return np.concatenate((arr[self.start:], arr[:end - self.capacity]))
+
+    def tail(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Son count nokta (eskiden yeniye)"""
+        n = min(count, self.size)
+        idx = (self.start + self.size - n + np.arange(n)) % self.capacity
+        return self.ts[idx], self.price[idx], self.volume[idx]
+
+    def since(self, cutoff: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """cutoff (epoch) ve sonrasındaki noktalar (eskiden yeniye)"""
+        ts = self._ordered(self.ts)
+        i = int(np.searchsorted(ts, cutoff, side="left"))
+        return ts[i:], self._ordered(self.price)[i:], self._ordered(self.volume)[i:]
+
+    def after(self, ts: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ts (epoch) sonrasındaki noktalar (eskiden yeniye); sadece bu noktalar kopyalanır"""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts[(self.start + mid) % self.capacity] <= ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.tail(self.size - lo)
+
+    def covers_count(self, count: int) -> bool:
+        return self.size >= count or self.covered_from == -math.inf
+
+    def covers_since(self, cutoff: float) -> bool:
+        return cutoff >= self.covered_from
+
+
+class PriceRingStore:
+    """Tüm coinlerin ring buffer'ları"""
+
+    def __init__(self, capacity: int = PRICE_RING_CAPACITY):
+        self.capacity = capacity
+        self._rings: Dict[str, PriceRing] = {}
+        # Yüklenmekte olan coinler için bu sırada gelen noktalar
+        self._late: Dict[str, List[Tuple[float, float, float]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fallbacks": 0, "hydrated": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _load(self, coin: str) -> PriceRing:
+        """Coin'in son capacity kaydını veritabanından yükle"""
+        from storage import get_storage
+        ring = PriceRing(self.capacity)
+        records = get_storage().find_prices(coin, limit=self.capacity, newest_first=True)
+        records.reverse()
+        for r in records:
+            ring.append(_to_epoch(r["timestamp"]), r["price"], r.get("volume_24h") or 0.0)
+        if len(records) >= self.capacity and ring.size:
+            # Daha eski kayıtlar DB'de kalmış olabilir
+            ring.covered_from = ring.ts[ring.start]
+        else:
+            # Arşive taşınmış günler buffer'da yok
+            from price_archive import archive_boundary
+            boundary = archive_boundary(coin)
+            if boundary is not None:
+                ring.covered_from = boundary.timestamp()
+
+        # Write-behind buffer'da bekleyen, henüz DB'ye yazılmamış noktalar
+        from price_writer import price_writer
+        last_ts = ring.ts[(ring.start + ring.size - 1) % self.capacity] if ring.size else -math.inf
+        for r in price_writer.pending_points(coin):
+            ts = _to_epoch(r["timestamp"])
+            if ts > last_ts:
+                ring.append(ts, r["price"], r.get("volume_24h") or 0.0)
+        self.stats["hydrated"] += 1
+        return ring
+
+    def get(self, coin: str) -> Optional[PriceRing]:
+        """Coin'in buffer'ı (yoksa MongoDB'den doldurulur; hata olursa None)"""
+        if not self.enabled:
+            return None
+        ring = self._rings.get(coin)
+        if ring is None:
+            with self._lock:
+                self._late.setdefault(coin, [])
+            try:
+                ring = self._load(coin)
+            except Exception as e:
+                with self._lock:
+                    self._late.pop(coin, None)
+                logger.error(f"❌ [{coin}] Ring buffer yükleme hatası: {e}")
+                return None
+            with self._lock:
+                existing = self._rings.get(coin)
+                if existing is not None:
+                    return existing
+                last_ts = ring.ts[(ring.start + ring.size - 1) % self.capacity] if ring.size else -math.inf
+                for ts, price, volume in self._late.pop(coin, []):
+                    if ts > last_ts:
+                        ring.append(ts, price, volume)
+                self._rings[coin] = ring
+        return ring
+
+    def tail(self, coin: str, count: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Son count nokta; buffer yeterli değilse None (çağıran MongoDB'ye düşer)"""
+        ring = self.get(coin)
+        if ring is None:
+            return None
+        with self._lock:
+            if not ring.covers_count(count):
+                self.stats["fallbacks"] += 1
+                return None
+            self.stats["hits"] += 1
+            return ring.tail(count)
+
+    def since(self, coin: str, cutoff: datetime) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """cutoff sonrası noktalar; buffer bu aralığı kapsamıyorsa None"""
+        ring = self.get(coin)
+        if ring is None:
+            return None
+        cutoff_ts = _to_epoch(cutoff)
+        with self._lock:
+            if not ring.covers_since(cutoff_ts):
+                self.stats["fallbacks"] += 1
+                return None
+            self.stats["hits"] += 1
+            # Kopya: kilit bırakıldıktan sonra yapılan append'ler sonucu değiştirmez
+            return tuple(arr.copy() for arr in ring.since(cutoff_ts))
+
+    def after(self, coin: str, ts: float) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yüklenmiş buffer'da ts (epoch) sonrası noktalar; buffer yüklü değilse None (DB'ye gidilmez)"""
+        with self._lock:
+            ring = self._rings.get(coin)
+            if ring is None:
+                return None
+            return ring.after(ts)
+
+    def latest(self, coin: str, count: int) -> Optional[np.ndarray]:
+        """Yüklenmiş buffer'daki son count fiyat (daha azı olabilir); buffer yüklü değilse None (DB'ye gidilmez)"""
+        with self._lock:
+            ring = self._rings.get(coin)
+            if ring is None:
+                return None
+            return ring.tail(count)[1]
+
+    def last_timestamp(self, coin: str) -> Optional[float]:
+        """Yüklenmiş buffer'daki en yeni noktanın zamanı (epoch); buffer yüklü değil/boşsa None"""
+        with self._lock:
+            ring = self._rings.get(coin)
+            if ring is None or not ring.size:
+                return None
+            return float(ring.ts[(ring.start + ring.size - 1) % ring.capacity])
+
+    def hydrate(self, coins: Iterable[str]):
+        """Başlangıçta verilen coinlerin buffer'larını doldur"""
+        if not self.enabled:
+            return
+        count = 0
+        for coin in coins:
+            if coin not in self._rings and self.get(coin) is not None:
+                count += 1
+        logger.info(f"🧠 Fiyat ring buffer hazır: {count} coin (kapasite {self.capacity})")
+
+    def append(self, coin: str, ts: datetime, price: float, volume: float = 0.0):
+        """Yeni fiyat noktası (sadece yüklenmiş coinler için; diğerleri ilk okumada DB'den gelir)"""
+        with self._lock:
+            ring = self._rings.get(coin)
+            if ring is not None:
+                ring.append(_to_epoch(ts), price, volume)
+            elif coin in self._late:
+                self._late[coin].append((_to_epoch(ts), price, volume or 0.0))
+
+    def invalidate(self, coin: str = None):
+        """Buffer'ı at (örn. geçmiş veri import'u sonrası); sonraki okumada yeniden yüklenir"""
+        with self._lock:
+            if coin is None:
+                self._rings.clear()
+            else:
+                self._rings.pop(coin, None)
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "coins": len(self._rings),
+            "points": sum(r.size for r in self._rings.values()),
+            "memory_bytes": sum(r.ts.nbytes + r.price.nbytes + r.volume.nbytes for r in self._rings.values()),
+            **self.stats,
+        }
+
+
+def epoch_to_naive_utc(ts: float) -> datetime:
+    """Epoch → MongoDB okumalarıyla aynı formatta naive UTC datetime"""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+
+# Global instance
+price_ring = PriceRingStore()
@@ -0,0 +1,341 @@
+# backend/price_rollup.py
+"""
+Fiyat geçmişi için katmanlı retention
+    raw - ham tick'ler, PRICE_HISTORY_RETENTION_DAYS gün (TTL, arşiv dosyaları dahil)
+    5m  - 5 dakikalık OHLCV bucket'lar
+    1h  - saatlik OHLCV bucket'lar
+Rollup katmanları PRICE_ROLLUP_TIERS ile ayarlanır ("<interval>:<gün>", incelden kabaya).
+
+Compaction job'ı kapanmış bucket'ları toplu olarak yazar: ilk katman ham
+tick'lerden (arşiv + veritabanı), sonraki katmanlar bir önceki katmandan
+üretilir; ardından her katmanın retention'ı uygulanır. Böylece coin sayısı
+arttıkça depolama sınırlı kalır.
+
+Okumalar (get_price_series, get_price_history) pencereye uygun katmanı seçer:
+PRICE_RAW_WINDOW_HOURS'a kadar ham tick'ler, daha uzun pencerelerde bucket
+sayısı limit'e sığan en ince rollup katmanı.
+"""
+import os
+import asyncio
+import logging
+import time as _time
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from candle_aggregator import parse_interval_to_minutes
+from price_archive import PRICE_ARCHIVE_DIR, archive_boundary, archived_days, prune_archive, read_archive
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PRICE_ROLLUP_TIERS = os.getenv("PRICE_ROLLUP_TIERS", "5m:180,1h:365")
+# Bu süreye kadar olan pencereler ham tick'lerden okunur
+PRICE_RAW_WINDOW_HOURS = float(os.getenv("PRICE_RAW_WINDOW_HOURS", "48"))
+PRICE_ROLLUP_INTERVAL_MINUTES = float(os.getenv("PRICE_ROLLUP_INTERVAL_MINUTES", "60"))
+# Tek seferde işlenen ham veri aralığı (bellek kullanımını sınırlar)
+PRICE_ROLLUP_CHUNK_DAYS = int(os.getenv("PRICE_ROLLUP_CHUNK_DAYS", "1"))
+# Write-behind buffer'daki noktalar yazılmadan bucket kapatılmaz
+ROLLUP_SETTLE_SECONDS = 120
+
+
+class RollupTier(NamedTuple):
+    name: str
+    seconds: int
+    retention_days: int
+
+
+def parse_tiers(spec: str) -> List[RollupTier]:
+    """ "5m:180,1h:365" → [RollupTier, ...] (incelden kabaya sıralı)"""
+    tiers = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        interval, _, days = part.partition(":")
+        minutes = parse_interval_to_minutes(interval.strip())
+        if minutes <= 0 or not days.strip().isdigit():
+            logger.warning(f"⚠️ Geçersiz rollup katmanı atlandı: {part}")
+            continue
+        tiers.append(RollupTier(interval.strip(), minutes * 60, int(days)))
+    return sorted(tiers, key=lambda t: t.seconds)
+
+
+ROLLUP_TIERS = parse_tiers(PRICE_ROLLUP_TIERS)
+
+last_run = {"started_at": None, "seconds": None, "coins": 0, "buckets": 0, "deleted": 0, "errors": 0}
+
+
+def _to_epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _to_datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def _source_tier(tier: RollupTier) -> Optional[RollupTier]:
+    """Katmanın üretileceği bir önceki katman (None: ham tick'ler)"""
+    index = ROLLUP_TIERS.index(tier)
+    if index > 0 and tier.seconds % ROLLUP_TIERS[index - 1].seconds == 0:
+        return ROLLUP_TIERS[index - 1]
+    return None
+
+
+def _raw_points(storage, coin: str, since: float, until: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """[since, until) ham tick'leri arşiv ve veritabanından (epoch, price, volume)"""
+    start, end = _to_datetime(since), _to_datetime(until)
+    parts = []
+    boundary = archive_boundary(coin)
+    if boundary is not None and start < boundary:
+        parts.append(read_archive(coin, start, min(end, boundary)))
+        start = max(start, boundary)
+    if start < end:
+        docs = storage.find_prices(coin, since=start, until=end)
+        parts.append((
+            np.array([_to_epoch(d["timestamp"]) for d in docs], dtype=np.float64),
+            np.array([d["price"] for d in docs], dtype=np.float64),
+            np.array([d.get("volume_24h") or 0.0 for d in docs], dtype=np.float64),
+        ))
+    if not parts:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, empty
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def bucketize(coin: str, seconds: int, ts: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+              lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray, ticks: np.ndarray) -> List[dict]:
+    """
+    Zamana göre sıralı noktaları/bucket'ları seconds'lık OHLCV bucket'lara topla
+
+    Ham tick'ler için opens=highs=lows=closes=price, ticks=1 verilir.
+    """
+    if not len(ts):
+        return []
+    starts = ts - ts % seconds
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(ts)] - 1
+    high = np.maximum.reduceat(highs, first)
+    low = np.minimum.reduceat(lows, first)
+    tick_count = np.add.reduceat(ticks, first)
+    return [
+        {
+            "coin": coin, "start": _to_datetime(float(starts[f])),
+            "open": float(opens[f]), "high": float(h), "low": float(lo), "close": float(closes[la]),
+            "volume_24h": float(volumes[la]), "ticks": int(t),
+        }
+        for f, la, h, lo, t in zip(first.tolist(), last.tolist(), high.tolist(), low.tolist(), tick_count.tolist())
+    ]
+
+
+def _rollup_range(storage, coin: str, tier: RollupTier, since: float, until: float) -> List[dict]:
+    """[since, until) aralığı için tier bucket'ları (kaynak: önceki katman veya ham tick'ler)"""
+    source = _source_tier(tier)
+    if source is None:
+        ts, prices, volumes = _raw_points(storage, coin, since, until)
+        return bucketize(coin, tier.seconds, ts, prices, prices, prices, prices, volumes,
+                         np.ones(len(ts), dtype=np.int64))
+
+    rows = storage.find_rollups(source.name, coin, since=_to_datetime(since), until=_to_datetime(until))
+    if not rows:
+        return []
+
+    def column(key):
+        return np.array([r.get(key) or 0 for r in rows], dtype=np.float64)
+
+    return bucketize(coin, tier.seconds, np.array([_to_epoch(r["start"]) for r in rows]),
+                     column("open"), column("high"), column("low"), column("close"),
+                     column("volume_24h"), column("ticks").astype(np.int64))
+
+
+def _oldest_source(storage, coin: str, tier: RollupTier) -> Optional[float]:
+    source = _source_tier(tier)
+    if source is not None:
+        rows = storage.find_rollups(source.name, coin, limit=1)
+        return _to_epoch(rows[0]["start"]) if rows else None
+    days = archived_days(coin)
+    if days:
+        first_day = datetime.combine(days[0], datetime.min.time(), tzinfo=timezone.utc)
+        ts, _, _ = read_archive(coin, first_day, first_day + timedelta(days=1))
+        if len(ts):
+            return float(ts[0])
+    docs = storage.find_prices(coin, limit=1)
+    return _to_epoch(docs[0]["timestamp"]) if docs else None
+
+
+def compact_coin(storage, coin: str, tier: RollupTier, now: float) -> int:
+    """Coin için son rollup'tan sonraki kapanmış bucket'ları yaz; yazılan bucket sayısı"""
+    end = now - ROLLUP_SETTLE_SECONDS
+    end -= end % tier.seconds
+    retention_start = now - tier.retention_days * 86400
+
+    last = storage.find_rollups(tier.name, coin, limit=1, newest_first=True)
+    if last:
+        start = _to_epoch(last[0]["start"]) + tier.seconds
+    else:
+        start = _oldest_source(storage, coin, tier)
+        if start is None:
+            return 0
+    start = max(start, retention_start)
+    start -= start % tier.seconds
+
+    chunk = max(tier.seconds, PRICE_ROLLUP_CHUNK_DAYS * 86400 // tier.seconds * tier.seconds)
+    written = 0
+    while start < end:
+        chunk_end = min(start + chunk, end)
+        written += storage.upsert_rollups(tier.name, _rollup_range(storage, coin, tier, start, chunk_end))
+        start = chunk_end
+    return written
+
+
+def compact_price_history() -> dict:
+    """
+    Tüm coinler ve katmanlar için compaction + retention (senkron; thread'de çalıştırılır)
+    """
+    from price_history import PRICE_HISTORY_RETENTION_DAYS
+
+    storage = get_storage()
+    started = _time.perf_counter()
+    now = _time.time()
+    stats = {"started_at": datetime.now(timezone.utc).isoformat(), "coins": 0, "buckets": 0, "deleted": 0, "errors": 0}
+
+    coins = set(storage.price_coins())
+    if PRICE_ARCHIVE_DIR.exists():
+        coins.update(d.name for d in PRICE_ARCHIVE_DIR.iterdir() if d.is_dir())
+
+    for coin in sorted(coins):
+        stats["coins"] += 1
+        for tier in ROLLUP_TIERS:
+            try:
+                stats["buckets"] += compact_coin(storage, coin, tier, now)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"❌ [{coin}] {tier.name} rollup hatası: {e}")
+
+    # Katman retention'ları
+    for tier in ROLLUP_TIERS:
+        try:
+            stats["deleted"] += storage.delete_rollups(tier.name, until=_to_datetime(now - tier.retention_days * 86400))
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error(f"❌ {tier.name} rollup retention hatası: {e}")
+    # Ham tick retention'ı: veritabanında TTL, arşivde gün dosyaları
+    prune_archive(_to_datetime(now - PRICE_HISTORY_RETENTION_DAYS * 86400))
+
+    stats["seconds"] = round(_time.perf_counter() - started, 2)
+    last_run.update(stats)
+    logger.info(f"🧱 Fiyat rollup: {stats['coins']} coin, {stats['buckets']} bucket, "
+                f"{stats['deleted']} eski bucket silindi ({stats['seconds']}s)")
+    return stats
+
+
+async def run_compactor():
+    """Arka plan compaction job'ı (feature flag açıkken PRICE_ROLLUP_INTERVAL_MINUTES'ta bir)"""
+    from feature_flags import feature_flags
+    from db_async import run_db
+    while True:
+        try:
+            if feature_flags.enable_price_rollups():
+                await run_db(compact_price_history)
+        except Exception as e:
+            logger.error(f"❌ Fiyat rollup job hatası: {e}")
+        await asyncio.sleep(PRICE_ROLLUP_INTERVAL_MINUTES * 60)
+
+
+def invalidate_rollups(coin: str, since: datetime) -> int:
+    """
+    since'ten sonraki bucket'ları sil (örn. geçmiş veri import'u sonrası);
+    sonraki compaction bu aralığı yeniden oluşturur
+    """
+    storage = get_storage()
+    since_epoch = _to_epoch(since)
+    deleted = 0
+    for tier in ROLLUP_TIERS:
+        deleted += storage.delete_rollups(tier.name, coin=coin,
+                                          since=_to_datetime(since_epoch - since_epoch % tier.seconds))
+    return deleted
+
+
+def select_tier(hours: float, limit: int = None) -> Optional[RollupTier]:
+    """
+    Pencere için okunacak katman
+
+    Returns:
+        RollupTier veya ham tick'ler okunacaksa None
+    """
+    from feature_flags import feature_flags
+    if hours <= PRICE_RAW_WINDOW_HOURS or not ROLLUP_TIERS or not feature_flags.enable_price_rollups():
+        return None
+    for tier in ROLLUP_TIERS:
+        if hours <= tier.retention_days * 24 and (not limit or hours * 3600 / tier.seconds <= limit):
+            return tier
+    return ROLLUP_TIERS[-1]
+
+
+def read_rollups(coin: str, tier: RollupTier, since: datetime) -> List[dict]:
+    """
+    since'ten bugüne tier bucket'ları (eskiden yeniye)
+
+    Henüz compaction'a girmemiş son kısım ham tick'lerden anlık toplanır
+    (son bucket açık bucket'tır).
+    """
+    storage = get_storage()
+    since_epoch = _to_epoch(since)
+    since_epoch -= since_epoch % tier.seconds
+    rows = storage.find_rollups(tier.name, coin, since=_to_datetime(since_epoch))
+    tail_start = _to_epoch(rows[-1]["start"]) + tier.seconds if rows else since_epoch
+
+    ts, prices, volumes = _raw_points(storage, coin, tail_start, _time.time() + 1)
+
+    # Write-behind buffer'da bekleyen noktalar
+    from price_history import _pending_points
+    last_ts = ts[-1] if len(ts) else tail_start - 1
+    pending = [p for p in _pending_points(coin) if _to_epoch(p["timestamp"]) > last_ts]
+    if pending:
+        ts = np.r_[ts, [_to_epoch(p["timestamp"]) for p in pending]]
+        prices = np.r_[prices, [p["price"] for p in pending]]
+        volumes = np.r_[volumes, [p.get("volume_24h") or 0.0 for p in pending]]
+    tail = bucketize(coin, tier.seconds, ts, prices, prices, prices, prices, volumes,
+                     np.ones(len(ts), dtype=np.int64))
+    return rows + tail
+
+
+def get_price_series(coin: str, hours: float = 24, limit: int = 500) -> dict:
+    """
+    Grafik için fiyat serisi (pencereye göre ham veya rollup katmanı)
+
+    Returns:
+        {"tier": "raw" | "5m" | ..., "resolution_seconds": int?, "points": [{"timestamp", "price", ...}]}
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    tier = select_tier(hours, limit)
+    if tier is None:
+        from price_history import get_recent_prices_with_timestamps
+        points = get_recent_prices_with_timestamps(coin, hours=hours)[-limit:]
+        return {
+            "tier": "raw",
+            "resolution_seconds": None,
+            "points": [{"timestamp": p["timestamp"].isoformat(), "price": p["price"]} for p in points],
+        }
+
+    rows = read_rollups(coin, tier, since)[-limit:]
+    return {
+        "tier": tier.name,
+        "resolution_seconds": tier.seconds,
+        "points": [
+            {"timestamp": r["start"].replace(tzinfo=None).isoformat(), "price": r["close"], "open": r["open"],
+             "high": r["high"], "low": r["low"], "volume_24h": r.get("volume_24h"), "ticks": r.get("ticks")}
+            for r in rows
+        ],
+    }
+
+
+def get_rollup_status() -> dict:
+    return {
+        "tiers": [{"name": t.name, "seconds": t.seconds, "retention_days": t.retention_days} for t in ROLLUP_TIERS],
+        "raw_window_hours": PRICE_RAW_WINDOW_HOURS,
+        "last_run": dict(last_run),
+    }
@@ -4,11 +4,12 @@ Fiyat takip sistemi - TP/SL kontrolü
 Her sinyal için güncel fiyatı kontrol eder ve başarı durumunu günceller
 """
 import asyncio
-import aiohttp
 from datetime import datetime, timezone, timedelta
-from db import SessionLocal, SignalHistory
-from cmc_client import CMCClient
+from storage import SIGNALS, get_storage
+from db_async import run_db
+from cmc_client import get_cmc_client
 from data_sync import read_config
+from http_session import get_session
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,35 +19,38 @@ class PriceTracker:
         self.cfg = read_config()
         self.api_key = self.cfg.get("cmc_api_key")
         
-    async def check_signal_status(self, signal: SignalHistory, current_price: float):
+    async def check_signal_status(self, signal: dict, current_price: float):
         """
         Sinyal durumunu kontrol et
         Returns: (status, reward)
         status: 'success', 'failed', 'pending'
         reward: kazanç/kayıp yüzdesi
         """
-        if not signal.tp or not signal.stop_loss:
+        tp = signal.get('tp')
+        stop_loss = signal.get('stop_loss')
+        if not tp or not stop_loss:
             return 'pending', 0.0
             
-        entry_price = signal.features.get('price') if signal.features else None
+        features = signal.get('features')
+        entry_price = features.get('price') if features else None
         if not entry_price:
             return 'pending', 0.0
         
-        if signal.signal_type == 'LONG':
+        if signal.get('signal_type') == 'LONG':
             # LONG: TP yukarıda, SL aşağıda
-            if current_price >= signal.tp:
-                reward = ((signal.tp - entry_price) / entry_price) * 100
+            if current_price >= tp:
+                reward = ((tp - entry_price) / entry_price) * 100
                 return 'success', reward
-            elif current_price <= signal.stop_loss:
-                reward = ((signal.stop_loss - entry_price) / entry_price) * 100
+            elif current_price <= stop_loss:
+                reward = ((stop_loss - entry_price) / entry_price) * 100
                 return 'failed', reward
         else:  # SHORT
             # SHORT: TP aşağıda, SL yukarıda
-            if current_price <= signal.tp:
-                reward = ((entry_price - signal.tp) / entry_price) * 100
+            if current_price <= tp:
+                reward = ((entry_price - tp) / entry_price) * 100
                 return 'success', reward
-            elif current_price >= signal.stop_loss:
-                reward = ((entry_price - signal.stop_loss) / entry_price) * 100
+            elif current_price >= stop_loss:
+                reward = ((entry_price - stop_loss) / entry_price) * 100
                 return 'failed', reward
         
         return 'pending', 0.0
@@ -59,54 +63,46 @@ class PriceTracker:
             logger.error("CMC API key bulunamadı!")
             return
         
-        db = SessionLocal()
-        try:
-            # Sadece success = None olanları (pending) kontrol et
-            pending_signals = db.query(SignalHistory).filter(
-                SignalHistory.success == None
-            ).all()
-            
-            if not pending_signals:
-                logger.info("Kontrol edilecek pending sinyal yok")
-                return
-            
-            logger.info(f"🔍 {len(pending_signals)} sinyal kontrol ediliyor...")
+        storage = get_storage()
+        
+        # Sadece success = None olanları (pending) kontrol et
+        pending_signals = await run_db(storage.find, SIGNALS, {"success": None})
+        
+        if not pending_signals:
+            logger.info("Kontrol edilecek pending sinyal yok")
+            return
+        
+        logger.info(f"🔍 {len(pending_signals)} sinyal kontrol ediliyor...")
+        
+        session = get_session("cmc")
+        cmc = get_cmc_client(self.api_key)
             
-            async with aiohttp.ClientSession() as session:
-                cmc = CMCClient(self.api_key)
+        for signal in pending_signals:
+            coin = signal.get("coin")
+            try:
+                # Güncel fiyatı çek
+                quote = await cmc.get_quote(session, coin)
+                data = quote["data"]
+                coin_data = data[list(data.keys())[0]]
+                current_price = coin_data["quote"]["USD"]["price"]
                 
-                for signal in pending_signals:
-                    try:
-                        # Güncel fiyatı çek
-                        quote = await cmc.get_quote(session, signal.coin)
-                        data = quote["data"]
-                        coin_data = data[list(data.keys())[0]]
-                        current_price = coin_data["quote"]["USD"]["price"]
-                        
-                        # Durumu kontrol et
-                        status, reward = await self.check_signal_status(signal, current_price)
-                        
-                        if status == 'success':
-                            signal.success = True
-                            signal.reward = reward
-                            db.commit()
-                            logger.info(f"✅ {signal.coin} TP'ye ulaştı! Kazanç: {reward:.2f}%")
-                        elif status == 'failed':
-                            signal.success = False
-                            signal.reward = reward
-                            db.commit()
-                            logger.info(f"❌ {signal.coin} SL'e takıldı! Kayıp: {reward:.2f}%")
-                        
-                        await asyncio.sleep(0.5)  # Rate limiting
-                        
-                    except Exception as e:
-                        logger.error(f"Fiyat kontrol hatası {signal.coin}: {e}")
-                        continue
-            
-            logger.info("✅ Fiyat kontrolü tamamlandı")
-            
-        finally:
-            db.close()
+                # Durumu kontrol et
+                status, reward = await self.check_signal_status(signal, current_price)
+                
+                if status == 'success':
+                    await run_db(storage.update, SIGNALS, signal["id"], {"success": True, "reward": reward})
+                    logger.info(f"✅ {coin} TP'ye ulaştı! Kazanç: {reward:.2f}%")
+                elif status == 'failed':
+                    await run_db(storage.update, SIGNALS, signal["id"], {"success": False, "reward": reward})
+                    logger.info(f"❌ {coin} SL'e takıldı! Kayıp: {reward:.2f}%")
+                
+                await asyncio.sleep(0.5)  # Rate limiting
+                
+            except Exception as e:
+                logger.error(f"Fiyat kontrol hatası {coin}: {e}")
+                continue
+        
+        logger.info("✅ Fiyat kontrolü tamamlandı")
 
 async def run_price_tracker():
     """Fiyat takip döngüsü - her 5 dakikada bir çalışır"""
@@ -6,6 +6,7 @@ CMC API'den gelen fiyatı alternatif kaynaklarla karşılaştırır
 import aiohttp
 import logging
 from typing import Optional, Dict
+from http_session import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -38,32 +39,32 @@ async def get_dexscreener_price(symbol: str, chain: str = "bsc") -> Optional[flo
         address = contract_info["address"]
         url = f"https://api.dexscreener.com/latest/dex/tokens/{address}"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    data = await response.json()
+        session = get_session("validator")
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status == 200:
+                data = await response.json()
+                
+                # En yüksek likiditeye sahip pair'i al
+                pairs = data.get("pairs", [])
+                if pairs:
+                    # Likiditeye göre sırala
+                    pairs_sorted = sorted(pairs, key=lambda x: float(x.get("liquidity", {}).get("usd", 0)), reverse=True)
                     
-                    # En yüksek likiditeye sahip pair'i al
-                    pairs = data.get("pairs", [])
-                    if pairs:
-                        # Likiditeye göre sırala
-                        pairs_sorted = sorted(pairs, key=lambda x: float(x.get("liquidity", {}).get("usd", 0)), reverse=True)
+                    if pairs_sorted:
+                        best_pair = pairs_sorted[0]
+                        price = float(best_pair.get("priceUsd", 0))
+                        dex_name = best_pair.get("dexId", "Unknown")
+                        liquidity = best_pair.get("liquidity", {}).get("usd", 0)
                         
-                        if pairs_sorted:
-                            best_pair = pairs_sorted[0]
-                            price = float(best_pair.get("priceUsd", 0))
-                            dex_name = best_pair.get("dexId", "Unknown")
-                            liquidity = best_pair.get("liquidity", {}).get("usd", 0)
-                            
-                            if price > 0:
-                                logger.info(f"[{symbol}] DexScreener fiyatı: ${price} (DEX: {dex_name}, Liq: ${liquidity:,.0f})")
-                                return price
-                    
-                    logger.warning(f"[{symbol}] DexScreener'da pair bulunamadı")
-                    return None
-                else:
-                    logger.warning(f"[{symbol}] DexScreener API hatası: {response.status}")
-                    return None
+                        if price > 0:
+                            logger.info(f"[{symbol}] DexScreener fiyatı: ${price} (DEX: {dex_name}, Liq: ${liquidity:,.0f})")
+                            return price
+                
+                logger.warning(f"[{symbol}] DexScreener'da pair bulunamadı")
+                return None
+            else:
+                logger.warning(f"[{symbol}] DexScreener API hatası: {response.status}")
+                return None
     
     except Exception as e:
         logger.error(f"[{symbol}] DexScreener fiyat alma hatası: {e}")
@@ -104,18 +105,18 @@ async def get_binance_price(symbol: str) -> Optional[float]:
     try:
         url = f"https://api.binance.com/api/v3/ticker/price?symbol={pair}"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data.get("price")
-                    if price:
-                        price = float(price)
-                        logger.info(f"[{symbol}] Binance fiyatı: ${price}")
-                        return price
-                else:
-                    logger.debug(f"[{symbol}] Binance'de pair bulunamadı: {pair}")
-                    return None
+        session = get_session("validator")
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            if response.status == 200:
+                data = await response.json()
+                price = data.get("price")
+                if price:
+                    price = float(price)
+                    logger.info(f"[{symbol}] Binance fiyatı: ${price}")
+                    return price
+            else:
+                logger.debug(f"[{symbol}] Binance'de pair bulunamadı: {pair}")
+                return None
     
     except Exception as e:
         logger.debug(f"[{symbol}] Binance fiyat alma hatası: {e}")
@@ -157,17 +158,17 @@ async def get_coingecko_price(symbol: str) -> Optional[float]:
     try:
         url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data.get(coin_id, {}).get("usd")
-                    if price:
-                        logger.info(f"[{symbol}] CoinGecko fiyatı: ${price}")
-                        return float(price)
-                else:
-                    logger.warning(f"[{symbol}] CoinGecko API hatası: {response.status}")
-                    return None
+        session = get_session("validator")
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status == 200:
+                data = await response.json()
+                price = data.get(coin_id, {}).get("usd")
+                if price:
+                    logger.info(f"[{symbol}] CoinGecko fiyatı: ${price}")
+                    return float(price)
+            else:
+                logger.warning(f"[{symbol}] CoinGecko API hatası: {response.status}")
+                return None
     
     except Exception as e:
         logger.error(f"[{symbol}] CoinGecko fiyat alma hatası: {e}")
@@ -0,0 +1,229 @@
+# backend/price_writer.py
+"""
+Fiyat noktaları için write-behind buffer
+Tüm coin fetch'lerinden gelen fiyat noktaları bellekte toplanır ve boyut
+veya süre eşiğinde tek toplu yazımla (MongoDB insert_many / SQLite transaction) kaydedilir.
+Veritabanı yavaşsa buffer dolunca add() bekler (backpressure); kapanışta kalanlar yazılır.
+Başarısız flush'lardan sonra üstel artan süre beklenir (veritabanı kapalıyken sıcak döngü olmaz).
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from price_ring_buffer import price_ring
+from candle_store import candle_store
+from db_async import run_db
+
+logger = logging.getLogger(__name__)
+
+PRICE_WRITER_BATCH_SIZE = int(os.getenv("PRICE_WRITER_BATCH_SIZE", "500"))
+PRICE_WRITER_FLUSH_SECONDS = float(os.getenv("PRICE_WRITER_FLUSH_SECONDS", "2.0"))
+PRICE_WRITER_MAX_PENDING = int(os.getenv("PRICE_WRITER_MAX_PENDING", "20000"))
+# Art arda başarısız flush'larda bekleme üst sınırı (flush_seconds, 2x, 4x, ... bu değere kadar)
+PRICE_WRITER_MAX_RETRY_SECONDS = float(os.getenv("PRICE_WRITER_MAX_RETRY_SECONDS", "60"))
+
+
+class PriceWriter:
+    """price_history için asenkron toplu yazıcı"""
+
+    def __init__(self, batch_size: int = PRICE_WRITER_BATCH_SIZE,
+                 flush_seconds: float = PRICE_WRITER_FLUSH_SECONDS,
+                 max_pending: int = PRICE_WRITER_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+
+        self._buffer: List[dict] = []
+        # Henüz yazılmamış noktalar (okumalarda DB sonucuna eklenir)
+        self._pending_by_coin: Dict[str, List[dict]] = {}
+        self._inflight_by_coin: Dict[str, List[dict]] = {}
+        self._flush_needed: Optional[asyncio.Event] = None
+        self._drained: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "flushes": 0,
+            "errors": 0,
+            "dropped": 0,
+            "backpressure_waits": 0,
+            "consecutive_failures": 0,
+            "retry_delay_seconds": 0.0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Flush task'ını başlat"""
+        if self.running:
+            return
+        self._flush_needed = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✍️ Price writer başlatıldı (batch={self.batch_size}, flush={self.flush_seconds}s)")
+
+    async def stop(self):
+        """Task'ı durdur ve buffer'da kalanları yaz"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self._flush():
+                break
+        try:
+            candle_store.write(candle_store.take_dirty())
+        except Exception as e:
+            logger.error(f"❌ Candle flush hatası: {e}")
+        logger.info(f"🛑 Price writer durduruldu ({len(self._buffer)} nokta yazılamadı)")
+
+    async def add(self, coin: str, price: float, volume_24h: float = 0, timestamp: datetime = None):
+        """
+        Fiyat noktasını kuyruğa ekle
+
+        Writer çalışmıyorsa (örn. script kullanımı) doğrudan yazar.
+        Buffer max_pending'e ulaştıysa flush bitene kadar bekler.
+        """
+        doc = {
+            "coin": coin,
+            "price": price,
+            "volume_24h": volume_24h,
+            "timestamp": timestamp or datetime.now(timezone.utc)
+        }
+        # Okumalar için bellek içi ring buffer'a ve açık candle'lara hemen eklenir
+        price_ring.append(coin, doc["timestamp"], price, volume_24h)
+        candle_store.update(coin, doc["timestamp"], price, volume_24h)
+
+        if not self.running:
+            from price_history import save_price_point
+            save_price_point(coin, price, volume_24h, doc["timestamp"])
+            try:
+                candle_store.write(candle_store.take_dirty())
+            except Exception as e:
+                logger.error(f"❌ [{coin}] Candle yazma hatası: {e}")
+            return
+
+        while len(self._buffer) >= self.max_pending:
+            self.stats["backpressure_waits"] += 1
+            self._drained.clear()
+            self._flush_needed.set()
+            await self._drained.wait()
+
+        self._buffer.append(doc)
+        self._pending_by_coin.setdefault(coin, []).append(doc)
+        self.stats["queued"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._flush_needed.set()
+
+    def pending_points(self, coin: str) -> List[dict]:
+        """Coin'in henüz MongoDB'ye yazılmamış noktaları (eskiden yeniye)"""
+        return self._inflight_by_coin.get(coin, []) + self._pending_by_coin.get(coin, [])
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            if self._buffer:
+                if await self._flush():
+                    self.stats["consecutive_failures"] = 0
+                else:
+                    self.stats["consecutive_failures"] += 1
+            self._drained.set()
+
+            failures = self.stats["consecutive_failures"]
+            delay = min(self.flush_seconds * 2 ** (failures - 1), PRICE_WRITER_MAX_RETRY_SECONDS) if failures else 0.0
+            self.stats["retry_delay_seconds"] = delay
+            if delay:
+                # Backpressure'da bekleyen add()'ler bu sürede yeni flush tetikleyemez
+                logger.warning(f"⏳ Price writer {failures}. başarısız flush, {delay:.1f}s sonra tekrar denenecek")
+                await asyncio.sleep(delay)
+
+    async def _flush(self) -> bool:
+        """Buffer'ı tek toplu yazımla kaydet; bağlantı hatasında noktalar buffer'a geri konur"""
+        batch = self._buffer
+        self._buffer = []
+        self._inflight_by_coin = self._pending_by_coin
+        self._pending_by_coin = {}
+        candles = candle_store.take_dirty()
+
+        started = time.perf_counter()
+        ok = True
+        try:
+            written = await run_db(self._insert, batch)
+            self.stats["written"] += written
+            if written < len(batch):
+                # Hatalı/tekrarlanan noktalar dışındakiler yazıldı, tekrar denenmez
+                self.stats["errors"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            ok = False
+            logger.error(f"❌ Price writer flush hatası ({len(batch)} nokta): {e}")
+            self._requeue(batch)
+        finally:
+            self._inflight_by_coin = {}
+
+        # Açık/kapanan candle'lar aynı flush'ta tek bulk_write ile yazılır
+        try:
+            await run_db(candle_store.write, candles)
+        except Exception as e:
+            logger.error(f"❌ Candle flush hatası ({len(candles)} candle): {e}")
+            candle_store.restore_dirty(candles)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+        self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 2)
+        self.stats["total_flush_ms"] += elapsed_ms
+        return ok
+
+    @staticmethod
+    def _insert(batch: List[dict]) -> int:
+        from storage import get_storage
+        from price_history import note_price_saved
+        written = get_storage().insert_prices(batch)
+        for doc in batch:
+            note_price_saved(doc["coin"], doc["price"])
+        return written
+
+    def _requeue(self, batch: List[dict]):
+        """Yazılamayan noktaları sıranın başına geri koy (limit aşılırsa en eskiler atılır)"""
+        merged = batch + self._buffer
+        overflow = len(merged) - self.max_pending
+        if overflow > 0:
+            self.stats["dropped"] += overflow
+            merged = merged[overflow:]
+            logger.warning(f"⚠️ Price writer buffer dolu, {overflow} eski nokta atıldı")
+        self._buffer = merged
+        self._pending_by_coin = {}
+        for doc in merged:
+            self._pending_by_coin.setdefault(doc["coin"], []).append(doc)
+
+    def get_status(self) -> dict:
+        flushes = self.stats["flushes"]
+        return {
+            "running": self.running,
+            "queue_depth": len(self._buffer),
+            "batch_size": self.batch_size,
+            "flush_seconds": self.flush_seconds,
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+            **{k: v for k, v in self.stats.items() if k != "total_flush_ms"},
+        }
+
+
+# Global instance
+price_writer = PriceWriter()
@@ -0,0 +1,137 @@
+# backend/quote_batcher.py
+"""
+Toplu (batch) quote çekici
+Aynı zaman penceresinde veri isteyen tüm coin fetch loop'larını tek bir
+/v1/cryptocurrency/quotes/latest?symbol=A,B,C isteğinde toplar ve
+gelen yanıtı sembol bazında bekleyen loop'lara dağıtır
+"""
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+import aiohttp
+
+from cmc_client import CMCClient, chunk_symbols
+
+logger = logging.getLogger(__name__)
+
+# Batch penceresi: bu süre içinde gelen istekler tek CMC çağrısında birleştirilir
+QUOTE_BATCH_WINDOW_SECONDS = float(os.getenv("QUOTE_BATCH_WINDOW_SECONDS", "1.0"))
+
+
+class QuoteBatcher:
+    """Sembol isteklerini pencere bazında toplayıp tek CMC çağrısına çeviren collector"""
+
+    def __init__(self, window_seconds: float = QUOTE_BATCH_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._client: Optional[CMCClient] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Çalışan flush task'ları (referans tutulmazsa GC tamamlanmadan toplayabilir)
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "requested_symbols": 0,
+            "batches": 0,
+            "cmc_requests": 0,
+        }
+
+    async def get_quote(self, cmc: CMCClient, session: aiohttp.ClientSession, symbol: str) -> dict:
+        """
+        Sembol için quote iste; aynı penceredeki diğer isteklerle birlikte çekilir
+
+        Args:
+            cmc: CMC client
+            session: aiohttp session
+            symbol: Coin sembolü
+
+        Returns:
+            Tek sembollük CMC yanıtı ({"status": ..., "data": {SYMBOL: {...}}})
+        """
+        symbol = symbol.upper()
+
+        # Paylaşılan cache'te taze veri varsa istek kuyruğuna girmeye gerek yok
+        cached = cmc.get_cached_quote(symbol)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._client = cmc
+        self._session = session
+        self._pending.setdefault(symbol, []).append(future)
+        self.stats["requested_symbols"] += 1
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self):
+        """Pencere dolduğunda bekleyen istekleri gönder"""
+        self._flush_handle = None
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        task = asyncio.create_task(self._flush(pending, self._client, self._session))
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._flush_done(t, pending))
+
+    def _flush_done(self, task: asyncio.Task, pending: Dict[str, List[asyncio.Future]]):
+        """Flush task'ını bırak; beklenmeyen hatada bekleyen istekleri de hatayla sonlandır"""
+        self._tasks.discard(task)
+        if task.cancelled():
+            for futures in pending.values():
+                for future in futures:
+                    future.cancel()
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"❌ Batch quote flush hatası: {error}")
+            for futures in pending.values():
+                self._resolve(futures, error=error)
+
+    async def _flush(self, pending: Dict[str, List[asyncio.Future]], cmc: CMCClient, session: aiohttp.ClientSession):
+        """Bekleyen sembolleri limitlere göre bölüp çek ve sonuçları dağıt"""
+        chunks = chunk_symbols(list(pending.keys()))
+        self.stats["batches"] += 1
+        self.stats["cmc_requests"] += len(chunks)
+        logger.info(f"📦 Batch quote: {len(pending)} sembol → {len(chunks)} CMC isteği")
+
+        await asyncio.gather(*(self._fetch_chunk(chunk, pending, cmc, session) for chunk in chunks))
+
+    async def _fetch_chunk(self, chunk: List[str], pending: Dict[str, List[asyncio.Future]],
+                           cmc: CMCClient, session: aiohttp.ClientSession):
+        """Tek bir sembol grubunu çek ve her sembolün bekleyenlerine yanıtını ver"""
+        try:
+            response = await cmc.get_quotes(session, chunk)
+        except Exception as e:
+            logger.error(f"❌ Batch quote hatası ({len(chunk)} sembol): {e}")
+            for symbol in chunk:
+                self._resolve(pending[symbol], error=e)
+            return
+
+        data = response.get("data") or {}
+        status = response.get("status", {})
+        for symbol in chunk:
+            if symbol in data:
+                self._resolve(pending[symbol], result={"status": status, "data": {symbol: data[symbol]}})
+            else:
+                self._resolve(pending[symbol], error=KeyError(f"{symbol} CMC yanıtında bulunamadı"))
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], result=None, error: Exception = None):
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# Global instance
+quote_batcher = QuoteBatcher()
@@ -0,0 +1,132 @@
+# backend/quote_snapshot.py
+"""
+CMC quote'unun sıkıştırılmış hali
+Ham CMC JSON'u (her coin için onlarca alan ve iç içe dict) yerine sadece
+kullanılan alanlar __slots__ ile tutulur; quote bir kez parse edilir ve
+cache, fetch döngüsü ve analiz aynı snapshot'ı kullanır.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# build_features_from_quote'un döndürdüğü alanlar (sırası korunur)
+FEATURE_FIELDS = (
+    "price",
+    "percent_change_1h",
+    "percent_change_24h",
+    "percent_change_7d",
+    "percent_change_30d",
+    "percent_change_60d",
+    "percent_change_90d",
+    "market_cap",
+    "volume_24h",
+    "volume_change_24h",
+)
+
+
+class QuoteSnapshot:
+    """Tek bir coin'in son CMC quote'u (USD)"""
+
+    __slots__ = ("symbol", "last_updated") + FEATURE_FIELDS
+
+    def __init__(self, symbol: str, last_updated: Optional[str] = None, **fields):
+        self.symbol = symbol
+        self.last_updated = last_updated
+        for name in FEATURE_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def features(self) -> dict:
+        """Model / threshold hesaplarında kullanılan özellik dict'i"""
+        return {name: getattr(self, name) for name in FEATURE_FIELDS}
+
+    def to_dict(self) -> dict:
+        """API yanıtları için düz dict"""
+        return {"symbol": self.symbol, "last_updated": self.last_updated, **self.features()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuoteSnapshot":
+        """to_dict çıktısından (örn. kayıtlı snapshot) snapshot oluştur"""
+        return cls(data["symbol"], last_updated=data.get("last_updated"),
+                   **{name: data.get(name) for name in FEATURE_FIELDS})
+
+    def __repr__(self):
+        return f"QuoteSnapshot({self.symbol}, price={self.price}, last_updated={self.last_updated})"
+
+
+def parse_quote(quote_json: dict, symbol: Optional[str] = None) -> Optional[QuoteSnapshot]:
+    """
+    CMC quotes/latest yanıtını snapshot'a çevir
+
+    Args:
+        quote_json: {"status": ..., "data": {SYMBOL: {...}}} formatında yanıt
+        symbol: Alınacak sembol (verilmezse data'daki ilk sembol)
+
+    Returns:
+        QuoteSnapshot veya yanıt beklenen formatta değilse None
+    """
+    try:
+        data = quote_json["data"]
+        if symbol is None:
+            symbol = next(iter(data))
+        coin = data[symbol]
+        # v2 formatında sembol başına liste gelebilir
+        if isinstance(coin, list):
+            coin = coin[0]
+        q = coin["quote"]["USD"]
+    except (KeyError, TypeError, IndexError, StopIteration):
+        return None
+
+    return QuoteSnapshot(
+        symbol,
+        last_updated=q.get("last_updated") or coin.get("last_updated"),
+        **{name: q.get(name) for name in FEATURE_FIELDS}
+    )
+
+
+def save_snapshot(snapshot: QuoteSnapshot, last_fetch: datetime, status: str = "active"):
+    """
+    Coin'in son snapshot'ını kaydet (restart sonrası warm-start için)
+
+    Args:
+        snapshot: Son quote
+        last_fetch: Çekme zamanı
+        status: Coin durumu
+    """
+    try:
+        get_storage().set_snapshot(snapshot.symbol, {**snapshot.to_dict(), "last_fetch": last_fetch, "status": status})
+    except Exception as e:
+        logger.error(f"❌ [{snapshot.symbol}] Snapshot kaydetme hatası: {e}")
+
+
+def touch_snapshot(symbol: str, last_fetch: datetime):
+    """Quote değişmediğinde sadece son çekme zamanını güncelle"""
+    try:
+        get_storage().touch_snapshot(symbol, last_fetch)
+    except Exception as e:
+        logger.error(f"❌ [{symbol}] Snapshot güncelleme hatası: {e}")
+
+
+def load_snapshots() -> Dict[str, dict]:
+    """
+    Kayıtlı snapshot'ları coin_data_cache formatında yükle
+
+    Returns:
+        {symbol: {"data": QuoteSnapshot, "last_fetch": datetime, "status": str}}
+    """
+    entries = {}
+    try:
+        for doc in get_storage().all_snapshots():
+            entries[doc["symbol"]] = {
+                "data": QuoteSnapshot.from_dict(doc),
+                "last_fetch": doc.get("last_fetch"),
+                "status": doc.get("status", "active"),
+                "skipped_ticks": 0
+            }
+        logger.info(f"♻️ {len(entries)} coin snapshot'ı yüklendi (warm-start)")
+    except Exception as e:
+        logger.error(f"❌ Snapshot yükleme hatası: {e}")
+    return entries
@@ -2,6 +2,8 @@
 import os
 import asyncio
 import json
+import time
+import random
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,14 +19,26 @@ load_dotenv(ROOT_DIR / '.env')
 
 from data_sync import read_config, update_config
 from notifier import send_telegram_message_async
-from db import init_db, fetch_recent_signals, SessionLocal, SignalHistory
-from analyzer import analyze_cycle
-from sqlalchemy import func, desc, Integer
+from http_session import get_session, init_sessions, close_sessions
+from fetch_scheduler import FetchScheduler
+from quote_snapshot import parse_quote, load_snapshots
+from price_writer import price_writer
+from price_ring_buffer import price_ring
+from candle_store import candle_store
+from price_archive import get_archive_status, run_archiver
+from price_rollup import get_price_series, get_rollup_status, run_compactor
+from historical_import import historical_importer
+from indicator_stream import indicator_engine
+from credit_budget import credit_budget
+from db import init_db
+from storage import SIGNALS, get_storage
+import db_async
+from loop_monitor import loop_monitor
+from analyzer import analyze_cycle, coin_data_cache
 from datetime import datetime, timedelta, timezone
-from price_history import save_price_point, get_recent_prices, get_price_statistics
-from indicators import calculate_indicators
-from price_alarms import check_price_alarms, get_active_alarms, delete_alarm, get_alarm_statistics
-from manual_price_override import set_manual_price, get_manual_price, remove_manual_price, get_all_manual_prices
+import indicator_batch
+from indicator_cache import indicator_cache, price_statistics, recent_indicators
+from indicator_registry import list_indicators, select_indicators
 
 # Ensure DB and export dir exist
 init_db()
@@ -43,9 +57,14 @@ logger = logging.getLogger(__name__)
 # Admin token for protecting config-changing endpoints
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "cryptobot_admin_2024")
 
-# Global cache for coin data and fetch times
-coin_data_cache = {}  # {symbol: {"data": {}, "last_fetch": datetime, "status": "active/passive"}}
-fetch_tasks = {}  # {symbol: asyncio.Task}
+# Global cache for coin data and fetch times: analyzer.coin_data_cache (paylaşılan)
+# {symbol: {"data": QuoteSnapshot, "last_fetch": datetime, "status": "active/passive"}}
+fetch_scheduler = None  # FetchScheduler (tüm coinler için tek scheduler)
+archiver_task: Optional[asyncio.Task] = None  # Fiyat arşivleyici (price_archive.run_archiver)
+rollup_task: Optional[asyncio.Task] = None  # Fiyat rollup compaction'ı (price_rollup.run_compactor)
+indicator_task: Optional[asyncio.Task] = None  # Gösterge durumlarının periyodik kaydı (indicator_engine.run_persister)
+credit_task: Optional[asyncio.Task] = None  # CMC kredi sayaçlarının periyodik yazımı (credit_budget.run_flusher)
+fetch_stats = {"ticks": 0, "skipped_unchanged": 0}  # last_updated değişmediği için atlanan tick'ler
 
 # CORS
 app.add_middleware(
@@ -75,6 +94,13 @@ class ConfigIn(BaseModel):
     telegram_chat_id: Optional[str] = None
     allowed_user_ids: Optional[str] = None
     max_concurrent_coins: Optional[int] = None
+    cmc_daily_credit_budget: Optional[int] = None
+    cmc_monthly_credit_budget: Optional[int] = None
+    adaptive_fetch_enabled: Optional[bool] = None
+    fetch_interval_min_minutes: Optional[float] = None
+    fetch_interval_max_minutes: Optional[float] = None
+    scheduler_jitter_seconds: Optional[float] = None
+    scheduler_align_to_candles: Optional[bool] = None
 
 class CoinSetting(BaseModel):
     coin: str
@@ -135,10 +161,29 @@ async def post_config(payload: ConfigIn, request: Request):
         updates["allowed_user_ids"] = payload.allowed_user_ids.strip()
     if payload.max_concurrent_coins is not None:
         updates["max_concurrent_coins"] = int(payload.max_concurrent_coins)
+    if payload.cmc_daily_credit_budget is not None:
+        updates["cmc_daily_credit_budget"] = int(payload.cmc_daily_credit_budget)
+    if payload.cmc_monthly_credit_budget is not None:
+        updates["cmc_monthly_credit_budget"] = int(payload.cmc_monthly_credit_budget)
+    if payload.adaptive_fetch_enabled is not None:
+        updates["adaptive_fetch_enabled"] = bool(payload.adaptive_fetch_enabled)
+    if payload.fetch_interval_min_minutes is not None:
+        updates["fetch_interval_min_minutes"] = float(payload.fetch_interval_min_minutes)
+    if payload.fetch_interval_max_minutes is not None:
+        updates["fetch_interval_max_minutes"] = float(payload.fetch_interval_max_minutes)
+    if payload.scheduler_jitter_seconds is not None:
+        updates["scheduler_jitter_seconds"] = max(0.0, float(payload.scheduler_jitter_seconds))
+    if payload.scheduler_align_to_candles is not None:
+        updates["scheduler_align_to_candles"] = bool(payload.scheduler_align_to_candles)
     
     if updates:
         cfg = update_config(updates)
     
+    # Scheduler ayarları bir sonraki tick'ten itibaren geçerli olur
+    if fetch_scheduler is not None:
+        fetch_scheduler.jitter_seconds = float(cfg.get("scheduler_jitter_seconds", fetch_scheduler.jitter_seconds))
+        fetch_scheduler.align_to_candles = bool(cfg.get("scheduler_align_to_candles", fetch_scheduler.align_to_candles))
+    
     # Mask for response
     response_cfg = {k: (v if k not in ('cmc_api_key','telegram_token') else ("*****" if v else None)) for k,v in cfg.items()}
     return {"status":"ok", "config": response_cfg}
@@ -155,15 +200,14 @@ async def test_telegram(request: Request):
     
     msg = "🔔 Test mesajı: Telegram entegrasyonu başarılı! (Crypto Bot)"
     
-    import aiohttp
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {"chat_id": chat, "text": msg}
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, data=payload) as resp:
-            data = await resp.json()
-            if not data.get("ok"):
-                raise HTTPException(status_code=500, detail=f"Telegram API hatası: {data}")
+    session = get_session("telegram")
+    async with session.post(url, data=payload) as resp:
+        data = await resp.json()
+        if not data.get("ok"):
+            raise HTTPException(status_code=500, detail=f"Telegram API hatası: {data}")
     
     return {"status":"ok", "detail":"Test mesajı gönderildi"}
 
@@ -364,10 +408,9 @@ async def calculate_threshold_preview(coin: str, timeframe: str = "24h"):
     Frontend'de preview için kullanılır
     """
     try:
-        from cmc_client import CMCClient
+        from cmc_client import get_cmc_client
         from feature_store import build_features_from_quote
         from volatility_calculator import calculate_volatility, calculate_dynamic_threshold
-        import aiohttp
         
         cfg = read_config()
         API_KEY = cfg.get("cmc_api_key") or os.getenv("CMC_API_KEY")
@@ -376,10 +419,10 @@ async def calculate_threshold_preview(coin: str, timeframe: str = "24h"):
             return {"error": "CMC API key bulunamadı"}
         
         # Coin verilerini al
-        async with aiohttp.ClientSession() as session:
-            cmc = CMCClient(API_KEY)
-            quote = await cmc.get_quote(session, coin.upper())
-            features = build_features_from_quote(quote)
+        session = get_session("cmc")
+        cmc = get_cmc_client(API_KEY)
+        quote = await cmc.get_quote(session, coin.upper())
+        features = build_features_from_quote(quote)
         
         # Volatiliteyi hesapla
         volatility = calculate_volatility(features)
@@ -435,7 +478,7 @@ async def get_signals(
     elif coin:
         coin_list = [coin.upper()]
     
-    recs = fetch_recent_signals(limit, coin_list=coin_list, status=status)
+    recs = await db_async.fetch_recent_signals(limit, coin_list=coin_list, status=status)
     out = []
     for r in recs:
         # created_at'ı Türkiye saatine çevir
@@ -469,9 +512,7 @@ async def get_signals(
 @app.get("/api/performance-dashboard")
 async def get_performance_dashboard():
     """Performance dashboard verileri"""
-    from db import get_dashboard_stats
-    
-    stats = get_dashboard_stats()
+    stats = await db_async.get_dashboard_stats()
     return stats
 
 @app.post("/api/analyze_now")
@@ -485,13 +526,11 @@ async def analyze_now(background_tasks: BackgroundTasks, request: Request):
 async def delete_signal_endpoint(signal_id: str, request: Request):
     """Tek bir sinyali sil"""
     require_admin(request)
-    from db import delete_signal, get_signal_by_id
-    
-    signal = get_signal_by_id(signal_id)
+    signal = await db_async.get_signal_by_id(signal_id)
     if not signal:
         raise HTTPException(status_code=404, detail="Sinyal bulunamadı")
     
-    success = delete_signal(signal_id)
+    success = await db_async.delete_signal(signal_id)
     if success:
         return {"status": "ok", "message": f"Sinyal {signal_id} silindi"}
     else:
@@ -503,8 +542,7 @@ async def track_signals(request: Request):
     require_admin(request)
     
     try:
-        from signal_tracker import update_all_signals
-        stats = update_all_signals()
+        stats = await db_async.update_all_signals()
         
         return {
             "status": "ok",
@@ -520,8 +558,7 @@ async def track_signals(request: Request):
 async def get_signal_statistics():
     """Sinyal istatistiklerini getir"""
     try:
-        from signal_tracker import get_signal_statistics
-        stats = get_signal_statistics()
+        stats = await db_async.get_signal_statistics()
         return stats
     except Exception as e:
         logger.error(f"İstatistik hatası: {e}")
@@ -531,18 +568,14 @@ async def get_signal_statistics():
 async def clear_all_signals(request: Request):
     """Tüm sinyalleri sil"""
     require_admin(request)
-    from db import clear_all_signals as clear_all
-    
-    count = clear_all()
+    count = await db_async.clear_all_signals()
     return {"status": "ok", "message": f"{count} sinyal silindi"}
 
 @app.post("/api/signals/clear_failed")
 async def clear_failed_signals(request: Request):
     """Başarısız sinyalleri sil"""
     require_admin(request)
-    from db import clear_failed_signals as clear_failed
-    
-    count = clear_failed()
+    count = await db_async.clear_failed_signals()
     return {"status": "ok", "message": f"{count} başarısız sinyal silindi"}
 
 @app.post("/api/signals/clear_by_coin")
@@ -555,11 +588,7 @@ async def clear_signals_by_coin(payload: dict, request: Request):
         raise HTTPException(status_code=400, detail="Coin parametresi gerekli")
     
     try:
-        from db_mongodb import get_db
-        db = get_db()
-        
-        result = db.signal_history.delete_many({"coin": coin.upper()})
-        count = result.deleted_count
+        count = await db_async.run_db(get_storage().delete, SIGNALS, {"coin": coin.upper()})
         
         logger.info(f"🗑️ {coin} için {count} sinyal silindi")
         return {"status": "ok", "message": f"{count} {coin} sinyali silindi", "count": count}
@@ -584,6 +613,7 @@ async def get_coin_latest(symbol: str):
         return {"error": "Coin bulunamadı veya henüz veri çekilmedi", "symbol": symbol}
     
     cache_entry = coin_data_cache[symbol]
+    snapshot = cache_entry.get("data")
     
     # Son çekme zamanından bu yana geçen süreyi hesapla
     last_fetch = cache_entry.get("last_fetch")
@@ -597,11 +627,24 @@ async def get_coin_latest(symbol: str):
     return {
         "symbol": symbol,
         "status": cache_entry.get("status", "unknown"),
-        "data": cache_entry.get("data", {}),
+        "data": snapshot.to_dict() if snapshot is not None else {},
         "last_fetch": last_fetch.isoformat() if last_fetch else None,
         "time_ago": time_ago
     }
 
+@app.get("/api/coin/{symbol}/history")
+async def get_coin_history(symbol: str, hours: float = 24, limit: int = 500):
+    """Grafik için fiyat serisi (uzun pencerelerde 5m/1h rollup katmanı)"""
+    try:
+        return {
+            "symbol": symbol.upper(),
+            "hours": hours,
+            **await db_async.run_db(get_price_series, symbol.upper(), hours=hours, limit=limit)
+        }
+    except Exception as e:
+        logger.error(f"Fiyat serisi hatası [{symbol}]: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/fetch-status")
 async def get_fetch_status():
     """Tüm coinlerin fetch durumunu döndür"""
@@ -622,10 +665,38 @@ async def get_fetch_status():
             "status": cache_entry.get("status", "unknown"),
             "last_fetch": last_fetch.isoformat() if last_fetch else None,
             "time_ago": time_ago,
-            "has_data": bool(cache_entry.get("data"))
+            "has_data": cache_entry.get("data") is not None,
+            "last_updated": cache_entry["data"].last_updated if cache_entry.get("data") is not None else None,
+            "skipped_ticks": cache_entry.get("skipped_ticks", 0)
         })
     
-    return {"coins": status_list, "total": len(status_list)}
+    return {"coins": status_list, "total": len(status_list), **fetch_stats}
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Performans metrikleri (CMC cache, retry/circuit breaker, batch quote, kredi bütçesi, scheduler)"""
+    from cmc_client import get_cmc_stats, get_cmc_request_stats
+    from quote_batcher import quote_batcher
+    
+    return {
+        "cmc_cache": get_cmc_stats(),
+        "cmc_requests": get_cmc_request_stats(),
+        "quote_batcher": dict(quote_batcher.stats),
+        "cmc_credits": credit_budget.get_status(),
+        "fetch_scheduler": fetch_scheduler.get_status() if fetch_scheduler else None,
+        "fetch_ticks": dict(fetch_stats),
+        "price_writer": price_writer.get_status(),
+        "price_ring": price_ring.get_status(),
+        "candles": candle_store.get_status(),
+        "price_archive": get_archive_status(),
+        "price_rollups": get_rollup_status(),
+        "historical_import": historical_importer.get_status(),
+        "indicators": indicator_engine.get_status(),
+        "indicator_batch": indicator_batch.get_status(),
+        "indicator_cache": indicator_cache.get_status(),
+        "db_pool": db_async.get_status(),
+        "loop_lag": loop_monitor.get_status()
+    }
 
 @app.post("/api/update-coin")
 async def update_coin_config(setting: CoinSetting, request: Request):
@@ -679,130 +750,149 @@ async def update_coin_config(setting: CoinSetting, request: Request):
         "coin": setting.dict()
     }
 
-async def fetch_coin_data_loop(symbol: str, interval_minutes: int):
-    """Belirli bir coin için fetch loop - her X dakikada bir çalışır"""
-    from cmc_client import CMCClient
-    import aiohttp
+async def fetch_coin_data(symbol: str) -> Optional[float]:
+    """
+    Belirli bir coin için tek fetch + analiz turu (scheduler tarafından çağrılır)
+
+    Returns:
+        Bir sonraki fetch'e kadar beklenecek dakika; None ise coin scheduler'dan çıkarılır
+    """
+    from cmc_client import get_cmc_client
+    from quote_batcher import quote_batcher
+    from credit_budget import get_adaptive_interval
     
+    # Config'den coin ayarlarını al (güncel status için)
     cfg = read_config()
-    API_KEY = cfg.get("cmc_api_key") or os.getenv("CMC_API_KEY")
+    coin_settings = cfg.get("coin_settings", [])
+    coin_config = next((cs for cs in coin_settings if cs["coin"] == symbol), None)
+    
+    if not coin_config:
+        # Config'de yoksa varsayılan değerler kullan
+        logger.debug(f"[{symbol}] Config'de bulunamadı, varsayılan ayarlar kullanılıyor")
+        coin_config = {"coin": symbol, "status": "active"}
+    
+    interval_minutes = coin_config.get("fetch_interval_minutes", 2)
+    
+    # Status kontrolü - passive ise scheduler'dan çıkar
+    status = coin_config.get("status", "active")
+    if status == "passive":
+        logger.info(f"⚫ [{symbol}] Passive oldu, scheduler'dan çıkarılıyor")
+        return None
     
+    API_KEY = cfg.get("cmc_api_key") or os.getenv("CMC_API_KEY")
     if not API_KEY:
         logger.error(f"[{symbol}] CMC API anahtarı bulunamadı!")
-        return
+        return interval_minutes
     
-    logger.info(f"🔄 [{symbol}] Fetch loop başlatıldı: {interval_minutes} dakikada bir")
-    
-    while True:
-        try:
-            # Config'den coin ayarlarını al (güncel status için)
-            cfg = read_config()
-            coin_settings = cfg.get("coin_settings", [])
-            coin_config = next((cs for cs in coin_settings if cs["coin"] == symbol), None)
+    try:
+        # Veri çek
+        session = get_session("cmc")
+        cmc = get_cmc_client(API_KEY)
+        # Aynı penceredeki diğer coinlerle tek CMC isteğinde çekilir
+        quote = await quote_batcher.get_quote(cmc, session, symbol)
+        
+        # Ham JSON bir kez parse edilir; cache ve analiz snapshot'ı kullanır
+        snapshot = parse_quote(quote, symbol)
+        if snapshot is None:
+            logger.error(f"❌ [{symbol}] Quote parse edilemedi")
+            return await get_adaptive_interval(symbol, interval_minutes, cfg)
             
-            if not coin_config:
-                # Config'de yoksa varsayılan değerler kullan
-                logger.debug(f"[{symbol}] Config'de bulunamadı, varsayılan ayarlar kullanılıyor")
-                coin_config = {"coin": symbol, "status": "active"}
+        fetch_stats["ticks"] += 1
+        previous = coin_data_cache.get(symbol)
+        
+        # CMC quote'u değişmediyse (last_updated aynı) kayıt, alarm ve analiz atlanır
+        if (previous is not None and snapshot.last_updated is not None
+                and previous["data"] is not None
+                and previous["data"].last_updated == snapshot.last_updated):
+            previous["last_fetch"] = datetime.now()
+            previous["status"] = status
+            await db_async.touch_snapshot(symbol, previous["last_fetch"])
+            previous["skipped_ticks"] = previous.get("skipped_ticks", 0) + 1
+            fetch_stats["skipped_unchanged"] += 1
+            logger.debug(f"⏭ [{symbol}] Quote değişmedi ({snapshot.last_updated}), tick atlandı")
+            return await get_adaptive_interval(symbol, interval_minutes, cfg)
             
-            # Status kontrolü - passive ise LOOP'U SONLANDIR
-            status = coin_config.get("status", "active")
-            if status == "passive":
-                logger.info(f"⚫ [{symbol}] Passive oldu, fetch loop sonlandırılıyor")
-                # Task'ı fetch_tasks'dan kaldır
-                if symbol in fetch_tasks:
-                    fetch_tasks.pop(symbol)
-                break  # Loop'tan çık, task bitsin
+        # Cache'e kaydet
+        coin_data_cache[symbol] = {
+            "data": snapshot,
+            "last_fetch": datetime.now(),
+            "status": status,
+            "skipped_ticks": previous.get("skipped_ticks", 0) if previous else 0
+        }
+        await db_async.save_snapshot(snapshot, coin_data_cache[symbol]["last_fetch"], status)
             
-            # Veri çek
-            async with aiohttp.ClientSession() as session:
-                cmc = CMCClient(API_KEY)
-                quote = await cmc.get_quote(session, symbol)
-                
-                # Cache'e kaydet
-                coin_data_cache[symbol] = {
-                    "data": quote,
-                    "last_fetch": datetime.now(),
-                    "status": status
-                }
-                
-                # Fiyat ve hacim bilgisini çıkar
-                try:
-                    q_data = quote["data"][symbol]["quote"]["USD"]
-                    current_price = q_data.get("price", 0)
-                    volume_24h = q_data.get("volume_24h", 0)
-                except (KeyError, TypeError) as e:
-                    logger.error(f"❌ [{symbol}] Fiyat çıkarma hatası: {e}")
-                    current_price = 0
-                    volume_24h = 0
-                
-                logger.info(f"✅ [{symbol}] Veri çekildi - Fiyat: ${current_price:.2f}")
-                
-                # Fiyat geçmişine kaydet (RSI/MACD için)
-                save_price_point(symbol, current_price, volume_24h)
-                
-                # Fiyat alarmlarını kontrol et
-                triggered_alarms = check_price_alarms(symbol, current_price)
-                if triggered_alarms:
-                    for alarm in triggered_alarms:
-                        target = alarm['target_price']
-                        signal_type = alarm.get('signal_type', 'UNKNOWN')
-                        alarm_type = alarm.get('alarm_type', 'target')
-                        
-                        # Alarm tipine göre mesaj
-                        if alarm_type == "tp":
-                            alarm_icon = "🎯"
-                            alarm_title = "TAKE PROFIT ALARMI!"
-                            alarm_detail = "✅ Hedef kar seviyesine ulaşıldı!"
-                        elif alarm_type == "sl":
-                            alarm_icon = "🛑"
-                            alarm_title = "STOP LOSS ALARMI!"
-                            alarm_detail = "⚠️ Zarar durdurma seviyesine ulaşıldı!"
-                        else:
-                            alarm_icon = "🔔"
-                            alarm_title = "FİYAT ALARMI!"
-                            alarm_detail = "✅ Hedef seviyeye ulaşıldı!"
-                        
-                        # Telegram bildirimi gönder
-                        alarm_msg = f"{alarm_icon} {alarm_title}\n\n"
-                        alarm_msg += f"💎 Coin: {symbol}\n"
-                        alarm_msg += f"🎯 Hedef Fiyat: ${target:.4f}\n"
-                        alarm_msg += f"💵 Güncel Fiyat: ${current_price:.4f}\n"
-                        alarm_msg += f"📊 Sinyal: {signal_type}\n"
-                        alarm_msg += f"{alarm_detail}\n"
-                        
-                        await send_telegram_message_async(alarm_msg)
-                        logger.info(f"🔔 [{symbol}] {alarm_type.upper()} alarm bildirimi gönderildi!")
-                
-                # 🆕 HEMEN ANALİZ YAP VE SİNYAL ÜRET
-                from analyzer import analyze_single_coin
-                signal_generated = await analyze_single_coin(symbol, quote)
+        current_price = snapshot.price or 0
+        volume_24h = snapshot.volume_24h or 0
+            
+        logger.info(f"✅ [{symbol}] Veri çekildi - Fiyat: ${current_price:.2f}")
+            
+        # Fiyat geçmişine kaydet (RSI/MACD için) - write-behind buffer ile toplu yazılır
+        await price_writer.add(symbol, current_price, volume_24h)
+            
+        # Fiyat alarmlarını kontrol et
+        triggered_alarms = await db_async.check_price_alarms(symbol, current_price)
+        if triggered_alarms:
+            for alarm in triggered_alarms:
+                target = alarm['target_price']
+                signal_type = alarm.get('signal_type', 'UNKNOWN')
+                alarm_type = alarm.get('alarm_type', 'target')
                 
-                if signal_generated:
-                    logger.info(f"🎯 [{symbol}] Sinyal üretildi ve gönderildi!")
+                # Alarm tipine göre mesaj
+                if alarm_type == "tp":
+                    alarm_icon = "🎯"
+                    alarm_title = "TAKE PROFIT ALARMI!"
+                    alarm_detail = "✅ Hedef kar seviyesine ulaşıldı!"
+                elif alarm_type == "sl":
+                    alarm_icon = "🛑"
+                    alarm_title = "STOP LOSS ALARMI!"
+                    alarm_detail = "⚠️ Zarar durdurma seviyesine ulaşıldı!"
                 else:
-                    logger.debug(f"📊 [{symbol}] Analiz tamamlandı, sinyal üretilmedi")
+                    alarm_icon = "🔔"
+                    alarm_title = "FİYAT ALARMI!"
+                    alarm_detail = "✅ Hedef seviyeye ulaşıldı!"
                 
-        except Exception as e:
-            logger.error(f"❌ [{symbol}] Veri çekme/analiz hatası: {e}")
-        
-        # Interval kadar bekle
-        await asyncio.sleep(interval_minutes * 60)
+                # Telegram bildirimi gönder
+                alarm_msg = f"{alarm_icon} {alarm_title}\n\n"
+                alarm_msg += f"💎 Coin: {symbol}\n"
+                alarm_msg += f"🎯 Hedef Fiyat: ${target:.4f}\n"
+                alarm_msg += f"💵 Güncel Fiyat: ${current_price:.4f}\n"
+                alarm_msg += f"📊 Sinyal: {signal_type}\n"
+                alarm_msg += f"{alarm_detail}\n"
+                
+                await send_telegram_message_async(alarm_msg)
+                logger.info(f"🔔 [{symbol}] {alarm_type.upper()} alarm bildirimi gönderildi!")
+            
+        # 🆕 HEMEN ANALİZ YAP VE SİNYAL ÜRET
+        from analyzer import analyze_single_coin
+        signal_generated = await analyze_single_coin(symbol, snapshot)
+            
+        if signal_generated:
+            logger.info(f"🎯 [{symbol}] Sinyal üretildi ve gönderildi!")
+        else:
+            logger.debug(f"📊 [{symbol}] Analiz tamamlandı, sinyal üretilmedi")
+            
+    except Exception as e:
+        logger.error(f"❌ [{symbol}] Veri çekme/analiz hatası: {e}")
+    
+    # Sonraki tur (volatilite ve kredi bütçesine göre ayarlanır)
+    return await get_adaptive_interval(symbol, interval_minutes, cfg)
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """Global fetch scheduler (ilk çağrıda config'e göre oluşturulur)"""
+    global fetch_scheduler
+    if fetch_scheduler is None:
+        cfg = read_config()
+        fetch_scheduler = FetchScheduler(
+            fetch_coin_data,
+            workers=int(cfg.get("scheduler_workers", cfg.get("max_concurrent_coins", 20))),
+            jitter_seconds=float(cfg.get("scheduler_jitter_seconds", 0.5)),
+            align_to_candles=bool(cfg.get("scheduler_align_to_candles", False))
+        )
+    return fetch_scheduler
 
 async def restart_coin_fetch_task(symbol: str):
-    """Belirli bir coin için fetch task'ını yeniden başlat"""
-    global fetch_tasks
-    
-    # Eski task'ı iptal et
-    if symbol in fetch_tasks:
-        old_task = fetch_tasks[symbol]
-        if not old_task.done():
-            old_task.cancel()
-            try:
-                await old_task
-            except asyncio.CancelledError:
-                pass
-        logger.info(f"🛑 [{symbol}] Eski fetch task iptal edildi")
+    """Belirli bir coin'i yeni ayarlarıyla hemen yeniden zamanla"""
+    scheduler = get_fetch_scheduler()
     
     # Yeni ayarları al
     cfg = read_config()
@@ -811,76 +901,97 @@ async def restart_coin_fetch_task(symbol: str):
     
     if not coin_config:
         logger.warning(f"[{symbol}] Config'de bulunamadı")
+        scheduler.remove(symbol)
         return
     
     interval_minutes = coin_config.get("fetch_interval_minutes", 2)
     status = coin_config.get("status", "active")
     
-    # Passive ise task başlatma
+    # Passive ise scheduler'dan çıkar
     if status == "passive":
-        logger.info(f"⚫ [{symbol}] Passive durumda, fetch task başlatılmadı")
+        if scheduler.remove(symbol):
+            logger.info(f"⚫ [{symbol}] Passive olduğu için scheduler'dan çıkarıldı")
         return
     
-    # Yeni task başlat
-    task = asyncio.create_task(fetch_coin_data_loop(symbol, interval_minutes))
-    fetch_tasks[symbol] = task
-    logger.info(f"🚀 [{symbol}] Yeni fetch task başlatıldı: {interval_minutes} dakika")
+    # Hemen çalışacak şekilde zamanla
+    scheduler.add(symbol, interval_minutes)
+    logger.info(f"🚀 [{symbol}] Fetch yeniden zamanlandı: {interval_minutes} dakika")
+
+def _initial_due(symbol: str, interval_minutes: float, cfg: dict) -> Optional[float]:
+    """
+    Scheduler'a ilk eklenen coin için çalışma zamanı
+
+    Warm-start cache'inde son fetch zamanı varsa coin kendi interval'i dolunca
+    çalışır; süresi geçmiş coinler restart sonrası aynı anda değil,
+    warm_start_spread_seconds penceresine dağıtılarak çekilir.
+    """
+    entry = coin_data_cache.get(symbol)
+    last_fetch = entry.get("last_fetch") if entry else None
+    if not last_fetch:
+        return None
+    now = time.time()
+    spread = float(cfg.get("warm_start_spread_seconds", 10))
+    due = last_fetch.timestamp() + interval_minutes * 60
+    return max(due, now + random.uniform(0, spread))
 
 async def restart_all_fetch_tasks():
-    """Tüm coin'ler için fetch task'larını yeniden başlat (sadece active olanlar)"""
+    """
+    Scheduler'ı config ile senkronize et
+
+    Yeni coinler hemen zamanlanır, passive/silinen coinler çıkarılır,
+    interval'i değişen coinler son çalışmalarına göre yeniden zamanlanır;
+    diğer coinlerin sırası bozulmaz.
+    """
+    scheduler = get_fetch_scheduler()
     cfg = read_config()
     coin_settings = cfg.get("coin_settings", [])
     
-    logger.info(f"🔄 Tüm fetch task'ları yeniden başlatılıyor ({len(coin_settings)} coin)...")
+    logger.info(f"🔄 Fetch scheduler senkronize ediliyor ({len(coin_settings)} coin)...")
     
+    wanted = {}
     for coin_config in coin_settings:
-        symbol = coin_config["coin"]
-        status = coin_config.get("status", "active")
-        
-        # Passive olanları restart etme!
-        if status == "passive":
-            # Eğer çalışan task varsa durdur
-            if symbol in fetch_tasks:
-                fetch_tasks[symbol].cancel()
-                fetch_tasks.pop(symbol)
-                logger.info(f"⚫ [{symbol}] Passive olduğu için task durduruldu")
+        if coin_config.get("status", "active") == "passive":
             continue
-        
-        # Active olanları restart et
-        await restart_coin_fetch_task(symbol)
+        wanted[coin_config["coin"]] = coin_config.get("fetch_interval_minutes", 2)
     
-    logger.info("✅ Tüm fetch task'ları yenilendi")
-
-async def start_all_fetch_tasks():
-    """Uygulama başlangıcında tüm fetch task'larını başlat"""
-    cfg = read_config()
-    coin_settings = cfg.get("coin_settings", [])
-    
-    logger.info(f"🚀 Fetch task'ları başlatılıyor ({len(coin_settings)} coin)...")
+    for symbol in scheduler.symbols():
+        if symbol not in wanted:
+            scheduler.remove(symbol)
+            logger.info(f"⚫ [{symbol}] Scheduler'dan çıkarıldı")
     
-    for coin_config in coin_settings:
-        symbol = coin_config["coin"]
-        interval_minutes = coin_config.get("fetch_interval_minutes", 2)
-        status = coin_config.get("status", "active")
-        
-        # Passive olanları atla
-        if status == "passive":
-            logger.info(f"⚫ [{symbol}] Passive durumda, atlandı")
-            continue
-        
-        # Task başlat
-        task = asyncio.create_task(fetch_coin_data_loop(symbol, interval_minutes))
-        fetch_tasks[symbol] = task
-        logger.info(f"🟢 [{symbol}] Fetch task başlatıldı: {interval_minutes} dakika")
+    for symbol, interval_minutes in wanted.items():
+        if symbol not in scheduler:
+            scheduler.add(symbol, interval_minutes, _initial_due(symbol, interval_minutes, cfg))
+            logger.info(f"🟢 [{symbol}] Scheduler'a eklendi: {interval_minutes} dakika")
+        elif scheduler.get_interval(symbol) != interval_minutes:
+            scheduler.reschedule(symbol, interval_minutes)
+            logger.info(f"🔁 [{symbol}] Interval güncellendi: {interval_minutes} dakika")
     
-    logger.info("✅ Tüm fetch task'ları başlatıldı")
+    logger.info("✅ Fetch scheduler güncellendi")
+
+async def start_all_fetch_tasks():
+    """Uygulama başlangıcında tüm coinleri zamanla ve scheduler'ı başlat"""
+    await restart_all_fetch_tasks()
+    get_fetch_scheduler().start()
+    logger.info("✅ Fetch scheduler başlatıldı")
 
 
 # ==================== YENİ API ENDPOINTS ====================
 
+@app.get("/api/indicators")
+async def get_indicator_registry():
+    """Hesaplanabilen göstergeler (registry)"""
+    return {"indicators": list_indicators()}
+
+
 @app.get("/api/indicators/{symbol}")
-async def get_indicators(symbol: str):
-    """Coin için RSI ve MACD göstergelerini döndür"""
+async def get_indicators(symbol: str, indicators: Optional[str] = None):
+    """
+    Coin için göstergeleri döndür
+
+    indicators: Virgülle ayrılmış gösterge listesi (örn. "rsi,macd,bollinger");
+    verilmezse coin/global config'teki seçim (yoksa varsayılanlar)
+    """
     symbol = symbol.upper()
     
     try:
@@ -897,27 +1008,29 @@ async def get_indicators(symbol: str):
                 "indicators": None
             }
         
-        # Son 50 fiyat noktasını al
-        prices = get_recent_prices(symbol, count=50)
+        if indicators:
+            names = [name.strip().lower() for name in indicators.split(",") if name.strip()]
+        else:
+            names = select_indicators(coin_config if cfg.get("use_coin_specific_settings", False) else None, cfg)
+        
+        # Son 50 fiyat noktasının göstergeleri (yeni fiyat gelmediyse cache'ten, analyzer ile ortak)
+        indicators, data_points = await recent_indicators(symbol, count=50, names=names)
         
-        if len(prices) < 26:
+        if data_points < 26:
             return {
                 "error": "Yeterli veri yok (minimum 26 veri noktası gerekli)",
                 "symbol": symbol,
-                "data_points": len(prices)
+                "data_points": data_points
             }
         
-        # Göstergeleri hesapla
-        indicators = calculate_indicators(prices)
-        
         # Fiyat istatistikleri
-        stats = get_price_statistics(symbol, hours=24)
+        stats = await price_statistics(symbol, hours=24)
         
         return {
             "symbol": symbol,
             "indicators": indicators,
             "price_stats": stats,
-            "data_points": len(prices)
+            "data_points": data_points
         }
     
     except Exception as e:
@@ -925,12 +1038,43 @@ async def get_indicators(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/scanner")
+async def scan_indicators(interval: Optional[str] = None, direction: Optional[str] = None,
+                          min_score: float = 0, limit: int = 100):
+    """
+    Aktif coinlerin göstergelerini tek vektörize geçişte hesapla ve signal strength'e göre sırala
+    
+    Args:
+        interval: Candle interval'i (verilmezse son 50 ham fiyat)
+        direction: BULLISH / BEARISH / NEUTRAL filtresi
+        min_score: Minimum signal strength skoru
+        limit: Döndürülecek coin sayısı
+    """
+    try:
+        cfg = read_config()
+        coins = [cs["coin"] for cs in cfg.get("coin_settings", []) if cs.get("status", "active") != "passive"]
+        records = await db_async.run_db(indicator_batch.scan_coins, coins, interval)
+        records = indicator_batch.rank(records, direction=direction, min_score=min_score, limit=limit)
+        
+        return {
+            "interval": interval,
+            "scanned": len(coins),
+            "count": len(records),
+            "duration_ms": indicator_batch.stats["last_ms"],
+            "results": [indicator_batch.to_dict(r) for r in records]
+        }
+    
+    except Exception as e:
+        logger.error(f"Scanner hatası: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/alarms")
 async def get_alarms_endpoint(coin: Optional[str] = None):
     """Aktif fiyat alarmlarını getir"""
     try:
-        alarms = get_active_alarms(coin=coin.upper() if coin else None)
-        stats = get_alarm_statistics()
+        alarms = await db_async.get_active_alarms(coin=coin.upper() if coin else None)
+        stats = await db_async.get_alarm_statistics()
         cfg = read_config()
         
         return {
@@ -974,7 +1118,7 @@ async def delete_alarm_endpoint(alarm_id: str, request: Request):
     require_admin(request)
     
     try:
-        success = delete_alarm(alarm_id)
+        success = await db_async.delete_alarm(alarm_id)
         
         if success:
             return {"status": "ok", "message": "Alarm silindi"}
@@ -992,7 +1136,7 @@ async def delete_alarm_endpoint(alarm_id: str, request: Request):
 async def get_manual_prices_endpoint():
     """Manuel fiyat override'larını getir"""
     try:
-        overrides = get_all_manual_prices()
+        overrides = await db_async.get_all_manual_prices()
         return {"manual_prices": overrides}
     except Exception as e:
         logger.error(f"Manuel fiyatlar hatası: {e}")
@@ -1008,7 +1152,7 @@ async def set_manual_price_endpoint(request: Request, coin: str, price: float):
         if price <= 0:
             raise HTTPException(status_code=400, detail="Fiyat pozitif olmalı")
         
-        success = set_manual_price(coin.upper(), price, source="user_override")
+        success = await db_async.set_manual_price(coin.upper(), price, source="user_override")
         
         if success:
             return {"status": "ok", "message": f"{coin} için manuel fiyat belirlendi: ${price}"}
@@ -1028,7 +1172,7 @@ async def remove_manual_price_endpoint(coin: str, request: Request):
     require_admin(request)
     
     try:
-        success = remove_manual_price(coin.upper())
+        success = await db_async.remove_manual_price(coin.upper())
         
         if success:
             return {"status": "ok", "message": f"{coin} manuel fiyatı kaldırıldı"}
@@ -1086,127 +1230,38 @@ async def toggle_feature_flag(request: Request):
 @app.post("/api/historical/import")
 async def import_historical_data(request: Request):
     """
-    Coinler için geçmiş veri çek ve MongoDB'ye kaydet
+    Coinler için geçmiş veri import job'ı başlat (arka planda çalışır)
     
     Request body: {
         "coins": ["BTC", "ETH", "SOL"],
         "days": 30,  # Kaç günlük veri (default: 30)
         "interval": "1h"  # 1h, 4h, 24h (default: 1h)
     }
+    
+    İlerleme: GET /api/historical/import/{job_id}
     """
     require_admin(request)
     
     try:
-        from datetime import datetime, timedelta, timezone
-        from db_mongodb import get_db
-        import aiohttp
-        from cmc_client import CMCClient
-        
         data = await request.json()
-        coins = data.get("coins", [])
-        days = data.get("days", 30)
+        coins = [c.upper() for c in data.get("coins", [])]
+        days = int(data.get("days", 30))
         interval = data.get("interval", "1h")
         
         if not coins:
             raise HTTPException(status_code=400, detail="Coin listesi gerekli")
         
-        # CoinMarketCap client
+        # CoinMarketCap API key
         cmc_api_key = os.environ.get("CMC_API_KEY")
         if not cmc_api_key:
             raise HTTPException(status_code=500, detail="CMC_API_KEY bulunamadı")
         
-        cmc_client = CMCClient(cmc_api_key)
-        db = get_db()
-        
-        # Tarih aralığı
-        time_end = datetime.now(timezone.utc)
-        time_start = time_end - timedelta(days=days)
-        
-        results = {}
-        
-        async with aiohttp.ClientSession() as session:
-            for coin in coins:
-                try:
-                    logger.info(f"📥 [{coin}] Geçmiş veri çekiliyor ({days} gün)...")
-                    
-                    # Historical data çek
-                    hist_data = await cmc_client.get_historical_quotes(
-                        session, 
-                        coin, 
-                        time_start.isoformat(),
-                        time_end.isoformat(),
-                        interval
-                    )
-                    
-                    # Parse ve kaydet
-                    imported = 0
-                    skipped = 0
-                    
-                    if "data" in hist_data and "quotes" in hist_data["data"]:
-                        quotes = hist_data["data"]["quotes"]
-                        
-                        for quote in quotes:
-                            timestamp_str = quote.get("timestamp")
-                            if not timestamp_str:
-                                continue
-                            
-                            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                            
-                            usd_quote = quote.get("quote", {}).get("USD", {})
-                            price = usd_quote.get("price", 0)
-                            volume_24h = usd_quote.get("volume_24h", 0)
-                            
-                            if price <= 0:
-                                continue
-                            
-                            # Zaten var mı?
-                            existing = db.price_history.find_one({
-                                "coin": coin,
-                                "timestamp": timestamp
-                            })
-                            
-                            if existing:
-                                skipped += 1
-                                continue
-                            
-                            # Kaydet
-                            price_point = {
-                                "coin": coin,
-                                "price": price,
-                                "volume_24h": volume_24h,
-                                "timestamp": timestamp,
-                                "source": "historical_import"
-                            }
-                            
-                            db.price_history.insert_one(price_point)
-                            imported += 1
-                        
-                        results[coin] = {
-                            "status": "success",
-                            "imported": imported,
-                            "skipped": skipped,
-                            "total": len(quotes)
-                        }
-                        
-                        logger.info(f"✅ [{coin}] {imported} yeni kayıt eklendi, {skipped} atlandı")
-                    
-                    else:
-                        results[coin] = {
-                            "status": "error",
-                            "message": "Veri bulunamadı (API limiti olabilir)"
-                        }
-                        logger.warning(f"⚠️ [{coin}] Geçmiş veri bulunamadı")
-                
-                except Exception as e:
-                    results[coin] = {
-                        "status": "error",
-                        "message": str(e)
-                    }
-                    logger.error(f"❌ [{coin}] Geçmiş veri hatası: {e}")
+        job = historical_importer.start(coins, days, interval, cmc_api_key)
         
         return {
-            "status": "completed",
-            "results": results,
+            "status": "started",
+            "job_id": job["id"],
+            "job": job,
             "timeframe": f"{days} days",
             "interval": interval
         }
@@ -1218,6 +1273,21 @@ async def import_historical_data(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/historical/import/{job_id}")
+async def get_historical_import_job(job_id: str):
+    """Import job'ının durumu ve coin bazlı ilerlemesi"""
+    job = historical_importer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job'ı bulunamadı")
+    return job
+
+
+@app.get("/api/historical/jobs")
+async def list_historical_import_jobs():
+    """Son import job'ları (en yeni önce)"""
+    return {"jobs": historical_importer.list_jobs()}
+
+
 @app.get("/api/signals/export")
 async def export_signals(type: str = "all", request: Request = None):
     """
@@ -1227,9 +1297,6 @@ async def export_signals(type: str = "all", request: Request = None):
     - type: "all" (tüm sinyaller), "hit_tp" (başarılı), "hit_sl" (başarısız), "active" (aktif)
     """
     try:
-        from db_mongodb import get_db
-        db = get_db()
-        
         # Filtre oluştur
         query = {}
         if type == "hit_tp":
@@ -1243,12 +1310,9 @@ async def export_signals(type: str = "all", request: Request = None):
         # type == "all" için filtre yok
         
         # Sinyalleri çek
-        signals = list(db.signal_history.find(query).sort("created_at", -1))
+        signals = await db_async.run_db(get_storage().find, SIGNALS, query, sort=[("created_at", -1)])
         
-        # MongoDB ObjectId'leri string'e çevir
         for signal in signals:
-            if "_id" in signal:
-                signal["_id"] = str(signal["_id"])
             # Timestamp'leri ISO formatına çevir
             for field in ["created_at", "timestamp", "signal_timestamp"]:
                 if field in signal and signal[field]:
@@ -1290,8 +1354,7 @@ async def import_signals(request: Request):
     require_admin(request)
     
     try:
-        from db_mongodb import get_db
-        db = get_db()
+        storage = get_storage()
         
         data = await request.json()
         signals = data.get("signals", [])
@@ -1305,9 +1368,9 @@ async def import_signals(request: Request):
         
         for signal in signals:
             try:
-                # _id varsa kaldır (MongoDB yeni ID oluşturacak)
-                if "_id" in signal:
-                    del signal["_id"]
+                # _id/id varsa kaldır (veritabanı yeni ID oluşturacak)
+                signal.pop("_id", None)
+                signal.pop("id", None)
                 
                 # Timestamp'leri datetime'a çevir
                 for field in ["created_at", "timestamp", "signal_timestamp"]:
@@ -1318,7 +1381,7 @@ async def import_signals(request: Request):
                             pass
                 
                 # Aynı sinyal var mı kontrol et (coin + timestamp + signal_type)
-                existing = db.signal_history.find_one({
+                existing = await db_async.run_db(storage.find_one, SIGNALS, {
                     "coin": signal.get("coin"),
                     "signal_timestamp": signal.get("signal_timestamp"),
                     "signal_type": signal.get("signal_type")
@@ -1329,7 +1392,7 @@ async def import_signals(request: Request):
                     continue
                 
                 # Yeni sinyal ekle
-                db.signal_history.insert_one(signal)
+                await db_async.run_db(storage.insert, SIGNALS, signal)
                 imported_count += 1
                 
             except Exception as e:
@@ -1362,9 +1425,6 @@ async def bulk_delete_signals(request: Request, status: Optional[str] = None):
     require_admin(request)
     
     try:
-        from db_mongodb import get_db
-        db = get_db()
-        
         # Filtre oluştur
         if not status:
             raise HTTPException(status_code=400, detail="Status parametresi gerekli")
@@ -1376,11 +1436,11 @@ async def bulk_delete_signals(request: Request, status: Optional[str] = None):
         query = {"signal_status": {"$in": status_list}}
         
         # Sil
-        result = db.signal_history.delete_many(query)
+        deleted_count = await db_async.run_db(get_storage().delete, SIGNALS, query)
         
         return {
             "status": "ok",
-            "deleted_count": result.deleted_count,
+            "deleted_count": deleted_count,
             "filter": status_list
         }
     
@@ -1398,11 +1458,8 @@ async def bulk_delete_signals(request: Request, status: Optional[str] = None):
 async def get_signals_chart(days: int = 7, coin: Optional[str] = None):
     """Signal geçmişi grafik verileri"""
     try:
-        from db_mongodb import get_db
         from datetime import datetime, timezone, timedelta
         
-        db = get_db()
-        
         # Zaman aralığı
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
         
@@ -1411,8 +1468,7 @@ async def get_signals_chart(days: int = 7, coin: Optional[str] = None):
             query["coin"] = coin.upper()
         
         # Sinyalleri al (signal_history collection kullan)
-        signals_cursor = db.signal_history.find(query).sort("created_at", 1).limit(1000)
-        signals = list(signals_cursor)
+        signals = await db_async.run_db(get_storage().find, SIGNALS, query, sort=[("created_at", 1)], limit=1000)
         
         # Coin bazında gruplama
         by_coin = {}
@@ -1470,26 +1526,57 @@ async def get_signals_chart(days: int = 7, coin: Optional[str] = None):
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başlangıcında çalışacak"""
-    global fetch_tasks
-    
-    # ÖNEMLİ: Eski fetch task'larını iptal et (reload durumunda)
-    if fetch_tasks:
-        logger.warning(f"⚠️ {len(fetch_tasks)} eski fetch task bulundu, iptal ediliyor...")
-        for symbol, task in list(fetch_tasks.items()):
-            if not task.done():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-                logger.info(f"🛑 [{symbol}] Eski task iptal edildi")
-        fetch_tasks.clear()
-        logger.info("✅ Tüm eski task'lar temizlendi")
+    global fetch_scheduler, archiver_task, rollup_task, indicator_task, credit_task
+    
+    # ÖNEMLİ: Eski scheduler'ı durdur (reload durumunda)
+    if fetch_scheduler is not None:
+        logger.warning("⚠️ Eski fetch scheduler bulundu, durduruluyor...")
+        await fetch_scheduler.stop()
+        fetch_scheduler = None
     
     logger.info("Veritabanı başlatılıyor...")
     init_db()
     logger.info("✅ Veritabanı hazır")
     
+    # Event loop bloklanmalarını ölç (GET /api/metrics → loop_lag)
+    loop_monitor.start()
+    
+    # Paylaşılan HTTP bağlantı havuzu (CMC, Telegram, fiyat doğrulama)
+    await init_sessions()
+    
+    # Fiyat noktaları için write-behind buffer
+    price_writer.start()
+    
+    # CMC kredi kullanımı: restart öncesi harcama yüklenir, sayaçlar toplu yazılır
+    await db_async.run_db(credit_budget.load)
+    if credit_task is None or credit_task.done():
+        credit_task = asyncio.create_task(credit_budget.run_flusher())
+    
+    # Son snapshot'ları yükle (fetch-status boş kalmaz, ilk fetch'ler dağıtılır)
+    coin_data_cache.update(await db_async.run_db(load_snapshots))
+    
+    # Aktif coinlerin son fiyatlarını belleğe al (analiz okumaları DB'ye gitmez)
+    active_coins = [cs["coin"] for cs in read_config().get("coin_settings", []) if cs.get("status", "active") != "passive"]
+    await db_async.run_db(price_ring.hydrate, active_coins)
+    # Candle serileri de havuzda yüklenir (ilk update/okuma event loop'ta DB'ye gitmez)
+    await db_async.run_db(candle_store.hydrate, active_coins)
+    
+    # Streaming gösterge durumları (restart sonrası tam replay gerekmez)
+    await indicator_engine.load()
+    if indicator_task is None or indicator_task.done():
+        indicator_task = asyncio.create_task(indicator_engine.run_persister())
+    
+    # Eski fiyat geçmişini kolon bazlı dosya arşivine taşı (FEATURE_ENABLE_PRICE_ARCHIVE)
+    if archiver_task is None or archiver_task.done():
+        archiver_task = asyncio.create_task(run_archiver())
+    
+    # Ham tick'leri 5m/1h katmanlarına topla ve katman retention'larını uygula (FEATURE_ENABLE_PRICE_ROLLUPS)
+    if rollup_task is None or rollup_task.done():
+        rollup_task = asyncio.create_task(run_compactor())
+    
+    # Restart öncesi yarım kalan geçmiş veri import job'larına checkpoint'ten devam et
+    historical_importer.resume_pending(os.environ.get("CMC_API_KEY"))
+    
     # Eski sinyalleri temizle
     # TODO: cleanup_scheduler MongoDB'ye uyarlanacak
     # from cleanup_scheduler import start_scheduler as start_cleanup
@@ -1518,9 +1605,38 @@ async def startup_event():
     logger.info("⚠️ Interval-based analyzer devre dışı - Coin-based fetch aktif")
     
     # ✅ Coin-bazlı fetch task'larını başlat - TEK KAYNAK SISTEM
-    logger.info("🔄 Coin-bazlı fetch task'ları başlatılıyor (TEK KAYNAK)...")
+    logger.info("🔄 Coin-bazlı fetch scheduler başlatılıyor (TEK KAYNAK)...")
     await start_all_fetch_tasks()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Uygulama kapanırken çalışacak"""
+    if fetch_scheduler is not None:
+        await fetch_scheduler.stop()
+    
+    if archiver_task is not None:
+        archiver_task.cancel()
+    
+    if rollup_task is not None:
+        rollup_task.cancel()
+    
+    if indicator_task is not None:
+        indicator_task.cancel()
+    await indicator_engine.save()
+    
+    if credit_task is not None:
+        credit_task.cancel()
+    await credit_budget.flush()
+    
+    # Import job'ları durur, checkpoint'ler sonraki açılışta kullanılır
+    await historical_importer.stop()
+    
+    # Buffer'da kalan fiyat noktalarını yaz
+    await price_writer.stop()
+    
+    await close_sessions()
+    await loop_monitor.stop()
+
 async def run_analyzer_loop():
     """Background analyzer loop"""
     from analyzer import run_loop
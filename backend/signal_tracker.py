@@ -6,8 +6,8 @@ TP/SL kontrolü ve status güncelleme
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
-from db_mongodb import get_db
+from typing import Dict
+from storage import SIGNALS, get_storage
 from data_sync import get_latest_coin_data
 
 logger = logging.getLogger(__name__)
@@ -104,12 +104,12 @@ def update_all_signals() -> Dict[str, int]:
     Returns:
         Stats: {updated: int, hit_tp: int, hit_sl: int, expired: int}
     """
-    db = get_db()
+    storage = get_storage()
     
     # Sadece aktif sinyalleri getir
-    active_signals = list(db.signal_history.find({
+    active_signals = storage.find(SIGNALS, {
         "signal_status": "active"
-    }))
+    })
     
     stats = {
         "checked": len(active_signals),
@@ -123,16 +123,13 @@ def update_all_signals() -> Dict[str, int]:
         updated_signal = check_signal_status(signal)
         
         if updated_signal:
-            # MongoDB'de güncelle
-            result = db.signal_history.update_one(
-                {"_id": signal["_id"]},
-                {"$set": {
-                    "signal_status": updated_signal["signal_status"],
-                    "profit_loss_percent": updated_signal["profit_loss_percent"]
-                }}
-            )
+            # Veritabanında güncelle
+            modified = storage.update(SIGNALS, signal["id"], {
+                "signal_status": updated_signal["signal_status"],
+                "profit_loss_percent": updated_signal["profit_loss_percent"]
+            })
             
-            if result.modified_count > 0:
+            if modified:
                 stats["updated"] += 1
                 
                 if updated_signal["signal_status"] == "hit_tp":
@@ -151,23 +148,22 @@ def get_signal_statistics() -> Dict:
     """
     Sinyal istatistiklerini getir
     """
-    db = get_db()
+    storage = get_storage()
     
-    total = db.signal_history.count_documents({})
-    active = db.signal_history.count_documents({"signal_status": "active"})
-    hit_tp = db.signal_history.count_documents({"signal_status": "hit_tp"})
-    hit_sl = db.signal_history.count_documents({"signal_status": "hit_sl"})
-    expired = db.signal_history.count_documents({"signal_status": "expired"})
+    total = storage.count(SIGNALS)
+    active = storage.count(SIGNALS, {"signal_status": "active"})
+    hit_tp = storage.count(SIGNALS, {"signal_status": "hit_tp"})
+    hit_sl = storage.count(SIGNALS, {"signal_status": "hit_sl"})
+    expired = storage.count(SIGNALS, {"signal_status": "expired"})
     
     # Win rate hesapla
     closed_signals = hit_tp + hit_sl
     win_rate = (hit_tp / closed_signals * 100) if closed_signals > 0 else 0
     
     # Ortalama kar/zarar
-    closed_results = list(db.signal_history.find({
-        "signal_status": {"$in": ["hit_tp", "hit_sl"]},
-        "profit_loss_percent": {"$exists": True}
-    }))
+    closed_results = [s for s in storage.find(SIGNALS, {
+        "signal_status": {"$in": ["hit_tp", "hit_sl"]}
+    }) if "profit_loss_percent" in s]
     
     avg_profit = sum(s.get("profit_loss_percent", 0) for s in closed_results) / len(closed_results) if closed_results else 0
     
@@ -0,0 +1,553 @@
+# backend/storage.py
+"""
+Değiştirilebilir depolama katmanı
+Sinyaller, fiyat geçmişi, fiyat alarmları, manuel fiyatlar, candle'lar,
+quote snapshot'ları ve CMC kredi kullanımı bu arayüz üzerinden okunur/yazılır. Backend STORAGE_BACKEND ile seçilir:
+
+    mongo  - MongoDB (varsayılan, db_mongodb.get_db)
+    sqlite - Gömülü SQLite (WAL), MongoDB sunucusu gerektirmez (storage_sqlite.py)
+
+Doküman koleksiyonlarında (SIGNALS, ALARMS) sorgular MongoDB söz diziminin
+küçük bir alt kümesiyle yazılır; her backend bunu kendi diline çevirir:
+    {"coin": "BTC"}                       eşitlik (None: alan yok/null)
+    {"coin": {"$in": [...]}}              liste
+    {"reward": {"$ne": None}}             eşit değil
+    {"created_at": {"$gte": dt, "$lt": dt}}  karşılaştırma ($gt, $gte, $lt, $lte)
+    {"id": "..."}                         doküman ID'si (string)
+Dönen dokümanlarda "id" ve "_id" string ID'dir.
+"""
+import os
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+
+SIGNALS = "signals"
+ALARMS = "alarms"
+
+Sort = Sequence[Tuple[str, int]]
+
+
+class StorageBackend(ABC):
+    """Depolama arayüzü (MongoStorage, SQLiteStorage); eksik metodu olan backend oluşturulamaz"""
+
+    name = ""
+
+    @abstractmethod
+    def init(self):
+        """Tablo/collection ve indexleri oluştur"""
+
+    # ---- Doküman koleksiyonları (SIGNALS, ALARMS) ----
+
+    @abstractmethod
+    def insert(self, kind: str, doc: dict) -> str:
+        """Doküman ekle; yeni doküman ID'si"""
+
+    @abstractmethod
+    def find(self, kind: str, query: dict = None, sort: Sort = None, limit: int = None) -> List[dict]:
+        """Sorguya uyan dokümanlar"""
+
+    def find_one(self, kind: str, query: dict, sort: Sort = None) -> Optional[dict]:
+        docs = self.find(kind, query, sort=sort, limit=1)
+        return docs[0] if docs else None
+
+    @abstractmethod
+    def update(self, kind: str, doc_id: str, fields: dict) -> bool:
+        """Tek dokümanın alanlarını güncelle ($set); değişiklik olduysa True"""
+
+    @abstractmethod
+    def delete(self, kind: str, query: dict = None) -> int:
+        """Sorguya uyan dokümanları sil (query yoksa hepsi); silinen sayısı"""
+
+    @abstractmethod
+    def count(self, kind: str, query: dict = None) -> int:
+        """Sorguya uyan doküman sayısı (sunucu tarafında)"""
+
+    @abstractmethod
+    def group_count(self, kind: str, fields: Sequence[str], query: dict = None,
+                    true_field: str = None) -> List[dict]:
+        """
+        Alan değerlerine göre gruplanmış doküman sayıları (sunucu tarafında)
+
+        Args:
+            fields: Gruplama alanları
+            true_field: Verilirse gruptaki bu alanı True olan doküman sayısı da döner
+
+        Returns:
+            [{<alan>: değer, ..., "count": int, "true_count": int (true_field verildiyse)}, ...]
+        """
+
+    @abstractmethod
+    def signal_stats(self) -> dict:
+        """
+        Dashboard için sinyal özetleri
+
+        Returns:
+            {"total", "successful", "failed", "pending", "max_gain", "max_loss", "avg_reward",
+             "top_profitable": [doc, ...], "coin_performance": [{"coin", "total_signals", "successful"}, ...]}
+        """
+
+    # ---- Fiyat geçmişi ----
+
+    @abstractmethod
+    def insert_prices(self, records: List[dict]) -> int:
+        """[{"coin", "price", "volume_24h", "timestamp"}, ...] toplu ekle; yazılan kayıt sayısı"""
+
+    @abstractmethod
+    def upsert_prices(self, records: List[dict]) -> int:
+        """insert_prices gibi, ancak (coin, timestamp) zaten varsa atlanır (idempotent); yeni eklenen kayıt sayısı"""
+
+    @abstractmethod
+    def find_prices(self, coin: str, since: datetime = None, until: datetime = None,
+                    limit: int = None, newest_first: bool = False) -> List[dict]:
+        """[since, until) aralığındaki noktalar: [{"price", "timestamp", "volume_24h"}, ...] (naive UTC)"""
+
+    @abstractmethod
+    def count_prices(self, coin: str) -> int:
+        """Coin'in fiyat noktası sayısı"""
+
+    @abstractmethod
+    def price_coins(self, until: datetime = None) -> List[str]:
+        """until'den eski kaydı olan coinler"""
+
+    @abstractmethod
+    def delete_prices(self, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        """[since, until) aralığındaki noktaları sil; silinen sayısı"""
+
+    # ---- Fiyat rollup katmanları (price_rollup.py) ----
+
+    @abstractmethod
+    def upsert_rollups(self, tier: str, records: List[dict]) -> int:
+        """[{"coin", "start", "open", "high", "low", "close", "volume_24h", "ticks"}, ...] yaz (aynı bucket üzerine yazılır)"""
+
+    @abstractmethod
+    def find_rollups(self, tier: str, coin: str, since: datetime = None, until: datetime = None,
+                     limit: int = None, newest_first: bool = False) -> List[dict]:
+        """[since, until) aralığındaki bucket'lar (start: naive UTC)"""
+
+    @abstractmethod
+    def delete_rollups(self, tier: str, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        """[since, until) aralığındaki bucket'ları sil; silinen sayısı"""
+
+    # ---- Manuel fiyatlar ----
+
+    @abstractmethod
+    def set_manual_price(self, coin: str, price: float, source: str):
+        """Coin için manuel fiyatı yaz (varsa üzerine)"""
+
+    @abstractmethod
+    def get_manual_price(self, coin: str) -> Optional[dict]:
+        """Coin'in manuel fiyatı veya None"""
+
+    @abstractmethod
+    def delete_manual_price(self, coin: str) -> bool:
+        """Manuel fiyatı sil; silindiyse True"""
+
+    @abstractmethod
+    def all_manual_prices(self) -> List[dict]:
+        """Tüm manuel fiyatlar"""
+
+    # ---- CMC kredi kullanımı (credit_budget.py) ----
+
+    @abstractmethod
+    def add_credit_usage(self, counts: Dict[str, Dict[str, int]]):
+        """Günlük sayaçlara ekle: {"YYYY-MM-DD": {"credits": int, "calls": int}, ...}"""
+
+    @abstractmethod
+    def get_credit_usage(self, month: str) -> Dict[str, int]:
+        """Ayın ("YYYY-MM") günlük kredi harcamaları: {"YYYY-MM-DD": credits}"""
+
+    # ---- Candle'lar (candle_store.py) ----
+
+    @abstractmethod
+    def upsert_candles(self, candles: List[dict]) -> int:
+        """[{"coin", "interval", "start", "open", "high", "low", "close", "volume_24h", "ticks"}, ...] yaz (aynı candle üzerine yazılır)"""
+
+    @abstractmethod
+    def find_candles(self, coin: str, interval: str, since: datetime) -> List[dict]:
+        """since'ten itibaren candle'lar, eskiden yeniye (start: naive UTC)"""
+
+    # ---- Quote snapshot'ları (quote_snapshot.py) ----
+
+    @abstractmethod
+    def set_snapshot(self, symbol: str, fields: dict):
+        """Coin'in snapshot'ını yaz (QuoteSnapshot.to_dict alanları + "last_fetch", "status")"""
+
+    @abstractmethod
+    def touch_snapshot(self, symbol: str, last_fetch: datetime):
+        """Snapshot'ın sadece son çekme zamanını güncelle"""
+
+    @abstractmethod
+    def all_snapshots(self) -> List[dict]:
+        """Kayıtlı snapshot'lar (set_snapshot alanları, last_fetch: naive UTC)"""
+
+
+class MongoStorage(StorageBackend):
+    """MongoDB backend"""
+
+    name = "mongo"
+    collections = {SIGNALS: "signal_history", ALARMS: "price_alarms"}
+
+    @property
+    def db(self):
+        from db_mongodb import get_db
+        return get_db()
+
+    def _collection(self, kind: str):
+        return self.db[self.collections[kind]]
+
+    @staticmethod
+    def _object_id(value):
+        from bson.objectid import ObjectId
+        if isinstance(value, ObjectId):
+            return value
+        return ObjectId(value) if ObjectId.is_valid(value) else None
+
+    def _query(self, query: dict = None) -> Optional[dict]:
+        """"id" alanını ObjectId'ye çevir (geçersiz ID: hiçbir şey eşleşmez → None)"""
+        query = dict(query or {})
+        if "id" in query:
+            value = query.pop("id")
+            if isinstance(value, dict) and "$in" in value:
+                ids = [oid for oid in map(self._object_id, value["$in"]) if oid is not None]
+                query["_id"] = {"$in": ids}
+            else:
+                oid = self._object_id(value)
+                if oid is None:
+                    return None
+                query["_id"] = oid
+        return query
+
+    @staticmethod
+    def _doc(doc: dict) -> dict:
+        doc["_id"] = doc["id"] = str(doc["_id"])
+        return doc
+
+    def init(self):
+        from pymongo import DESCENDING
+        db = self.db
+
+        # signal_history collection için indexler
+        db.signal_history.create_index([("coin", 1)])
+        db.signal_history.create_index([("created_at", DESCENDING)])
+        db.signal_history.create_index([("coin", 1), ("timeframe", 1)])
+
+        # performance_agg collection için indexler
+        db.performance_agg.create_index([("coin", 1), ("timeframe", 1)], unique=True)
+
+        # price_history indexleri (coin+timestamp ve retention TTL)
+        from price_history import ensure_indexes
+        ensure_indexes(db)
+
+        # Ingest sırasında tutulan OHLCV candle'lar
+        from candle_store import ensure_indexes as ensure_candle_indexes
+        ensure_candle_indexes(db)
+
+        # Katmanlı retention rollup'ları
+        from price_rollup import ROLLUP_TIERS
+        for tier in ROLLUP_TIERS:
+            db[self._rollup_collection(tier.name)].create_index([("coin", 1), ("start", -1)])
+
+    def insert(self, kind: str, doc: dict) -> str:
+        return str(self._collection(kind).insert_one(doc).inserted_id)
+
+    def find(self, kind: str, query: dict = None, sort: Sort = None, limit: int = None) -> List[dict]:
+        query = self._query(query)
+        if query is None:
+            return []
+        cursor = self._collection(kind).find(query)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limit:
+            cursor = cursor.limit(limit)
+        return [self._doc(doc) for doc in cursor]
+
+    def update(self, kind: str, doc_id: str, fields: dict) -> bool:
+        query = self._query({"id": doc_id})
+        if query is None:
+            return False
+        return self._collection(kind).update_one(query, {"$set": fields}).modified_count > 0
+
+    def delete(self, kind: str, query: dict = None) -> int:
+        query = self._query(query)
+        if query is None:
+            return 0
+        return self._collection(kind).delete_many(query).deleted_count
+
+    def count(self, kind: str, query: dict = None) -> int:
+        query = self._query(query)
+        if query is None:
+            return 0
+        return self._collection(kind).count_documents(query)
+
+    def group_count(self, kind: str, fields: Sequence[str], query: dict = None,
+                    true_field: str = None) -> List[dict]:
+        query = self._query(query)
+        if query is None:
+            return []
+        group = {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}
+        if true_field:
+            group["true_count"] = {"$sum": {"$cond": [{"$eq": [f"${true_field}", True]}, 1, 0]}}
+        results = []
+        for r in self._collection(kind).aggregate([{"$match": query}, {"$group": group}]):
+            row = {field: r["_id"].get(field) for field in fields}
+            row["count"] = r["count"]
+            if true_field:
+                row["true_count"] = r["true_count"]
+            results.append(row)
+        return results
+
+    def signal_stats(self) -> dict:
+        from pymongo import DESCENDING
+        signals = self.db.signal_history
+
+        # Maksimum kazanç/kayıp
+        max_gain_doc = signals.find_one({"reward": {"$ne": None}}, sort=[("reward", DESCENDING)])
+        max_loss_doc = signals.find_one({"reward": {"$ne": None}}, sort=[("reward", 1)])
+
+        # Ortalama reward
+        avg_result = list(signals.aggregate([
+            {"$match": {"reward": {"$ne": None}}},
+            {"$group": {"_id": None, "avg_reward": {"$avg": "$reward"}}}
+        ]))
+
+        # Coin başına performans
+        coin_performance = list(signals.aggregate([
+            {"$group": {
+                "_id": "$coin",
+                "total_signals": {"$sum": 1},
+                "successful": {"$sum": {"$cond": [{"$eq": ["$success", True]}, 1, 0]}},
+            }},
+            {"$sort": {"total_signals": DESCENDING}},
+            {"$limit": 10}
+        ]))
+
+        return {
+            "total": signals.count_documents({}),
+            "successful": signals.count_documents({"success": True}),
+            "failed": signals.count_documents({"success": False}),
+            "pending": signals.count_documents({"success": None}),
+            "max_gain": max_gain_doc.get("reward", 0) if max_gain_doc else 0,
+            "max_loss": max_loss_doc.get("reward", 0) if max_loss_doc else 0,
+            "avg_reward": avg_result[0]["avg_reward"] if avg_result else 0,
+            "top_profitable": self.find(SIGNALS, {"reward": {"$ne": None, "$gt": 0}},
+                                        sort=[("reward", DESCENDING)], limit=5),
+            "coin_performance": [
+                {"coin": cp["_id"], "total_signals": cp["total_signals"], "successful": cp["successful"]}
+                for cp in coin_performance
+            ],
+        }
+
+    # ---- Fiyat geçmişi ----
+
+    @staticmethod
+    def _prices():
+        from price_history import get_price_collection
+        return get_price_collection()
+
+    @staticmethod
+    def _range(coin: str = None, since: datetime = None, until: datetime = None) -> dict:
+        query = {}
+        if coin is not None:
+            query["coin"] = coin
+        if since is not None or until is not None:
+            query["timestamp"] = {}
+            if since is not None:
+                query["timestamp"]["$gte"] = since
+            if until is not None:
+                query["timestamp"]["$lt"] = until
+        return query
+
+    def insert_prices(self, records: List[dict]) -> int:
+        from pymongo.errors import BulkWriteError
+        if not records:
+            return 0
+        try:
+            return len(self._prices().insert_many(records, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # ordered=False: hatalı dokümanlar dışındakiler yazıldı, tekrar denenmez
+            logger.error(f"❌ price_history bulk hata: {len(e.details.get('writeErrors', []))} doküman yazılamadı")
+            return e.details.get("nInserted", 0)
+
+    def upsert_prices(self, records: List[dict]) -> int:
+        from pymongo import UpdateOne
+        from price_history import is_timeseries_collection
+        if not records:
+            return 0
+        if is_timeseries_collection(self.db):
+            # Time-series collection'larda upsert yok: mevcut timestamp'ler coin başına tek sorguyla elenir
+            fresh = []
+            for coin in {r["coin"] for r in records}:
+                points = [r for r in records if r["coin"] == coin]
+                stamps = [r["timestamp"] for r in points]
+                existing = {
+                    d["timestamp"] for d in self._prices().find(
+                        {"coin": coin, "timestamp": {"$gte": min(stamps), "$lte": max(stamps)}},
+                        {"_id": 0, "timestamp": 1}
+                    )
+                }
+                fresh.extend(r for r in points if r["timestamp"].replace(tzinfo=None) not in existing)
+            return self.insert_prices(fresh)
+        ops = [
+            UpdateOne({"coin": r["coin"], "timestamp": r["timestamp"]}, {"$setOnInsert": r}, upsert=True)
+            for r in records
+        ]
+        return self._prices().bulk_write(ops, ordered=False).upserted_count
+
+    def find_prices(self, coin: str, since: datetime = None, until: datetime = None,
+                    limit: int = None, newest_first: bool = False) -> List[dict]:
+        cursor = self._prices().find(
+            self._range(coin, since, until), {"_id": 0, "price": 1, "timestamp": 1, "volume_24h": 1}
+        ).sort("timestamp", -1 if newest_first else 1)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [doc for doc in cursor if "price" in doc and "timestamp" in doc]
+
+    def count_prices(self, coin: str) -> int:
+        return self._prices().count_documents({"coin": coin})
+
+    def price_coins(self, until: datetime = None) -> List[str]:
+        return self._prices().distinct("coin", self._range(until=until))
+
+    def delete_prices(self, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        return self._prices().delete_many(self._range(coin, since, until)).deleted_count
+
+    # ---- Fiyat rollup katmanları ----
+
+    @staticmethod
+    def _rollup_collection(tier: str) -> str:
+        return f"price_rollups_{tier}"
+
+    def upsert_rollups(self, tier: str, records: List[dict]) -> int:
+        from pymongo import UpdateOne
+        if not records:
+            return 0
+        ops = [
+            UpdateOne({"_id": f"{r['coin']}:{int(r['start'].timestamp())}"}, {"$set": r}, upsert=True)
+            for r in records
+        ]
+        self.db[self._rollup_collection(tier)].bulk_write(ops, ordered=False)
+        return len(ops)
+
+    def find_rollups(self, tier: str, coin: str, since: datetime = None, until: datetime = None,
+                     limit: int = None, newest_first: bool = False) -> List[dict]:
+        query = {"coin": coin}
+        if since is not None or until is not None:
+            query["start"] = {}
+            if since is not None:
+                query["start"]["$gte"] = since
+            if until is not None:
+                query["start"]["$lt"] = until
+        cursor = self.db[self._rollup_collection(tier)].find(query, {"_id": 0}).sort(
+            "start", -1 if newest_first else 1
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def delete_rollups(self, tier: str, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        query = {}
+        if coin is not None:
+            query["coin"] = coin
+        if since is not None or until is not None:
+            query["start"] = {}
+            if since is not None:
+                query["start"]["$gte"] = since
+            if until is not None:
+                query["start"]["$lt"] = until
+        return self.db[self._rollup_collection(tier)].delete_many(query).deleted_count
+
+    # ---- Manuel fiyatlar ----
+
+    def set_manual_price(self, coin: str, price: float, source: str):
+        from datetime import timezone
+        self.db.manual_price_overrides.update_one(
+            {"coin": coin},
+            {"$set": {"coin": coin, "price": price, "source": source, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    def get_manual_price(self, coin: str) -> Optional[dict]:
+        return self.db.manual_price_overrides.find_one({"coin": coin}, {"_id": 0})
+
+    def delete_manual_price(self, coin: str) -> bool:
+        return self.db.manual_price_overrides.delete_one({"coin": coin}).deleted_count > 0
+
+    def all_manual_prices(self) -> List[dict]:
+        return list(self.db.manual_price_overrides.find({}, {"_id": 0}))
+
+    # ---- CMC kredi kullanımı ----
+
+    def add_credit_usage(self, counts: Dict[str, Dict[str, int]]):
+        from pymongo import UpdateOne
+        if counts:
+            self.db.api_credit_usage.bulk_write([
+                UpdateOne({"_id": day}, {"$inc": day_counts}, upsert=True)
+                for day, day_counts in counts.items()
+            ], ordered=False)
+
+    def get_credit_usage(self, month: str) -> Dict[str, int]:
+        return {doc["_id"]: doc.get("credits", 0)
+                for doc in self.db.api_credit_usage.find({"_id": {"$regex": f"^{month}"}})}
+
+    # ---- Candle'lar ----
+
+    def upsert_candles(self, candles: List[dict]) -> int:
+        from pymongo import UpdateOne
+        if not candles:
+            return 0
+        now = datetime.now(timezone.utc)
+        ops = []
+        for c in candles:
+            start = c["start"] if c["start"].tzinfo else c["start"].replace(tzinfo=timezone.utc)
+            ops.append(UpdateOne(
+                {"_id": f"{c['coin']}:{c['interval']}:{int(start.timestamp())}"},
+                {"$set": {
+                    "coin": c["coin"], "interval": c["interval"], "start": start,
+                    "open": c["open"], "high": c["high"], "low": c["low"], "close": c["close"],
+                    "volume_24h": c["volume_24h"], "ticks": c["ticks"], "updated_at": now,
+                }},
+                upsert=True
+            ))
+        self.db.candles.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    def find_candles(self, coin: str, interval: str, since: datetime) -> List[dict]:
+        return list(self.db.candles.find(
+            {"coin": coin, "interval": interval, "start": {"$gte": since}},
+            {"_id": 0, "start": 1, "open": 1, "high": 1, "low": 1, "close": 1, "volume_24h": 1, "ticks": 1}
+        ).sort("start", 1))
+
+    # ---- Quote snapshot'ları ----
+
+    def set_snapshot(self, symbol: str, fields: dict):
+        self.db.quote_snapshots.update_one({"_id": symbol}, {"$set": fields}, upsert=True)
+
+    def touch_snapshot(self, symbol: str, last_fetch: datetime):
+        self.db.quote_snapshots.update_one({"_id": symbol}, {"$set": {"last_fetch": last_fetch}})
+
+    def all_snapshots(self) -> List[dict]:
+        return [{"symbol": doc.pop("_id"), **doc} for doc in self.db.quote_snapshots.find({})]
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """STORAGE_BACKEND'e göre global backend"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "sqlite":
+            from storage_sqlite import SQLiteStorage
+            _storage = SQLiteStorage()
+        elif STORAGE_BACKEND == "mongo":
+            _storage = MongoStorage()
+        else:
+            raise ValueError(f"Bilinmeyen STORAGE_BACKEND: {STORAGE_BACKEND}")
+        logger.info(f"🗄 Depolama backend: {_storage.name}")
+    return _storage
+
@@ -0,0 +1,594 @@
+# backend/storage_sqlite.py
+"""
+Gömülü SQLite depolama backend'i (STORAGE_BACKEND=sqlite)
+Tek node kurulumlar ve benchmark'lar MongoDB sunucusu olmadan çalışır.
+
+- WAL modu: okumalar yazmaları beklemez, commit başına fsync yok (synchronous=NORMAL)
+- Thread başına bağlantı (db_async thread havuzu ile uyumlu)
+- Sabit SQL metinleri: sqlite3'ün statement cache'i sayesinde hazır (prepared) ifadeler
+- Toplu fiyat yazımı tek transaction'da executemany ile
+- Fiyatlarda (coin, timestamp) birincil anahtar: aynı nokta iki kez yazılmaz
+
+Candle'lar, quote snapshot'ları ve CMC kredi sayaçları da burada tutulur (MongoDB
+karşılıklarıyla aynı anlamda). Sinyal ve alarm dokümanları JSON olarak saklanır; sorgulanan sık alanlar
+(coin, created_at, durum) ayrı kolonlarda indexlidir, diğer alanlar json_extract ile okunur.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from storage import ALARMS, SIGNALS, Sort, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", str(Path(__file__).parent / "data" / "storage.db"))
+# Fiyat retention'ı (MongoDB TTL index karşılığı) en fazla bu aralıkla çalışır
+SQLITE_RETENTION_CHECK_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    coin TEXT,
+    created_at REAL,
+    signal_status TEXT,
+    success INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_coin ON signals (coin);
+CREATE INDEX IF NOT EXISTS idx_signals_created ON signals (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_signals_status ON signals (signal_status);
+
+CREATE TABLE IF NOT EXISTS alarms (
+    id INTEGER PRIMARY KEY,
+    coin TEXT,
+    created_at REAL,
+    is_active INTEGER,
+    triggered INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alarms_active ON alarms (coin, is_active, triggered);
+
+CREATE TABLE IF NOT EXISTS prices (
+    coin TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    volume_24h REAL,
+    PRIMARY KEY (coin, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_prices_ts ON prices (ts);
+
+CREATE TABLE IF NOT EXISTS price_rollups (
+    tier TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    start REAL NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume_24h REAL,
+    ticks INTEGER,
+    PRIMARY KEY (tier, coin, start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS manual_prices (
+    coin TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    source TEXT,
+    updated_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS credit_usage (
+    day TEXT PRIMARY KEY,
+    credits INTEGER NOT NULL DEFAULT 0,
+    calls INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS candles (
+    coin TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start REAL NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume_24h REAL,
+    ticks INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (coin, interval, start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candles_start ON candles (start);
+
+CREATE TABLE IF NOT EXISTS quote_snapshots (
+    symbol TEXT PRIMARY KEY,
+    last_fetch REAL,
+    status TEXT,
+    doc TEXT NOT NULL
+);
+"""
+
+# Doküman alanı → tablo kolonu (diğer alanlar json_extract ile)
+COLUMNS = {
+    SIGNALS: ("coin", "created_at", "signal_status", "success"),
+    ALARMS: ("coin", "created_at", "is_active", "triggered"),
+}
+
+_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def _to_epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _to_datetime(epoch: float) -> datetime:
+    """MongoDB okumalarıyla aynı formatta naive UTC datetime"""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": _to_epoch(value)}
+    return str(value)
+
+
+def _json_hook(obj: dict):
+    if len(obj) == 1 and "$date" in obj:
+        return _to_datetime(obj["$date"])
+    return obj
+
+
+def _sql_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _to_epoch(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite (WAL) backend"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._initialized = False
+        self._last_retention = 0.0
+        self._last_candle_retention = 0.0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            if not self._initialized:
+                self._initialized = True
+                conn.executescript(SCHEMA)
+        return conn
+
+    def init(self):
+        self.conn.executescript(SCHEMA)
+        logger.info(f"✅ SQLite depolama hazır: {self.path} (WAL)")
+
+    # ---- Sorgu çevirisi ----
+
+    def _field(self, kind: str, field: str, sample: Any) -> str:
+        if field == "id":
+            return "id"
+        if field in COLUMNS[kind]:
+            return field
+        path = f'$.{field}."$date"' if isinstance(sample, datetime) else f"$.{field}"
+        return f"json_extract(doc, '{path}')"
+
+    def _where(self, kind: str, query: dict = None) -> Tuple[str, list]:
+        clauses, params = [], []
+        for field, cond in (query or {}).items():
+            if field == "id":
+                cond = self._ids(cond)
+                if cond is None:
+                    return "WHERE 0", []
+            if isinstance(cond, dict):
+                for op, value in cond.items():
+                    sample = value[0] if op == "$in" and value else value
+                    expr = self._field(kind, field, sample)
+                    if op == "$in":
+                        if not value:
+                            clauses.append("0")
+                            continue
+                        clauses.append(f"{expr} IN ({', '.join('?' * len(value))})")
+                        params.extend(_sql_value(v) for v in value)
+                    elif op == "$ne":
+                        if value is None:
+                            clauses.append(f"{expr} IS NOT NULL")
+                        else:
+                            clauses.append(f"({expr} IS NULL OR {expr} != ?)")
+                            params.append(_sql_value(value))
+                    elif op in _OPERATORS:
+                        clauses.append(f"{expr} {_OPERATORS[op]} ?")
+                        params.append(_sql_value(value))
+                    else:
+                        raise ValueError(f"Desteklenmeyen sorgu operatörü: {op}")
+            else:
+                expr = self._field(kind, field, cond)
+                if cond is None:
+                    clauses.append(f"{expr} IS NULL")
+                else:
+                    clauses.append(f"{expr} = ?")
+                    params.append(_sql_value(cond))
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _ids(value):
+        """String ID(ler) → int (geçersizse None)"""
+        try:
+            if isinstance(value, dict):
+                return {"$in": [int(v) for v in value.get("$in", []) if str(v).isdigit()]}
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _row(self, kind: str, doc: dict) -> list:
+        return [_sql_value(doc.get(column)) for column in COLUMNS[kind]] + \
+               [json.dumps(doc, default=_json_default)]
+
+    @staticmethod
+    def _doc(row) -> dict:
+        doc = json.loads(row[1], object_hook=_json_hook)
+        doc["_id"] = doc["id"] = str(row[0])
+        return doc
+
+    # ---- Doküman koleksiyonları ----
+
+    def insert(self, kind: str, doc: dict) -> str:
+        doc = {k: v for k, v in doc.items() if k not in ("_id", "id")}
+        columns = COLUMNS[kind]
+        sql = f"INSERT INTO {kind} ({', '.join(columns)}, doc) VALUES ({', '.join('?' * (len(columns) + 1))})"
+        with self.conn as conn:
+            cursor = conn.execute(sql, self._row(kind, doc))
+        return str(cursor.lastrowid)
+
+    def find(self, kind: str, query: dict = None, sort: Sort = None, limit: int = None) -> List[dict]:
+        where, params = self._where(kind, query)
+        sql = f"SELECT id, doc FROM {kind} {where}"
+        if sort:
+            sql += " ORDER BY " + ", ".join(
+                f"{self._field(kind, field, None)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort
+            )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._doc(row) for row in self.conn.execute(sql, params)]
+
+    def update(self, kind: str, doc_id: str, fields: dict) -> bool:
+        row_id = self._ids(doc_id)
+        if row_id is None:
+            return False
+        columns = COLUMNS[kind]
+        with self.conn as conn:
+            row = conn.execute(f"SELECT doc FROM {kind} WHERE id = ?", (row_id,)).fetchone()
+            if row is None:
+                return False
+            doc = json.loads(row[0], object_hook=_json_hook)
+            changed = any(doc.get(k) != v for k, v in fields.items())
+            if not changed:
+                return False
+            doc.update(fields)
+            conn.execute(
+                f"UPDATE {kind} SET {', '.join(f'{c} = ?' for c in columns)}, doc = ? WHERE id = ?",
+                self._row(kind, doc) + [row_id]
+            )
+        return True
+
+    def delete(self, kind: str, query: dict = None) -> int:
+        where, params = self._where(kind, query)
+        with self.conn as conn:
+            return conn.execute(f"DELETE FROM {kind} {where}", params).rowcount
+
+    def count(self, kind: str, query: dict = None) -> int:
+        where, params = self._where(kind, query)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {kind} {where}", params).fetchone()[0]
+
+    def group_count(self, kind: str, fields: Sequence[str], query: dict = None,
+                    true_field: str = None) -> List[dict]:
+        where, params = self._where(kind, query)
+        exprs = [self._field(kind, field, None) for field in fields]
+        sql = f"SELECT {', '.join(exprs)}, COUNT(*)"
+        if true_field:
+            sql += f", COALESCE(SUM({self._field(kind, true_field, None)} = 1), 0)"
+        sql += f" FROM {kind} {where} GROUP BY {', '.join(exprs)}"
+        results = []
+        for row in self.conn.execute(sql, params):
+            result = dict(zip(fields, row))
+            result["count"] = row[len(fields)]
+            if true_field:
+                result["true_count"] = row[len(fields) + 1]
+            results.append(result)
+        return results
+
+    def signal_stats(self) -> dict:
+        conn = self.conn
+        total, successful, failed, pending = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(success = 1), 0), COALESCE(SUM(success = 0), 0), "
+            "COALESCE(SUM(success IS NULL), 0) FROM signals"
+        ).fetchone()
+        max_gain, max_loss, avg_reward = conn.execute(
+            "SELECT MAX(r), MIN(r), AVG(r) FROM "
+            "(SELECT json_extract(doc, '$.reward') AS r FROM signals) WHERE r IS NOT NULL"
+        ).fetchone()
+        coin_performance = conn.execute(
+            "SELECT coin, COUNT(*), COALESCE(SUM(success = 1), 0) FROM signals "
+            "GROUP BY coin ORDER BY COUNT(*) DESC LIMIT 10"
+        ).fetchall()
+        return {
+            "total": total,
+            "successful": successful,
+            "failed": failed,
+            "pending": pending,
+            "max_gain": max_gain or 0,
+            "max_loss": max_loss or 0,
+            "avg_reward": avg_reward or 0,
+            "top_profitable": self.find(SIGNALS, {"reward": {"$ne": None, "$gt": 0}},
+                                        sort=[("reward", -1)], limit=5),
+            "coin_performance": [
+                {"coin": coin, "total_signals": count, "successful": ok}
+                for coin, count, ok in coin_performance
+            ],
+        }
+
+    # ---- Fiyat geçmişi ----
+
+    def insert_prices(self, records: List[dict]) -> int:
+        if not records:
+            return 0
+        rows = [
+            (r["coin"], _to_epoch(r["timestamp"]), r["price"], r.get("volume_24h") or 0.0)
+            for r in records if r.get("price") is not None
+        ]
+        with self.conn as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO prices (coin, ts, price, volume_24h) VALUES (?, ?, ?, ?)", rows
+            )
+            written = conn.total_changes - before
+        self._apply_retention()
+        return written
+
+    def upsert_prices(self, records: List[dict]) -> int:
+        # (coin, ts) birincil anahtar + INSERT OR IGNORE zaten idempotent
+        return self.insert_prices(records)
+
+    def _apply_retention(self):
+        """PRICE_HISTORY_RETENTION_DAYS'ten eski noktaları sil (saatte en fazla bir kez)"""
+        now = time.time()
+        if now - self._last_retention < SQLITE_RETENTION_CHECK_SECONDS:
+            return
+        self._last_retention = now
+        from price_history import PRICE_HISTORY_RETENTION_DAYS
+        cutoff = datetime.now(timezone.utc) - timedelta(days=PRICE_HISTORY_RETENTION_DAYS)
+        deleted = self.delete_prices(until=cutoff)
+        if deleted:
+            logger.info(f"🗑️ SQLite: {deleted} eski fiyat noktası silindi")
+
+    @staticmethod
+    def _range(coin: str = None, since: datetime = None, until: datetime = None) -> Tuple[str, list]:
+        clauses, params = [], []
+        if coin is not None:
+            clauses.append("coin = ?")
+            params.append(coin)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(_to_epoch(since))
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(_to_epoch(until))
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def find_prices(self, coin: str, since: datetime = None, until: datetime = None,
+                    limit: int = None, newest_first: bool = False) -> List[dict]:
+        where, params = self._range(coin, since, until)
+        sql = f"SELECT ts, price, volume_24h FROM prices {where} ORDER BY ts {'DESC' if newest_first else 'ASC'}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            {"price": price, "timestamp": _to_datetime(ts), "volume_24h": volume}
+            for ts, price, volume in self.conn.execute(sql, params)
+        ]
+
+    def count_prices(self, coin: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM prices WHERE coin = ?", (coin,)).fetchone()[0]
+
+    def price_coins(self, until: datetime = None) -> List[str]:
+        where, params = self._range(until=until)
+        return [row[0] for row in self.conn.execute(f"SELECT DISTINCT coin FROM prices {where}", params)]
+
+    def delete_prices(self, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        where, params = self._range(coin, since, until)
+        with self.conn as conn:
+            return conn.execute(f"DELETE FROM prices {where}", params).rowcount
+
+    # ---- Fiyat rollup katmanları ----
+
+    def upsert_rollups(self, tier: str, records: List[dict]) -> int:
+        if not records:
+            return 0
+        rows = [
+            (tier, r["coin"], _to_epoch(r["start"]), r["open"], r["high"], r["low"], r["close"],
+             r.get("volume_24h") or 0.0, r.get("ticks") or 0)
+            for r in records
+        ]
+        with self.conn as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_rollups "
+                "(tier, coin, start, open, high, low, close, volume_24h, ticks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def find_rollups(self, tier: str, coin: str, since: datetime = None, until: datetime = None,
+                     limit: int = None, newest_first: bool = False) -> List[dict]:
+        sql = ("SELECT coin, start, open, high, low, close, volume_24h, ticks FROM price_rollups "
+               "WHERE tier = ? AND coin = ?")
+        params: list = [tier, coin]
+        if since is not None:
+            sql += " AND start >= ?"
+            params.append(_to_epoch(since))
+        if until is not None:
+            sql += " AND start < ?"
+            params.append(_to_epoch(until))
+        sql += f" ORDER BY start {'DESC' if newest_first else 'ASC'}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            {"coin": coin, "start": _to_datetime(start), "open": o, "high": h, "low": l, "close": c,
+             "volume_24h": volume, "ticks": ticks}
+            for coin, start, o, h, l, c, volume, ticks in self.conn.execute(sql, params)
+        ]
+
+    def delete_rollups(self, tier: str, coin: str = None, since: datetime = None, until: datetime = None) -> int:
+        sql = "DELETE FROM price_rollups WHERE tier = ?"
+        params: list = [tier]
+        if coin is not None:
+            sql += " AND coin = ?"
+            params.append(coin)
+        if since is not None:
+            sql += " AND start >= ?"
+            params.append(_to_epoch(since))
+        if until is not None:
+            sql += " AND start < ?"
+            params.append(_to_epoch(until))
+        with self.conn as conn:
+            return conn.execute(sql, params).rowcount
+
+    # ---- Manuel fiyatlar ----
+
+    def set_manual_price(self, coin: str, price: float, source: str):
+        with self.conn as conn:
+            conn.execute(
+                "INSERT INTO manual_prices (coin, price, source, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(coin) DO UPDATE SET price = excluded.price, source = excluded.source, "
+                "updated_at = excluded.updated_at",
+                (coin, price, source, time.time())
+            )
+
+    def get_manual_price(self, coin: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT coin, price, source, updated_at FROM manual_prices WHERE coin = ?", (coin,)
+        ).fetchone()
+        return self._manual(row) if row else None
+
+    def delete_manual_price(self, coin: str) -> bool:
+        with self.conn as conn:
+            return conn.execute("DELETE FROM manual_prices WHERE coin = ?", (coin,)).rowcount > 0
+
+    def all_manual_prices(self) -> List[dict]:
+        return [self._manual(row) for row in
+                self.conn.execute("SELECT coin, price, source, updated_at FROM manual_prices")]
+
+    @staticmethod
+    def _manual(row) -> dict:
+        coin, price, source, updated_at = row
+        return {"coin": coin, "price": price, "source": source,
+                "updated_at": _to_datetime(updated_at) if updated_at else None}
+
+    # ---- CMC kredi kullanımı ----
+
+    def add_credit_usage(self, counts: Dict[str, Dict[str, int]]):
+        if not counts:
+            return
+        with self.conn as conn:
+            conn.executemany(
+                "INSERT INTO credit_usage (day, credits, calls) VALUES (?, ?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET credits = credits + excluded.credits, calls = calls + excluded.calls",
+                [(day, c.get("credits", 0), c.get("calls", 0)) for day, c in counts.items()]
+            )
+
+    def get_credit_usage(self, month: str) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT day, credits FROM credit_usage WHERE day LIKE ?", (f"{month}%",)))
+
+    # ---- Candle'lar ----
+
+    def upsert_candles(self, candles: List[dict]) -> int:
+        if not candles:
+            return 0
+        now = time.time()
+        rows = [
+            (c["coin"], c["interval"], float(int(_to_epoch(c["start"]))), c["open"], c["high"], c["low"],
+             c["close"], c.get("volume_24h") or 0.0, c.get("ticks") or 0, now)
+            for c in candles
+        ]
+        with self.conn as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles "
+                "(coin, interval, start, open, high, low, close, volume_24h, ticks, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self._apply_candle_retention()
+        return len(rows)
+
+    def _apply_candle_retention(self):
+        """CANDLE_RETENTION_DAYS'ten eski candle'ları sil (saatte en fazla bir kez)"""
+        now = time.time()
+        if now - self._last_candle_retention < SQLITE_RETENTION_CHECK_SECONDS:
+            return
+        self._last_candle_retention = now
+        from candle_store import CANDLE_RETENTION_DAYS
+        with self.conn as conn:
+            deleted = conn.execute("DELETE FROM candles WHERE start < ?",
+                                   (now - CANDLE_RETENTION_DAYS * 86400,)).rowcount
+        if deleted:
+            logger.info(f"🗑️ SQLite: {deleted} eski candle silindi")
+
+    def find_candles(self, coin: str, interval: str, since: datetime) -> List[dict]:
+        rows = self.conn.execute(
+            "SELECT start, open, high, low, close, volume_24h, ticks FROM candles "
+            "WHERE coin = ? AND interval = ? AND start >= ? ORDER BY start",
+            (coin, interval, _to_epoch(since))
+        )
+        return [
+            {"start": _to_datetime(start), "open": o, "high": h, "low": l, "close": c,
+             "volume_24h": volume, "ticks": ticks}
+            for start, o, h, l, c, volume, ticks in rows
+        ]
+
+    # ---- Quote snapshot'ları ----
+
+    def set_snapshot(self, symbol: str, fields: dict):
+        fields = dict(fields)
+        last_fetch = fields.pop("last_fetch", None)
+        status = fields.pop("status", None)
+        with self.conn as conn:
+            conn.execute(
+                "INSERT INTO quote_snapshots (symbol, last_fetch, status, doc) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET last_fetch = COALESCE(excluded.last_fetch, last_fetch), "
+                "status = COALESCE(excluded.status, status), doc = excluded.doc",
+                (symbol, _sql_value(last_fetch), status, json.dumps(fields, default=_json_default))
+            )
+
+    def touch_snapshot(self, symbol: str, last_fetch: datetime):
+        with self.conn as conn:
+            conn.execute("UPDATE quote_snapshots SET last_fetch = ? WHERE symbol = ?",
+                         (_to_epoch(last_fetch), symbol))
+
+    def all_snapshots(self) -> List[dict]:
+        return [
+            {**json.loads(doc, object_hook=_json_hook), "symbol": symbol,
+             "last_fetch": _to_datetime(last_fetch) if last_fetch is not None else None, "status": status}
+            for symbol, last_fetch, status, doc in
+            self.conn.execute("SELECT symbol, last_fetch, status, doc FROM quote_snapshots")
+        ]
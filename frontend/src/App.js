@@ -1003,11 +1003,24 @@ function App() {
         headers: { "x-admin-token": adminToken }
       });
       
-      setHistoricalImportResult(res.data.results);
+      // Import arka planda çalışır: job tamamlanana kadar ilerlemeyi oku
+      let job = res.data.job;
+      setHistoricalImportResult(job.results);
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const statusRes = await axios.get(`${API}/historical/import/${res.data.job_id}`);
+        job = statusRes.data;
+        setHistoricalImportResult(job.results);
+        setMessage(`⏳ Geçmiş veriler çekiliyor... (${job.progress.done}/${job.progress.total} coin)`);
+      }
+      
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Import job başarısız');
+      }
       
       // Başarı mesajı
-      const successCount = Object.values(res.data.results).filter(r => r.status === 'success').length;
-      const totalImported = Object.values(res.data.results)
+      const successCount = Object.values(job.results).filter(r => r.status === 'success').length;
+      const totalImported = Object.values(job.results)
         .filter(r => r.status === 'success')
         .reduce((sum, r) => sum + r.imported, 0);
       
@@ -1407,7 +1420,9 @@ function App() {
                         <strong>{coin}:</strong> {
                           result.status === 'success' 
                             ? `✅ ${result.imported} yeni, ${result.skipped} mevcut (${result.total} toplam)`
-                            : `❌ ${result.message}`
+                            : result.status === 'error'
+                              ? `❌ ${result.message}`
+                              : `⏳ ${result.imported} yeni, ${result.skipped} mevcut...`
                         }
                       </li>
                     ))}
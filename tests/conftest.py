@@ -0,0 +1,8 @@
+# tests/conftest.py
+"""Backend modülleri (backend/ dizini) testlerden doğrudan import edilir"""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
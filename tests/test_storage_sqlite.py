@@ -0,0 +1,226 @@
+# tests/test_storage_sqlite.py
+"""
+SQLiteStorage: MongoDB sorgu alt kümesinin SQL çevirisi
+Beklenen sonuçlar aynı sorguların MongoDB'de döndürdükleridir (alan yok/null
+eşitliği, $ne'nin eksik alanları da kapsaması, datetime'ların naive UTC dönmesi).
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from storage import ALARMS, SIGNALS
+from storage_sqlite import SQLiteStorage
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    st = SQLiteStorage(str(tmp_path / "storage.db"))
+    st.init()
+    # Saatlik retention temizliği (price_history / candle_store ayarlarını okur) bu testlerde çalışmaz
+    st._last_retention = st._last_candle_retention = time.time()
+    return st
+
+
+@pytest.fixture
+def signals(storage):
+    """Farklı coin/timeframe/durum kombinasyonlarında sinyaller; ID'ler sırayla"""
+    docs = [
+        {"coin": "BTC", "timeframe": "1h", "success": True, "reward": 5.0, "signal_status": "hit_tp",
+         "created_at": T0, "checked_at": T0 + timedelta(hours=2)},
+        {"coin": "BTC", "timeframe": "4h", "success": False, "reward": -2.0, "signal_status": "hit_sl",
+         "created_at": T0 + timedelta(hours=1)},
+        {"coin": "ETH", "timeframe": "1h", "success": None, "reward": None, "signal_status": "active",
+         "created_at": T0 + timedelta(hours=2)},
+        {"coin": "ETH", "timeframe": "1h", "signal_status": "active",
+         "created_at": T0 + timedelta(hours=3), "checked_at": T0 + timedelta(hours=5)},
+        {"coin": "SOL", "timeframe": "24h", "success": True, "reward": 1.5, "signal_status": "hit_tp",
+         "created_at": T0 + timedelta(hours=4)},
+    ]
+    return [storage.insert(SIGNALS, dict(doc)) for doc in docs]
+
+
+def coins(docs):
+    return [doc["coin"] for doc in docs]
+
+
+def ids(docs):
+    """Sıralamasız sorguların ID'leri (MongoDB gibi sıra garanti edilmez)"""
+    return sorted((doc["id"] for doc in docs), key=int)
+
+
+def test_insert_returns_string_ids_and_roundtrips_documents(storage, signals):
+    assert all(isinstance(i, str) for i in signals)
+    doc = storage.find_one(SIGNALS, {"id": signals[0]})
+    assert doc["id"] == doc["_id"] == signals[0]
+    assert doc["coin"] == "BTC" and doc["success"] is True and doc["reward"] == 5.0
+    # Datetime'lar MongoDB okumaları gibi naive UTC döner
+    assert doc["created_at"] == T0.replace(tzinfo=None)
+    assert doc["checked_at"] == (T0 + timedelta(hours=2)).replace(tzinfo=None)
+
+
+def test_in_operator_on_column_and_json_field(storage, signals):
+    assert sorted(coins(storage.find(SIGNALS, {"coin": {"$in": ["BTC", "SOL"]}}))) == ["BTC", "BTC", "SOL"]
+    assert len(storage.find(SIGNALS, {"timeframe": {"$in": ["4h", "24h"]}})) == 2
+    assert storage.find(SIGNALS, {"coin": {"$in": []}}) == []
+
+
+def test_equality_with_none_matches_missing_and_null(storage, signals):
+    # {"success": None}: alan null veya hiç yok
+    assert ids(storage.find(SIGNALS, {"success": None})) == signals[2:4]
+    assert ids(storage.find(SIGNALS, {"reward": None})) == signals[2:4]
+
+
+def test_ne_operator(storage, signals):
+    # {"$ne": None}: alan var ve null değil
+    assert ids(storage.find(SIGNALS, {"reward": {"$ne": None}})) == [signals[0], signals[1], signals[4]]
+    # {"$ne": değer}: eksik/null alanlar da eşleşir
+    assert ids(storage.find(SIGNALS, {"timeframe": {"$ne": "1h"}})) == [signals[1], signals[4]]
+    assert ids(storage.find(SIGNALS, {"success": {"$ne": True}})) == signals[1:4]
+
+
+def test_comparison_operators_on_datetime_column(storage, signals):
+    cutoff = T0 + timedelta(hours=2)
+    assert ids(storage.find(SIGNALS, {"created_at": {"$gt": cutoff}})) == signals[3:]
+    assert ids(storage.find(SIGNALS, {"created_at": {"$gte": cutoff}})) == signals[2:]
+    assert ids(storage.find(SIGNALS, {"created_at": {"$lte": cutoff}})) == signals[:3]
+    assert ids(storage.find(
+        SIGNALS, {"created_at": {"$gte": T0 + timedelta(hours=1), "$lt": cutoff}})) == [signals[1]]
+    # Naive datetime UTC kabul edilir
+    assert storage.count(SIGNALS, {"created_at": {"$lt": cutoff.replace(tzinfo=None)}}) == 2
+
+
+def test_comparison_operators_on_json_fields(storage, signals):
+    # JSON içindeki datetime alanı (eksik alan karşılaştırmaya girmez)
+    assert ids(storage.find(SIGNALS, {"checked_at": {"$gt": T0 + timedelta(hours=3)}})) == [signals[3]]
+    assert ids(storage.find(SIGNALS, {"reward": {"$gt": 0}})) == [signals[0], signals[4]]
+    assert ids(storage.find(SIGNALS, {"reward": {"$gte": 1.5, "$lt": 5}})) == [signals[4]]
+
+
+def test_boolean_fields(storage, signals):
+    assert ids(storage.find(SIGNALS, {"success": True})) == [signals[0], signals[4]]
+    assert ids(storage.find(SIGNALS, {"success": False})) == [signals[1]]
+
+    alarm_id = storage.insert(ALARMS, {"coin": "BTC", "is_active": True, "triggered": False,
+                                       "target_price": 100.0, "created_at": T0})
+    storage.insert(ALARMS, {"coin": "BTC", "is_active": False, "triggered": False, "created_at": T0})
+    active = storage.find(ALARMS, {"coin": "BTC", "is_active": True, "triggered": False})
+    assert [a["id"] for a in active] == [alarm_id]
+    assert active[0]["is_active"] is True and active[0]["triggered"] is False
+
+
+def test_id_lookups(storage, signals):
+    assert storage.find_one(SIGNALS, {"id": signals[1]})["coin"] == "BTC"
+    assert ids(storage.find(SIGNALS, {"id": {"$in": [signals[4], signals[0]]}})) == [signals[0], signals[4]]
+    # Geçersiz ID (MongoDB'de geçersiz ObjectId) hiçbir şeyle eşleşmez
+    assert storage.find_one(SIGNALS, {"id": "not-an-id"}) is None
+    assert storage.find(SIGNALS, {"id": {"$in": ["nope", signals[2]]}})[0]["id"] == signals[2]
+    assert storage.delete(SIGNALS, {"id": "not-an-id"}) == 0
+    assert storage.delete(SIGNALS, {"id": signals[0]}) == 1
+    assert storage.find_one(SIGNALS, {"id": signals[0]}) is None
+
+
+def test_sort_and_limit(storage, signals):
+    newest = storage.find(SIGNALS, {"coin": {"$in": ["BTC", "ETH"]}}, sort=[("created_at", -1)], limit=3)
+    assert [d["id"] for d in newest] == [signals[3], signals[2], signals[1]]
+    by_reward = storage.find(SIGNALS, {"reward": {"$ne": None}}, sort=[("reward", -1)])
+    assert [d["reward"] for d in by_reward] == [5.0, 1.5, -2.0]
+
+
+def test_update_sets_fields_and_reports_changes(storage, signals):
+    assert storage.update(SIGNALS, signals[2], {"signal_status": "hit_tp", "success": True}) is True
+    # Aynı değerler: değişiklik yok (MongoDB modified_count == 0)
+    assert storage.update(SIGNALS, signals[2], {"signal_status": "hit_tp"}) is False
+    assert storage.update(SIGNALS, "not-an-id", {"success": True}) is False
+    assert storage.count(SIGNALS, {"signal_status": "hit_tp"}) == 3
+    doc = storage.find_one(SIGNALS, {"id": signals[2]})
+    assert doc["success"] is True and doc["created_at"] == (T0 + timedelta(hours=2)).replace(tzinfo=None)
+
+
+def test_count_and_delete_with_queries(storage, signals):
+    assert storage.count(SIGNALS) == 5
+    assert storage.count(SIGNALS, {"signal_status": "active"}) == 2
+    assert storage.delete(SIGNALS, {"success": False}) == 1
+    assert storage.delete(SIGNALS, {}) == 4
+    assert storage.count(SIGNALS) == 0
+
+
+def test_group_count(storage, signals):
+    groups = storage.group_count(SIGNALS, ("coin", "timeframe"),
+                                 {"created_at": {"$lte": T0 + timedelta(hours=3)}}, true_field="success")
+    by_key = {(g["coin"], g["timeframe"]): (g["count"], g["true_count"]) for g in groups}
+    assert by_key == {("BTC", "1h"): (1, 1), ("BTC", "4h"): (1, 0), ("ETH", "1h"): (2, 0)}
+
+    assert {g["coin"]: g["count"] for g in storage.group_count(SIGNALS, ("coin",))} == {"BTC": 2, "ETH": 2, "SOL": 1}
+
+
+def test_signal_stats(storage, signals):
+    stats = storage.signal_stats()
+    assert (stats["total"], stats["successful"], stats["failed"], stats["pending"]) == (5, 2, 1, 2)
+    assert stats["max_gain"] == 5.0 and stats["max_loss"] == -2.0
+    assert stats["avg_reward"] == pytest.approx((5.0 - 2.0 + 1.5) / 3)
+    assert [d["reward"] for d in stats["top_profitable"]] == [5.0, 1.5]
+    performance = {p["coin"]: (p["total_signals"], p["successful"]) for p in stats["coin_performance"]}
+    assert performance == {"BTC": (2, 1), "ETH": (2, 0), "SOL": (1, 1)}
+
+
+def _points(coin, start, count, step=timedelta(minutes=1)):
+    return [{"coin": coin, "price": 100.0 + i, "volume_24h": 1000.0 + i, "timestamp": start + i * step}
+            for i in range(count)]
+
+
+def test_upsert_prices_is_idempotent(storage):
+    points = _points("BTC", T0, 10)
+    assert storage.upsert_prices(points) == 10
+    assert storage.upsert_prices(points) == 0
+    # Kısmen yeni batch: sadece yeni (coin, timestamp)'ler yazılır, mevcutlar değişmez
+    overlap = [dict(p, price=1.0) for p in points[5:]] + _points("BTC", T0 + timedelta(minutes=10), 5)
+    assert storage.upsert_prices(overlap) == 5
+    assert storage.count_prices("BTC") == 15
+    assert storage.find_prices("BTC", limit=1, newest_first=True)[0]["price"] == 104.0
+    assert storage.find_prices("BTC", since=T0 + timedelta(minutes=5), limit=1)[0]["price"] == 105.0
+    # Naive timestamp UTC kabul edilir: aynı nokta
+    assert storage.upsert_prices([dict(points[0], timestamp=T0.replace(tzinfo=None))]) == 0
+
+
+def test_find_prices_range_and_order(storage):
+    storage.insert_prices(_points("BTC", T0, 10) + _points("ETH", T0, 3))
+    window = storage.find_prices("BTC", since=T0 + timedelta(minutes=2), until=T0 + timedelta(minutes=5))
+    assert [p["price"] for p in window] == [102.0, 103.0, 104.0]
+    assert window[0]["timestamp"] == (T0 + timedelta(minutes=2)).replace(tzinfo=None)
+    assert [p["price"] for p in storage.find_prices("BTC", limit=2, newest_first=True)] == [109.0, 108.0]
+    assert sorted(storage.price_coins()) == ["BTC", "ETH"]
+    assert storage.delete_prices("BTC", until=T0 + timedelta(minutes=5)) == 5
+    assert storage.count_prices("BTC") == 5 and storage.count_prices("ETH") == 3
+
+
+def test_credit_usage_accumulates_per_day(storage):
+    storage.add_credit_usage({"2026-01-01": {"credits": 5, "calls": 2}, "2026-01-02": {"credits": 1, "calls": 1}})
+    storage.add_credit_usage({"2026-01-01": {"credits": 3, "calls": 1}, "2026-02-01": {"credits": 7, "calls": 1}})
+    assert storage.get_credit_usage("2026-01") == {"2026-01-01": 8, "2026-01-02": 1}
+    assert storage.get_credit_usage("2026-03") == {}
+
+
+def test_candles_upsert_and_find(storage):
+    candle = {"coin": "BTC", "interval": "1h", "start": T0, "open": 1.0, "high": 2.0, "low": 0.5,
+              "close": 1.5, "volume_24h": 10.0, "ticks": 3}
+    storage.upsert_candles([candle, dict(candle, start=T0 + timedelta(hours=1))])
+    storage.upsert_candles([dict(candle, close=1.8, ticks=4)])
+    found = storage.find_candles("BTC", "1h", T0)
+    assert [(c["start"], c["close"], c["ticks"]) for c in found] == [
+        (T0.replace(tzinfo=None), 1.8, 4), ((T0 + timedelta(hours=1)).replace(tzinfo=None), 1.5, 3)]
+    assert len(storage.find_candles("BTC", "1h", T0 + timedelta(minutes=30))) == 1
+    assert storage.find_candles("BTC", "4h", T0) == []
+
+
+def test_quote_snapshots(storage):
+    storage.set_snapshot("BTC", {"symbol": "BTC", "price": 1.5, "last_fetch": T0, "status": "active"})
+    storage.touch_snapshot("BTC", T0 + timedelta(minutes=1))
+    storage.touch_snapshot("ETH", T0)  # Kaydı olmayan coin için no-op
+    snapshots = storage.all_snapshots()
+    assert len(snapshots) == 1
+    snapshot = snapshots[0]
+    assert snapshot["symbol"] == "BTC" and snapshot["price"] == 1.5 and snapshot["status"] == "active"
+    assert snapshot["last_fetch"] == (T0 + timedelta(minutes=1)).replace(tzinfo=None)